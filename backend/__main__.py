@@ -0,0 +1,61 @@
+"""
+Server launcher
+
+Runs the API under uvicorn with the fastest event loop and HTTP parser that
+are installed (uvloop, httptools) and the socket, keep-alive and shutdown
+settings from Settings, after printing the effective configuration.
+
+Usage:
+    python -m backend [--print-config]
+"""
+import argparse
+import importlib.util
+import json
+from typing import Any, Dict, List, Optional
+from .config import Settings, settings
+
+APP = "backend.server:app"
+
+def module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+def resolve_implementation(choice: str, fast: str, fallback: str, setting: str) -> str:
+    """Pick fast when it is installed and choice is "auto"; fail if it was asked for but is missing"""
+    if choice == "auto":
+        return fast if module_available(fast) else fallback
+    if choice == fast and not module_available(fast):
+        raise SystemExit(f"{setting}={fast} but {fast} is not installed")
+    return choice
+
+def server_options(config: Settings = settings) -> Dict[str, Any]:
+    """uvicorn.run keyword arguments for the configured server"""
+    return {
+        "host": config.server_host,
+        "port": config.server_port,
+        "workers": config.server_workers,
+        "loop": resolve_implementation(config.server_loop, "uvloop", "asyncio", "SERVER_LOOP"),
+        "http": resolve_implementation(config.server_http, "httptools", "h11", "SERVER_HTTP"),
+        "backlog": config.server_backlog,
+        "timeout_keep_alive": config.server_keep_alive_seconds,
+        "limit_concurrency": config.server_limit_concurrency or None,
+        "timeout_graceful_shutdown": config.server_graceful_timeout_seconds,
+        "h11_max_incomplete_event_size": config.server_h11_max_incomplete_event_size,
+        "access_log": config.server_access_log,
+        "log_level": config.log_level.lower()
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the API server")
+    parser.add_argument("--print-config", action="store_true", help="Print the effective configuration and exit")
+    args = parser.parse_args(argv)
+    
+    options = server_options()
+    print(json.dumps({"event": "Effective server configuration", "app": APP, **options}, sort_keys=True), flush=True)
+    if args.print_config:
+        return
+    
+    import uvicorn
+    uvicorn.run(APP, **options)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Client registry: dictionary encoding of client names
+"""
+import asyncio
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import structlog
+from .resilience import ResilientCollection
+
+logger = structlog.get_logger(__name__)
+
+class ClientRegistry:
+    """Map client names to compact integer ids stored in place of the name
+    
+    Names live once in the clients collection ({_id: int, name: str}, unique
+    on name); status checks store client_id instead of client_name. Ids come
+    from a counter document, and a name registered concurrently by another
+    process resolves to whichever insert won the unique index. Both
+    directions are cached in process, so steady-state writes and reads of
+    known clients cost no extra round trip. Documents written before the
+    registry was enabled keep their client_name and are read unchanged.
+    
+    Client name filters are resolved against the cached names too, with the
+    whole catalog reloaded at most every refresh_interval seconds, so a
+    client registered by another process since the last reload can be
+    missed by a pattern that already matches other cached names.
+    """
+    
+    def __init__(
+        self,
+        get_collection: Callable[[str], ResilientCollection],
+        enabled: bool = False,
+        refresh_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.get_collection = get_collection
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._loaded_at: Optional[float] = None
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._registering: Dict[str, "asyncio.Task[int]"] = {}
+        self._indexes_ready = False
+        self.registered_total = 0
+        self.lookups_total = 0
+        self.cache_matches_total = 0
+    
+    def _remember(self, client_id: int, name: str):
+        name = sys.intern(name)
+        self._ids[name] = client_id
+        self._names[client_id] = name
+    
+    async def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        await self.get_collection("clients").create_index("name", unique=True)
+        await self.get_collection("status_checks").create_index("client_id")
+        self._indexes_ready = True
+    
+    async def id_for(self, name: str) -> int:
+        """Id of a client, registering the name on first use"""
+        client_id = self._ids.get(name)
+        if client_id is not None:
+            return client_id
+        # Concurrent first writes for one client share a single registration
+        task = self._registering.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._register(name))
+            self._registering[name] = task
+            task.add_done_callback(lambda _: self._registering.pop(name, None))
+        return await asyncio.shield(task)
+    
+    async def _register(self, name: str) -> int:
+        from pymongo import ReturnDocument
+        from pymongo.errors import DuplicateKeyError
+        
+        clients = self.get_collection("clients")
+        self.lookups_total += 1
+        existing = await clients.find_one({"name": name})
+        if existing is None:
+            await self.ensure_indexes()
+            counter = await self.get_collection("counters").find_one_and_update(
+                {"_id": "clients"}, {"$inc": {"seq": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+            try:
+                await clients.insert_one({"_id": counter["seq"], "name": name})
+                existing = {"_id": counter["seq"], "name": name}
+                self.registered_total += 1
+                logger.info("Registered client", client_id=counter["seq"])
+            except DuplicateKeyError:
+                # Another process registered the name first; its id wins
+                existing = await clients.find_one({"name": name})
+        self._remember(existing["_id"], existing["name"])
+        return existing["_id"]
+    
+    async def names_for(self, client_ids: Iterable[int]) -> Dict[int, str]:
+        """Names for many ids, fetching the uncached ones in one query"""
+        wanted = set(client_ids)
+        missing = [client_id for client_id in wanted if client_id not in self._names]
+        if missing:
+            self.lookups_total += 1
+            for client in await self.get_collection("clients").find_list({"_id": {"$in": missing}}):
+                self._remember(client["_id"], client["name"])
+        return {client_id: self._names[client_id] for client_id in wanted if client_id in self._names}
+    
+    async def _load_all(self):
+        self.lookups_total += 1
+        for client in await self.get_collection("clients").find_list({}):
+            self._remember(client["_id"], client["name"])
+        self._loaded_at = self._clock()
+    
+    async def ids_matching(self, pattern: str) -> List[int]:
+        """Ids of clients whose name matches a case-insensitive regex
+        
+        Matched against the cached names; only a pattern that matches none
+        of them, or that Python's re cannot compile, is sent to the database.
+        """
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            regex = None
+        if regex is not None:
+            if self._loaded_at is None or self._clock() - self._loaded_at >= self.refresh_interval:
+                await self._load_all()
+            matched = [client_id for name, client_id in self._ids.items() if regex.search(name)]
+            if matched:
+                self.cache_matches_total += 1
+                return matched
+        self.lookups_total += 1
+        clients = await self.get_collection("clients").find_list({"name": {"$regex": pattern, "$options": "i"}})
+        for client in clients:
+            self._remember(client["_id"], client["name"])
+        return [client["_id"] for client in clients]
+    
+    async def client_filter(self, pattern: str) -> Dict[str, Any]:
+        """Status check query for a client_name regex, covering both encodings"""
+        by_name = {"client_name": {"$regex": pattern, "$options": "i"}}
+        if not self.enabled:
+            return by_name
+        return {"$or": [by_name, {"client_id": {"$in": await self.ids_matching(pattern)}}]}
+    
+    async def encode(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Storage form of a status check: client_name replaced by client_id"""
+        if not self.enabled:
+            return document
+        stored = dict(document)
+        stored["client_id"] = await self.id_for(stored.pop("client_name"))
+        return stored
+    
+    async def hydrate(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Restore client_name on stored documents in place, in bulk"""
+        client_ids = {document["client_id"] for document in documents if "client_id" in document}
+        if not client_ids:
+            return documents
+        names = await self.names_for(client_ids)
+        if len(names) < len(client_ids):
+            logger.warning("Unknown client ids in status checks", client_ids=sorted(client_ids - names.keys()))
+        for document in documents:
+            client_id = document.pop("client_id", None)
+            if client_id is not None:
+                document.setdefault("client_name", names.get(client_id, str(client_id)))
+        return documents
+    
+    def clear(self):
+        """Forget cached mappings, e.g. after switching databases"""
+        self._ids.clear()
+        self._names.clear()
+        self._indexes_ready = False
+        self._loaded_at = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Registry cache state for the metrics endpoint"""
+        return {
+            "enabled": self.enabled,
+            "cached_clients": len(self._ids),
+            "registered_total": self.registered_total,
+            "lookups_total": self.lookups_total,
+            "cache_matches_total": self.cache_matches_total
+        }
@@ -0,0 +1,102 @@
+"""
+Request coalescing: single-flight execution plus a short-lived micro-cache
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Parameters whose values are regular expressions; case-folding them would
+# merge different patterns (\w and \W), so they are kept verbatim
+VERBATIM_PARAMS = frozenset({"client_name"})
+
+def normalize_query_key(name: str, **params: Any) -> Tuple:
+    """Build a cache key that is independent of parameter order and spelling
+    
+    Empty strings and None are treated alike, and string values other than
+    VERBATIM_PARAMS are case-folded.
+    """
+    normalized = []
+    for key in sorted(params):
+        value = params[key]
+        if value == "":
+            value = None
+        if isinstance(value, str) and key not in VERBATIM_PARAMS:
+            value = value.casefold()
+        normalized.append((key, value))
+    return (name, tuple(normalized))
+
+class QueryCoalescer:
+    """Share one in-flight load per key and serve repeats from a micro-cache
+    
+    Concurrent callers with the same key await the same task, so N identical
+    requests cost one database round trip and one serialization. Results are
+    then kept for ttl seconds (0 disables the cache, leaving only
+    single-flight). Failures are propagated to every waiter and never cached.
+    """
+    
+    def __init__(self, ttl: float = 1.0, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.requests_total = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.executed = 0
+    
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests_total += 1
+        
+        cached = self._lookup(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached[1]
+        
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            task = asyncio.ensure_future(loader())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._complete(key, t))
+        
+        # Shield so a disconnecting caller does not cancel the shared load
+        return await asyncio.shield(task)
+    
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+    
+    def _complete(self, key: Hashable, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if self.ttl <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        self._cache[key] = (self._clock() + self.ttl, task.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+    
+    def clear(self):
+        self._cache.clear()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Coalescing counters for the metrics endpoint"""
+        served_without_query = self.cache_hits + self.coalesced
+        return {
+            "ttl_ms": int(self.ttl * 1000),
+            "requests_total": self.requests_total,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "cached_entries": len(self._cache),
+            "coalescing_ratio": round(served_without_query / self.requests_total, 4) if self.requests_total else 0.0
+        }
@@ -2,13 +2,27 @@
 Production-ready configuration management
 """
 import os
+from pathlib import Path
 from typing import List, Optional
 from pydantic import BaseModel, validator
 from dotenv import load_dotenv
 import logging
 
-# Load environment variables
-load_dotenv()
+ROOT_DIR = Path(__file__).parent
+
+# Load environment variables from the backend directory. An explicit path skips
+# find_dotenv(), which inspects the call stack and walks parent directories.
+load_dotenv(ROOT_DIR / ".env")
+
+DB_STARTUP_MODES = ("blocking", "background")
+STATUS_STREAM_SOURCES = ("auto", "change_stream", "local")
+TRACING_EXPORTERS = ("file", "none")
+EXECUTOR_KINDS = ("thread", "process")
+STATUS_ID_STORAGE_MODES = ("string", "uuid")
+SERVER_LOOPS = ("auto", "asyncio", "uvloop")
+SERVER_HTTP_PARSERS = ("auto", "h11", "httptools")
+STORAGE_ENGINES = ("mongo", "sqlite", "memory")
+WRITE_CONCERN_TIERS = ("default", "telemetry", "standard", "durable")
 
 class Settings(BaseModel):
     """Application settings with validation"""
@@ -30,11 +44,110 @@ class Settings(BaseModel):
     # Logging settings
     log_level: str = "INFO"
     
+    # Server settings (python -m backend)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8001
+    server_workers: int = 1
+    server_loop: str = "auto"
+    server_http: str = "auto"
+    server_backlog: int = 2048
+    server_keep_alive_seconds: int = 65
+    server_limit_concurrency: int = 0
+    server_graceful_timeout_seconds: int = 30
+    server_h11_max_incomplete_event_size: int = 16384
+    server_access_log: bool = False
+    
+    # Static frontend settings
+    static_files_enabled: bool = False
+    static_files_dir: str = str(ROOT_DIR.parent / "build")
+    static_mount_path: str = "/"
+    static_memory_max_bytes: int = 262144
+    static_compress_min_bytes: int = 1024
+    
     # Performance settings
     max_connection_pool_size: int = 100
     min_connection_pool_size: int = 10
     
+    # Load management settings
+    rate_limit_per_minute: int = 120
+    concurrency_limit_enabled: bool = True
+    concurrency_initial_limit: int = 100
+    concurrency_min_limit: int = 10
+    concurrency_max_limit: int = 1000
+    concurrency_latency_target_ms: float = 250.0
+    
+    # Read path settings
+    status_cache_ttl_ms: int = 1000
+    batch_get_max_ids: int = 5000
+    batch_get_chunk_size: int = 1000
+    status_count_max_time_ms: int = 200
+    status_count_cache_ttl_seconds: float = 10.0
+    
+    # Live feed settings
+    status_stream_source: str = "auto"
+    status_stream_queue_size: int = 100
+    status_stream_replay_size: int = 1000
+    status_stream_max_subscribers: int = 10000
+    status_stream_heartbeat_seconds: float = 15.0
+    
+    # Resilience settings
+    db_operation_timeout: float = 2.0
+    db_read_retries: int = 2
+    db_breaker_failure_threshold: int = 5
+    db_breaker_recovery_timeout: float = 10.0
+    
+    # Startup settings
+    db_startup_mode: str = "blocking"
+    db_connect_retry_interval: float = 2.0
+    
+    # Storage settings
+    storage_engine: str = "mongo"
+    sqlite_path: str = str(ROOT_DIR / "status_checks.db")
+    client_registry_enabled: bool = False
+    client_registry_refresh_seconds: float = 60.0
+    status_id_storage: str = "string"
+    status_id_indexes: bool = False
+    status_write_concern: str = "default"
+    write_concern_header_tiers: List[str] = []
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_cache_size: int = 10000
+    
+    # Event loop monitoring settings
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_ms: float = 100.0
+    loop_block_threshold_ms: float = 100.0
+    
+    # Offload executor settings
+    executor_kind: str = "thread"
+    executor_max_workers: int = 4
+    executor_max_queue: int = 64
+    executor_offload_min_items: int = 200
+    
+    # Error logging settings
+    error_log_interval_seconds: float = 60.0
+    error_log_max_fingerprints: int = 1000
+    
+    # Profiling settings
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_secret: str = ""
+    profiling_buffer_size: int = 50
+    profiling_sample_interval_ms: float = 5.0
+    
+    # Memory diagnostics settings
+    memory_trace_on_startup: bool = False
+    memory_trace_frames: int = 1
+    memory_snapshot_limit: int = 5
+    
+    # Tracing settings
+    tracing_enabled: bool = False
+    tracing_sample_ratio: float = 1.0
+    tracing_exporter: str = "file"
+    tracing_file_path: str = "traces.jsonl"
+    tracing_service_name: str = "digital-intelligence-api"
+    
     # Security settings
+    admin_token: str = ""
     stripe_api_key: Optional[str] = None
     
     @validator('mongo_url')
@@ -49,6 +162,109 @@ class Settings(BaseModel):
             raise ValueError("DB_NAME is required")
         return v
     
+    @validator('db_startup_mode')
+    def validate_db_startup_mode(cls, v):
+        if v not in DB_STARTUP_MODES:
+            raise ValueError(f"DB_STARTUP_MODE must be one of {', '.join(DB_STARTUP_MODES)}")
+        return v
+    
+    @validator('status_cache_ttl_ms')
+    def validate_status_cache_ttl_ms(cls, v):
+        if v != 0 and not 100 <= v <= 5000:
+            raise ValueError("STATUS_CACHE_TTL_MS must be 0 (disabled) or between 100 and 5000")
+        return v
+    
+    @validator('batch_get_max_ids', 'batch_get_chunk_size')
+    def validate_batch_get_limits(cls, v):
+        if v < 1:
+            raise ValueError("BATCH_GET_MAX_IDS and BATCH_GET_CHUNK_SIZE must be at least 1")
+        return v
+    
+    @validator('status_count_max_time_ms')
+    def validate_status_count_max_time_ms(cls, v):
+        if v < 1:
+            raise ValueError("STATUS_COUNT_MAX_TIME_MS must be at least 1")
+        return v
+    
+    @validator('status_stream_source')
+    def validate_status_stream_source(cls, v):
+        if v not in STATUS_STREAM_SOURCES:
+            raise ValueError(f"STATUS_STREAM_SOURCE must be one of {', '.join(STATUS_STREAM_SOURCES)}")
+        return v
+    
+    @validator('server_loop')
+    def validate_server_loop(cls, v):
+        if v not in SERVER_LOOPS:
+            raise ValueError(f"SERVER_LOOP must be one of {', '.join(SERVER_LOOPS)}")
+        return v
+    
+    @validator('server_http')
+    def validate_server_http(cls, v):
+        if v not in SERVER_HTTP_PARSERS:
+            raise ValueError(f"SERVER_HTTP must be one of {', '.join(SERVER_HTTP_PARSERS)}")
+        return v
+    
+    @validator('storage_engine')
+    def validate_storage_engine(cls, v):
+        if v not in STORAGE_ENGINES:
+            raise ValueError(f"STORAGE_ENGINE must be one of {', '.join(STORAGE_ENGINES)}")
+        return v
+    
+    @validator('status_write_concern')
+    def validate_status_write_concern(cls, v):
+        if v not in WRITE_CONCERN_TIERS:
+            raise ValueError(f"STATUS_WRITE_CONCERN must be one of {', '.join(WRITE_CONCERN_TIERS)}")
+        return v
+    
+    @validator('write_concern_header_tiers')
+    def validate_write_concern_header_tiers(cls, v):
+        unknown = [tier for tier in v if tier not in WRITE_CONCERN_TIERS]
+        if unknown:
+            raise ValueError(f"WRITE_CONCERN_HEADER_TIERS entries must be among {', '.join(WRITE_CONCERN_TIERS)}")
+        return v
+    
+    @validator('static_mount_path')
+    def validate_static_mount_path(cls, v):
+        if not v.startswith("/"):
+            raise ValueError("STATIC_MOUNT_PATH must start with /")
+        return v if v.endswith("/") else v + "/"
+    
+    @validator('status_id_storage')
+    def validate_status_id_storage(cls, v):
+        if v not in STATUS_ID_STORAGE_MODES:
+            raise ValueError(f"STATUS_ID_STORAGE must be one of {', '.join(STATUS_ID_STORAGE_MODES)}")
+        return v
+    
+    @validator('executor_kind')
+    def validate_executor_kind(cls, v):
+        if v not in EXECUTOR_KINDS:
+            raise ValueError(f"EXECUTOR_KIND must be one of {', '.join(EXECUTOR_KINDS)}")
+        return v
+    
+    @validator('profiling_sample_rate')
+    def validate_profiling_sample_rate(cls, v):
+        if not 0.0 <= v <= 1.0:
+            raise ValueError("PROFILING_SAMPLE_RATE must be between 0 and 1")
+        return v
+    
+    @validator('memory_trace_frames')
+    def validate_memory_trace_frames(cls, v):
+        if not 1 <= v <= 100:
+            raise ValueError("MEMORY_TRACE_FRAMES must be between 1 and 100")
+        return v
+    
+    @validator('tracing_sample_ratio')
+    def validate_tracing_sample_ratio(cls, v):
+        if not 0.0 <= v <= 1.0:
+            raise ValueError("TRACING_SAMPLE_RATIO must be between 0 and 1")
+        return v
+    
+    @validator('tracing_exporter')
+    def validate_tracing_exporter(cls, v):
+        if v not in TRACING_EXPORTERS:
+            raise ValueError(f"TRACING_EXPORTER must be one of {', '.join(TRACING_EXPORTERS)}")
+        return v
+    
     @validator('cors_origins')
     def validate_cors_origins(cls, v):
         # In production, ensure no wildcard origins
@@ -69,7 +285,80 @@ def get_settings() -> Settings:
             stripe_api_key=os.getenv("STRIPE_API_KEY"),
             debug=os.getenv("DEBUG", "false").lower() == "true",
             log_level=os.getenv("LOG_LEVEL", "INFO"),
-            cors_origins=os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+            server_host=os.getenv("SERVER_HOST", "0.0.0.0"),
+            server_port=int(os.getenv("SERVER_PORT", "8001")),
+            server_workers=int(os.getenv("SERVER_WORKERS", "1")),
+            server_loop=os.getenv("SERVER_LOOP", "auto").lower(),
+            server_http=os.getenv("SERVER_HTTP", "auto").lower(),
+            server_backlog=int(os.getenv("SERVER_BACKLOG", "2048")),
+            server_keep_alive_seconds=int(os.getenv("SERVER_KEEP_ALIVE_SECONDS", "65")),
+            server_limit_concurrency=int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0")),
+            server_graceful_timeout_seconds=int(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30")),
+            server_h11_max_incomplete_event_size=int(os.getenv("SERVER_H11_MAX_INCOMPLETE_EVENT_SIZE", "16384")),
+            server_access_log=os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true",
+            static_files_enabled=os.getenv("STATIC_FILES_ENABLED", "false").lower() == "true",
+            static_files_dir=os.getenv("STATIC_FILES_DIR", str(ROOT_DIR.parent / "build")),
+            static_mount_path=os.getenv("STATIC_MOUNT_PATH", "/"),
+            static_memory_max_bytes=int(os.getenv("STATIC_MEMORY_MAX_BYTES", "262144")),
+            static_compress_min_bytes=int(os.getenv("STATIC_COMPRESS_MIN_BYTES", "1024")),
+            cors_origins=os.getenv("CORS_ORIGINS", "http://localhost:3000").split(","),
+            db_startup_mode=os.getenv("DB_STARTUP_MODE", "blocking").lower(),
+            db_connect_retry_interval=float(os.getenv("DB_CONNECT_RETRY_INTERVAL", "2.0")),
+            rate_limit_per_minute=int(os.getenv("RATE_LIMIT_PER_MINUTE", "120")),
+            concurrency_limit_enabled=os.getenv("CONCURRENCY_LIMIT_ENABLED", "true").lower() == "true",
+            concurrency_initial_limit=int(os.getenv("CONCURRENCY_INITIAL_LIMIT", "100")),
+            concurrency_min_limit=int(os.getenv("CONCURRENCY_MIN_LIMIT", "10")),
+            concurrency_max_limit=int(os.getenv("CONCURRENCY_MAX_LIMIT", "1000")),
+            concurrency_latency_target_ms=float(os.getenv("CONCURRENCY_LATENCY_TARGET_MS", "250")),
+            status_cache_ttl_ms=int(os.getenv("STATUS_CACHE_TTL_MS", "1000")),
+            batch_get_max_ids=int(os.getenv("BATCH_GET_MAX_IDS", "5000")),
+            batch_get_chunk_size=int(os.getenv("BATCH_GET_CHUNK_SIZE", "1000")),
+            status_count_max_time_ms=int(os.getenv("STATUS_COUNT_MAX_TIME_MS", "200")),
+            status_count_cache_ttl_seconds=float(os.getenv("STATUS_COUNT_CACHE_TTL_SECONDS", "10")),
+            status_stream_source=os.getenv("STATUS_STREAM_SOURCE", "auto").lower(),
+            status_stream_queue_size=int(os.getenv("STATUS_STREAM_QUEUE_SIZE", "100")),
+            status_stream_replay_size=int(os.getenv("STATUS_STREAM_REPLAY_SIZE", "1000")),
+            status_stream_max_subscribers=int(os.getenv("STATUS_STREAM_MAX_SUBSCRIBERS", "10000")),
+            status_stream_heartbeat_seconds=float(os.getenv("STATUS_STREAM_HEARTBEAT_SECONDS", "15")),
+            db_operation_timeout=float(os.getenv("DB_OPERATION_TIMEOUT", "2.0")),
+            db_read_retries=int(os.getenv("DB_READ_RETRIES", "2")),
+            db_breaker_failure_threshold=int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "5")),
+            db_breaker_recovery_timeout=float(os.getenv("DB_BREAKER_RECOVERY_TIMEOUT", "10.0")),
+            storage_engine=os.getenv("STORAGE_ENGINE", "mongo").lower(),
+            sqlite_path=os.getenv("SQLITE_PATH", str(ROOT_DIR / "status_checks.db")),
+            client_registry_enabled=os.getenv("CLIENT_REGISTRY_ENABLED", "false").lower() == "true",
+            client_registry_refresh_seconds=float(os.getenv("CLIENT_REGISTRY_REFRESH_SECONDS", "60")),
+            status_id_storage=os.getenv("STATUS_ID_STORAGE", "string").lower(),
+            status_id_indexes=os.getenv("STATUS_ID_INDEXES", "false").lower() == "true",
+            status_write_concern=os.getenv("STATUS_WRITE_CONCERN", "default").lower(),
+            write_concern_header_tiers=[
+                tier.strip().lower() for tier in os.getenv("WRITE_CONCERN_HEADER_TIERS", "").split(",") if tier.strip()
+            ],
+            idempotency_ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+            idempotency_cache_size=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+            loop_monitor_enabled=os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true",
+            loop_monitor_interval_ms=float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100")),
+            loop_block_threshold_ms=float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")),
+            executor_kind=os.getenv("EXECUTOR_KIND", "thread").lower(),
+            executor_max_workers=int(os.getenv("EXECUTOR_MAX_WORKERS", "4")),
+            executor_max_queue=int(os.getenv("EXECUTOR_MAX_QUEUE", "64")),
+            executor_offload_min_items=int(os.getenv("EXECUTOR_OFFLOAD_MIN_ITEMS", "200")),
+            error_log_interval_seconds=float(os.getenv("ERROR_LOG_INTERVAL_SECONDS", "60")),
+            error_log_max_fingerprints=int(os.getenv("ERROR_LOG_MAX_FINGERPRINTS", "1000")),
+            profiling_enabled=os.getenv("PROFILING_ENABLED", "false").lower() == "true",
+            profiling_sample_rate=float(os.getenv("PROFILING_SAMPLE_RATE", "0")),
+            profiling_secret=os.getenv("PROFILING_SECRET", ""),
+            profiling_buffer_size=int(os.getenv("PROFILING_BUFFER_SIZE", "50")),
+            profiling_sample_interval_ms=float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5")),
+            memory_trace_on_startup=os.getenv("MEMORY_TRACE_ON_STARTUP", "false").lower() == "true",
+            memory_trace_frames=int(os.getenv("MEMORY_TRACE_FRAMES", "1")),
+            memory_snapshot_limit=int(os.getenv("MEMORY_SNAPSHOT_LIMIT", "5")),
+            tracing_enabled=os.getenv("TRACING_ENABLED", "false").lower() == "true",
+            tracing_sample_ratio=float(os.getenv("TRACING_SAMPLE_RATIO", "1.0")),
+            tracing_exporter=os.getenv("TRACING_EXPORTER", "file").lower(),
+            tracing_file_path=os.getenv("TRACING_FILE_PATH", "traces.jsonl"),
+            tracing_service_name=os.getenv("TRACING_SERVICE_NAME", "digital-intelligence-api"),
+            admin_token=os.getenv("ADMIN_TOKEN", "")
         )
     except Exception as e:
         logging.error(f"Failed to load settings: {e}")
@@ -0,0 +1,77 @@
+"""
+Total counts for paginated status check lists
+"""
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import structlog
+from .coalescing import QueryCoalescer, normalize_query_key
+from .repository import StatusCheckRepository
+from .resilience import QueryTimeLimitExceeded
+
+logger = structlog.get_logger(__name__)
+
+# Strategies a request can ask for with total=
+COUNT_MODES = ("estimated", "exact")
+
+class TotalCount(NamedTuple):
+    """A total and how it was obtained: exact, estimated or at-least"""
+    value: int
+    kind: str
+    
+    def at_least(self, lower_bound: int) -> "TotalCount":
+        """Fold in what the page itself proves about the total"""
+        if self.kind != "at-least":
+            return self
+        return TotalCount(max(self.value, lower_bound), self.kind)
+
+class StatusCounter:
+    """Totals for GET /api/status, bounded in cost
+    
+    "estimated" uses the collection's metadata count when no filter is
+    given, which costs the same for any collection size; with a filter it
+    behaves like "exact". "exact" counts with a server-side time limit, and
+    a count that hits it turns into an "at-least" total bounded below by
+    the page. Totals are single-flight and cached per normalized filter and
+    strategy for ttl seconds, including timed-out counts, so a slow filter
+    is not rescanned by every page request.
+    """
+    
+    def __init__(
+        self,
+        get_repository: Callable[[], StatusCheckRepository],
+        max_time_ms: int = 200,
+        ttl: float = 10.0,
+        max_entries: int = 1024
+    ):
+        self.get_repository = get_repository
+        self.max_time_ms = max_time_ms
+        self.coalescer = QueryCoalescer(ttl=ttl, max_entries=max_entries)
+        self.counted: Dict[str, int] = {"exact": 0, "estimated": 0, "at-least": 0}
+    
+    async def total(self, client_name: Optional[str], mode: str) -> TotalCount:
+        """Total for a filter; call at_least() with the page's lower bound"""
+        key = normalize_query_key("status_count", client_name=client_name, mode=mode)
+        return await self.coalescer.get(key, lambda: self._count(client_name or None, mode))
+    
+    async def _count(self, client_name: Optional[str], mode: str) -> TotalCount:
+        repository = self.get_repository()
+        if mode == "estimated" and client_name is None:
+            total = TotalCount(await repository.estimated_count(), "estimated")
+        else:
+            try:
+                total = TotalCount(await repository.count(client_name, max_time_ms=self.max_time_ms), "exact")
+            except QueryTimeLimitExceeded:
+                logger.info("Exact count timed out", client_name=client_name, max_time_ms=self.max_time_ms)
+                total = TotalCount(0, "at-least")
+        self.counted[total.kind] += 1
+        return total
+    
+    def clear(self):
+        self.coalescer.clear()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Count strategy counters for the metrics endpoint"""
+        return {
+            "max_time_ms": self.max_time_ms,
+            "counted": dict(self.counted),
+            "cache": self.coalescer.snapshot()
+        }
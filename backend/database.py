@@ -1,36 +1,93 @@
 """
 Database utilities and connection management
 """
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
 import asyncio
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 import structlog
-from .config import settings
+from .config import WRITE_CONCERN_TIERS, settings
+from .exceptions import ServiceUnavailableError
+from .resilience import CircuitBreaker, ResilientCollection
+from .tracing import mongo_command_listener, tracer
+
+if TYPE_CHECKING:
+    # Motor and PyMongo are imported lazily in connect() to keep module import cheap
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 logger = structlog.get_logger(__name__)
 
+# WriteConcern options per tier; "default" keeps the client's (the deployment default)
+WRITE_CONCERN_OPTIONS: Dict[str, Optional[Dict[str, Any]]] = {
+    "default": None,
+    # Unacknowledged: the insert returns once it is on the socket
+    "telemetry": {"w": 0},
+    # Acknowledged by the primary, before the journal is flushed
+    "standard": {"w": 1, "j": False},
+    # Acknowledged by a majority, journaled
+    "durable": {"w": "majority", "j": True}
+}
+
+class WriteStats:
+    """Write counters and latency for one write concern tier"""
+    
+    __slots__ = ("writes_total", "errors_total", "seconds_total", "max_seconds")
+    
+    def __init__(self):
+        self.writes_total = 0
+        self.errors_total = 0
+        self.seconds_total = 0.0
+        self.max_seconds = 0.0
+    
+    def record(self, seconds: float, failed: bool):
+        self.writes_total += 1
+        self.errors_total += failed
+        self.seconds_total += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "writes_total": self.writes_total,
+            "errors_total": self.errors_total,
+            "mean_ms": round(self.seconds_total / self.writes_total * 1000, 3) if self.writes_total else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3)
+        }
+
 class DatabaseManager:
     """Production-ready database connection manager"""
     
     def __init__(self):
-        self.client: Optional[AsyncIOMotorClient] = None
-        self.database: Optional[AsyncIOMotorDatabase] = None
+        self.client: Optional["AsyncIOMotorClient"] = None
+        self.database: Optional["AsyncIOMotorDatabase"] = None
         self._connection_lock = asyncio.Lock()
+        self.breaker = CircuitBreaker(
+            name="mongodb",
+            failure_threshold=settings.db_breaker_failure_threshold,
+            recovery_timeout=settings.db_breaker_recovery_timeout
+        )
+        self.write_stats = {tier: WriteStats() for tier in WRITE_CONCERN_TIERS}
+        # Collections with a tier's write concern applied, rebuilt when the database changes
+        self._tiered: Dict[Tuple[str, str], Any] = {}
+        self._tiered_database: Optional[Any] = None
     
-    async def connect(self) -> AsyncIOMotorDatabase:
+    async def connect(self) -> "AsyncIOMotorDatabase":
         """Connect to MongoDB with production settings"""
         if self.database is not None:
             return self.database
+        
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
             
         async with self._connection_lock:
             if self.database is not None:
                 return self.database
                 
+            client = None
             try:
                 logger.info("Connecting to MongoDB", url=settings.mongo_url.split('@')[-1])  # Hide credentials
                 
-                self.client = AsyncIOMotorClient(
+                # Command spans for sampled traces
+                event_listeners = [mongo_command_listener(tracer)] if tracer.enabled else []
+                
+                client = AsyncIOMotorClient(
                     settings.mongo_url,
                     maxPoolSize=settings.max_connection_pool_size,
                     minPoolSize=settings.min_connection_pool_size,
@@ -38,24 +95,90 @@ class DatabaseManager:
                     serverSelectionTimeoutMS=5000,
                     connectTimeoutMS=10000,
                     retryWrites=True,
-                    retryReads=True
+                    retryReads=True,
+                    # Encode uuid.UUID as BSON binary subtype 4 (STATUS_ID_STORAGE=uuid)
+                    uuidRepresentation="standard",
+                    event_listeners=event_listeners
                 )
                 
-                # Test connection
-                await self.client.admin.command('ping')
+                # Test connection; the client is kept only once it answers
+                await client.admin.command('ping')
                 
-                self.database = self.client[settings.db_name]
+                self.client = client
+                self.database = client[settings.db_name]
                 logger.info("Successfully connected to MongoDB", database=settings.db_name)
                 
                 return self.database
                 
             except (ServerSelectionTimeoutError, ConnectionFailure) as e:
                 logger.error("Failed to connect to MongoDB", error=str(e))
+                self._discard(client)
                 raise
-            except Exception as e:
-                logger.error("Unexpected database connection error", error=str(e))
+            except BaseException as e:
+                if not isinstance(e, asyncio.CancelledError):
+                    logger.error("Unexpected database connection error", error=str(e))
+                self._discard(client)
                 raise
     
+    @staticmethod
+    def _discard(client):
+        """Close a client whose first ping failed, stopping its monitor threads"""
+        if client is not None:
+            client.close()
+    
+    async def connect_in_background(self, retry_interval: float = 2.0):
+        """Keep trying to connect until MongoDB is reachable
+        
+        Used when the application accepts traffic before the database is ready;
+        handlers answer 503 until this task has established the connection.
+        """
+        attempt = 0
+        while self.database is None:
+            attempt += 1
+            try:
+                await self.connect()
+            except Exception:
+                logger.warning("Database not ready, retrying", attempt=attempt, retry_in=retry_interval)
+                await asyncio.sleep(retry_interval)
+    
+    def collection(self, name: str, write_concern: str = "default") -> ResilientCollection:
+        """Get a collection wrapped with deadlines, retries and the circuit breaker
+        
+        Writes use the given tier's write concern (see WRITE_CONCERN_OPTIONS)
+        and are recorded in that tier's write_stats.
+        """
+        return ResilientCollection(
+            self._raw_collection(name, write_concern),
+            self.breaker,
+            timeout=settings.db_operation_timeout,
+            read_retries=settings.db_read_retries,
+            write_stats=self.write_stats[write_concern]
+        )
+    
+    def _raw_collection(self, name: str, write_concern: str) -> Any:
+        if self.database is None:
+            raise ServiceUnavailableError("Database not connected")
+        collection = getattr(self.database, name)
+        options = WRITE_CONCERN_OPTIONS[write_concern]
+        if options is None or collection is None:
+            return collection
+        if self._tiered_database is not self.database:
+            self._tiered.clear()
+            self._tiered_database = self.database
+        tiered = self._tiered.get((name, write_concern))
+        if tiered is None:
+            from pymongo import WriteConcern
+            tiered = collection.with_options(write_concern=WriteConcern(**options))
+            self._tiered[(name, write_concern)] = tiered
+        return tiered
+    
+    def write_concern_snapshot(self) -> Dict[str, Any]:
+        """Write concern tiers and their write counters for the metrics endpoint"""
+        return {
+            tier: {"write_concern": WRITE_CONCERN_OPTIONS[tier] or "client default", **stats.snapshot()}
+            for tier, stats in self.write_stats.items()
+        }
+    
     async def disconnect(self):
         """Gracefully disconnect from MongoDB"""
         if self.client:
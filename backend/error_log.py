@@ -0,0 +1,123 @@
+"""
+Throttled, deduplicated error logging
+"""
+import asyncio
+import hashlib
+import time
+import traceback
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict
+import structlog
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+def exception_fingerprint(exc: BaseException, frames: int = 3) -> str:
+    """Short digest of the exception type and the innermost frames it was raised from
+    
+    Walks the traceback objects without formatting them or reading source
+    lines, so fingerprinting costs a few microseconds even for deep stacks.
+    """
+    innermost = deque(
+        (
+            (frame.f_code.co_filename, frame.f_code.co_name, lineno)
+            for frame, lineno in traceback.walk_tb(exc.__traceback__)
+        ),
+        maxlen=frames
+    )
+    key = f"{type(exc).__module__}.{type(exc).__qualname__}{list(innermost)}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+class _FingerprintState:
+    __slots__ = ("logged_at", "suppressed", "error_type", "message", "log_level")
+    
+    def __init__(self, logged_at: float, error_type: str, message: str, log_level: str):
+        self.logged_at = logged_at
+        self.suppressed = 0
+        self.error_type = error_type
+        self.message = message
+        self.log_level = log_level
+
+class ErrorLogThrottle:
+    """Allow one full log entry per error fingerprint per interval
+    
+    Repeats inside the interval are only counted; run() logs one summary line
+    per fingerprint with the number of suppressed repeats every interval, so
+    an outage that fails every request produces a handful of lines instead of
+    a formatted traceback per request. An interval of 0 logs everything.
+    """
+    
+    def __init__(
+        self,
+        interval: float = 60.0,
+        max_fingerprints: int = 1000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.interval = interval
+        self.max_fingerprints = max_fingerprints
+        self._clock = clock
+        self._states: "OrderedDict[str, _FingerprintState]" = OrderedDict()
+        self.logged_total = 0
+        self.suppressed_total = 0
+    
+    def should_log(self, fingerprint: str, error_type: str = "", message: str = "", log_level: str = "error") -> bool:
+        """Record an occurrence; True if it should be logged in full"""
+        if self.interval <= 0:
+            self.logged_total += 1
+            return True
+        
+        now = self._clock()
+        state = self._states.get(fingerprint)
+        if state is None:
+            self._states[fingerprint] = _FingerprintState(now, error_type, message, log_level)
+            while len(self._states) > self.max_fingerprints:
+                self._report(*self._states.popitem(last=False))
+        elif now - state.logged_at >= self.interval:
+            self._report(fingerprint, state)
+            state.logged_at = now
+            self._states.move_to_end(fingerprint)
+        else:
+            state.suppressed += 1
+            self.suppressed_total += 1
+            return False
+        self.logged_total += 1
+        return True
+    
+    def _report(self, fingerprint: str, state: _FingerprintState):
+        if state.suppressed:
+            log_func = getattr(logger, state.log_level, logger.error)
+            log_func(
+                "Suppressed repeated errors",
+                fingerprint=fingerprint,
+                error_type=state.error_type,
+                error_message=state.message,
+                suppressed=state.suppressed,
+                interval_seconds=self.interval
+            )
+            state.suppressed = 0
+    
+    def flush(self):
+        """Log the suppressed counts collected so far"""
+        for fingerprint, state in self._states.items():
+            self._report(fingerprint, state)
+    
+    async def run(self):
+        """Log summaries every interval until cancelled"""
+        while True:
+            await asyncio.sleep(self.interval)
+            self.flush()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Error log throttling state for the metrics endpoint"""
+        return {
+            "interval_seconds": self.interval,
+            "fingerprints": len(self._states),
+            "logged_total": self.logged_total,
+            "suppressed_total": self.suppressed_total,
+            "suppressed_pending": sum(state.suppressed for state in self._states.values())
+        }
+
+error_log_throttle = ErrorLogThrottle(
+    interval=settings.error_log_interval_seconds,
+    max_fingerprints=settings.error_log_max_fingerprints
+)
@@ -3,12 +3,15 @@ Production-ready error handling and exceptions
 """
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+from functools import lru_cache
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+import json
 import structlog
 import traceback
 import uuid
 from datetime import datetime
+from .error_log import error_log_throttle, exception_fingerprint
 
 logger = structlog.get_logger(__name__)
 
@@ -27,9 +30,10 @@ class APIError(HTTPException):
         status_code: int,
         message: str,
         details: Optional[Dict[str, Any]] = None,
-        log_level: str = "error"
+        log_level: str = "error",
+        headers: Optional[Dict[str, str]] = None
     ):
-        super().__init__(status_code=status_code, detail=message)
+        super().__init__(status_code=status_code, detail=message, headers=headers)
         self.message = message
         self.details = details
         self.log_level = log_level
@@ -62,67 +66,116 @@ class AuthorizationError(APIError):
     def __init__(self, message: str = "Access denied"):
         super().__init__(status_code=403, message=message, log_level="warning")
 
+class ConflictError(APIError):
+    """Conflicting concurrent request error"""
+    def __init__(self, message: str = "Request conflicts with one in progress", retry_after: int = 1):
+        super().__init__(
+            status_code=409,
+            message=message,
+            log_level="warning",
+            headers={"Retry-After": str(retry_after)}
+        )
+
 class RateLimitError(APIError):
     """Rate limit exceeded error"""
     def __init__(self, message: str = "Rate limit exceeded"):
         super().__init__(status_code=429, message=message, log_level="warning")
 
+class ServiceUnavailableError(APIError):
+    """Service temporarily unavailable error"""
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = 5):
+        super().__init__(
+            status_code=503,
+            message=message,
+            log_level="warning",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class CircuitOpenError(ServiceUnavailableError):
+    """Circuit breaker open error"""
+    def __init__(self, message: str = "Database temporarily unavailable", retry_after: int = 5):
+        super().__init__(message=message, retry_after=retry_after)
+
+class SerializedJSONResponse(JSONResponse):
+    """JSONResponse whose content is already encoded"""
+    
+    def render(self, content: bytes) -> bytes:
+        return content
+
+def _dumps(value: Any) -> bytes:
+    # Same encoding as JSONResponse.render
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+@lru_cache(maxsize=256)
+def _error_body_parts(error: str, message: str) -> Tuple[bytes, bytes]:
+    """ErrorResponse JSON before the request_id and after the timestamp"""
+    head = b'{"error":' + _dumps(error) + b',"message":' + _dumps(message) + b',"request_id":'
+    return head, b'","details":null}'
+
+def error_response(
+    status_code: int,
+    error: str,
+    message: str,
+    request_id: str,
+    details: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> JSONResponse:
+    """ErrorResponse body, spliced from cached parts unless it carries details"""
+    timestamp = datetime.utcnow().isoformat()
+    if details is not None:
+        error_body = ErrorResponse(
+            error=error,
+            message=message,
+            request_id=request_id,
+            timestamp=timestamp,
+            details=details
+        )
+        return JSONResponse(status_code=status_code, content=error_body.dict(), headers=headers)
+    
+    head, tail = _error_body_parts(error, message)
+    body = b"".join((head, _dumps(request_id), b',"timestamp":"', timestamp.encode(), tail))
+    return SerializedJSONResponse(body, status_code=status_code, headers=headers)
+
 async def api_error_handler(request: Request, exc: APIError) -> JSONResponse:
     """Handle custom API errors"""
     request_id = getattr(request.state, "request_id", str(uuid.uuid4()))
+    error = type(exc).__name__
     
-    # Log the error
-    log_func = getattr(logger, exc.log_level, logger.error)
-    log_func(
-        "API error",
-        status_code=exc.status_code,
-        message=exc.message,
-        request_id=request_id,
-        path=request.url.path,
-        method=request.method,
-        details=exc.details
-    )
-    
-    error_response = ErrorResponse(
-        error=type(exc).__name__,
-        message=exc.message,
-        request_id=request_id,
-        timestamp=datetime.utcnow().isoformat(),
-        details=exc.details
-    )
+    # Log the error; server-side failures repeat for every request during an
+    # outage, so only the first per interval is logged for each error type
+    if exc.status_code < 500 or error_log_throttle.should_log(
+        f"{error}:{exc.status_code}", error, exc.message, exc.log_level
+    ):
+        log_func = getattr(logger, exc.log_level, logger.error)
+        log_func(
+            "API error",
+            status_code=exc.status_code,
+            message=exc.message,
+            details=exc.details
+        )
     
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=error_response.dict()
-    )
+    return error_response(exc.status_code, error, exc.message, request_id, exc.details, exc.headers)
 
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle unexpected exceptions"""
     request_id = getattr(request.state, "request_id", str(uuid.uuid4()))
     
-    # Log the full traceback for debugging
-    logger.error(
-        "Unhandled exception",
-        request_id=request_id,
-        path=request.url.path,
-        method=request.method,
-        error_type=type(exc).__name__,
-        error_message=str(exc),
-        traceback=traceback.format_exc()
-    )
+    # Log the full traceback for debugging, once per fingerprint and interval
+    fingerprint = exception_fingerprint(exc)
+    if error_log_throttle.should_log(fingerprint, type(exc).__name__, str(exc)):
+        logger.error(
+            "Unhandled exception",
+            request_id=request_id,
+            path=request.url.path,
+            method=request.method,
+            error_type=type(exc).__name__,
+            error_message=str(exc),
+            fingerprint=fingerprint,
+            traceback="".join(traceback.format_exception(exc))
+        )
     
     # Don't expose internal errors in production
-    error_response = ErrorResponse(
-        error="InternalServerError",
-        message="An internal server error occurred",
-        request_id=request_id,
-        timestamp=datetime.utcnow().isoformat()
-    )
-    
-    return JSONResponse(
-        status_code=500,
-        content=error_response.dict()
-    )
+    return error_response(500, "InternalServerError", "An internal server error occurred", request_id)
 
 async def validation_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle Pydantic validation errors"""
@@ -130,21 +183,10 @@ async def validation_exception_handler(request: Request, exc: Exception) -> JSON
     
     logger.warning(
         "Validation error",
-        request_id=request_id,
-        path=request.url.path,
-        method=request.method,
         errors=str(exc)
     )
     
-    error_response = ErrorResponse(
-        error="ValidationError",
-        message="Request validation failed",
-        request_id=request_id,
-        timestamp=datetime.utcnow().isoformat(),
+    return error_response(
+        422, "ValidationError", "Request validation failed", request_id,
         details={"validation_errors": str(exc)}
-    )
-    
-    return JSONResponse(
-        status_code=422,
-        content=error_response.dict()
     )
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Managed executor pool for CPU-bound response building
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+import structlog
+from .config import EXECUTOR_KINDS
+from .exceptions import ServiceUnavailableError
+from .loop_monitor import LagHistogram
+
+logger = structlog.get_logger(__name__)
+
+# Upper bounds (ms) of the queue wait histogram buckets
+QUEUE_WAIT_BUCKETS_MS: Sequence[float] = (0.1, 0.5, 1, 5, 10, 25, 50, 100, 250, 1000)
+
+def _timed_call(fn: Callable, args: Tuple) -> Tuple[float, float, Any]:
+    """Run fn in the worker and report when it started and finished
+    
+    time.monotonic is system-wide, so the timestamps are comparable with the
+    submitting loop's clock for process workers too.
+    """
+    started = time.monotonic()
+    result = fn(*args)
+    return started, time.monotonic(), result
+
+class OffloadExecutor:
+    """Bounded thread or process pool owned by the application lifespan
+    
+    At most max_workers calls run at once; up to max_queue more wait for a
+    free worker on the event loop, and calls beyond that are rejected with a
+    503 instead of piling up. Work smaller than min_items runs inline, where
+    the hand-off would cost more than it saves. Before start() and after
+    shutdown() everything runs inline.
+    """
+    
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        min_items: int = 200
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(EXECUTOR_KINDS)}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.min_items = min_items
+        self.queue_wait = LagHistogram(QUEUE_WAIT_BUCKETS_MS)
+        self.in_flight = 0
+        self.queued = 0
+        self.offloaded_total = 0
+        self.inline_total = 0
+        self.rejected_total = 0
+        self.run_seconds_total = 0.0
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+    
+    def start(self):
+        """Create the pool; call from lifespan startup"""
+        if self._pool is not None or self.max_workers <= 0:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="offload")
+        self._slots = asyncio.Semaphore(self.max_workers)
+        logger.info("Offload executor started", kind=self.kind, max_workers=self.max_workers)
+    
+    def shutdown(self, wait: bool = True):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+    
+    def should_offload(self, size: Optional[int]) -> bool:
+        """Whether work of this many items is worth sending to the pool"""
+        return self._pool is not None and (size is None or size >= self.min_items)
+    
+    async def run(self, fn: Callable, *args: Any, size: Optional[int] = None) -> Any:
+        """Call fn(*args) in the pool, or inline when size is below min_items
+        
+        With the process pool, fn must be a module-level function and its
+        arguments and result picklable.
+        """
+        if not self.should_offload(size):
+            self.inline_total += 1
+            return fn(*args)
+        
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected_total += 1
+            raise ServiceUnavailableError("Server busy, please retry", retry_after=1)
+        
+        submitted = time.monotonic()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        
+        self.in_flight += 1
+        try:
+            started, finished, result = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _timed_call, fn, args
+            )
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        
+        self.offloaded_total += 1
+        self.queue_wait.observe((started - submitted) * 1000)
+        self.run_seconds_total += finished - started
+        return result
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Pool occupancy and queue wait for the metrics endpoint"""
+        return {
+            "running": self.running,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "min_items": self.min_items,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "offloaded_total": self.offloaded_total,
+            "inline_total": self.inline_total,
+            "rejected_total": self.rejected_total,
+            "run_seconds_total": round(self.run_seconds_total, 6),
+            "queue_wait": self.queue_wait.snapshot()
+        }
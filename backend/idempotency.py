@@ -0,0 +1,210 @@
+"""
+Idempotency-Key handling for retried writes
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import structlog
+from .exceptions import ConflictError, ValidationError
+from .resilience import ResilientCollection
+
+logger = structlog.get_logger(__name__)
+
+def request_fingerprint(*parts: str) -> str:
+    """Digest identifying the request a key was first used with"""
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+class StoredResponse:
+    """Response kept for an idempotency key"""
+    
+    __slots__ = ("status_code", "body", "fingerprint", "expires_at")
+    
+    def __init__(self, status_code: int, body: bytes, fingerprint: str, expires_at: float):
+        self.status_code = status_code
+        self.body = body
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+class IdempotencyStore:
+    """Run a write once per Idempotency-Key and replay its response
+    
+    A replay found in the in-process cache is answered without touching the
+    database, and concurrent duplicates within one process wait for the
+    first request's result. Across processes, the key is claimed by
+    inserting it as the _id of a document in the idempotency_keys
+    collection: the unique index lets exactly one request run the write,
+    later ones replay the stored response or get 409 while it is still in
+    progress. Claims whose request failed are released so the client can
+    retry; claims left pending longer than lock_timeout (a crashed worker)
+    are taken over. Keys expire after ttl, via a TTL index in MongoDB.
+    Without get_collection (single-node storage engines) keys are only kept
+    in process.
+    """
+    
+    def __init__(
+        self,
+        get_collection: Optional[Callable[[str], ResilientCollection]],
+        ttl: float = 86400.0,
+        max_entries: int = 10000,
+        lock_timeout: float = 30.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.get_collection = get_collection
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock_timeout = lock_timeout
+        self._clock = clock
+        self._cache: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Task[Tuple[StoredResponse, bool]]"] = {}
+        self._indexes_ready = False
+        self.executed_total = 0
+        self.replayed_total = 0
+        self.conflicts_total = 0
+    
+    def _now(self) -> datetime:
+        # Naive UTC, as MongoDB returns created_at
+        return datetime.utcfromtimestamp(self._clock())
+    
+    def _lookup(self, key: str) -> Optional[StoredResponse]:
+        stored = self._cache.get(key)
+        if stored is None:
+            return None
+        if stored.expires_at <= self._clock():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return stored
+    
+    def _remember(self, key: str, stored: StoredResponse):
+        self._cache[key] = stored
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+    
+    def _check(self, stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise ValidationError("Idempotency-Key was already used with a different request")
+        return stored
+    
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[Tuple[int, bytes]]]
+    ) -> Tuple[StoredResponse, bool]:
+        """Return (response, replayed), running produce at most once per key"""
+        stored = self._lookup(key)
+        if stored is not None:
+            self.replayed_total += 1
+            return self._check(stored, fingerprint), True
+        
+        task = self._in_flight.get(key)
+        if task is not None:
+            stored, _ = await asyncio.shield(task)
+            self.replayed_total += 1
+            return self._check(stored, fingerprint), True
+        
+        # Shielded so a client disconnecting mid-write cannot leave the key claimed
+        task = asyncio.ensure_future(self._execute_once(key, fingerprint, produce))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    async def _execute_once(
+        self,
+        key: str,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[Tuple[int, bytes]]]
+    ) -> Tuple[StoredResponse, bool]:
+        collection = None
+        if self.get_collection is not None:
+            collection = self.get_collection("idempotency_keys")
+            existing = await self._claim(collection, key, fingerprint)
+            if existing is not None:
+                stored = StoredResponse(
+                    existing["status_code"], existing["body"], existing["fingerprint"], self._expires_at(existing)
+                )
+                self._remember(key, stored)
+                self.replayed_total += 1
+                return self._check(stored, fingerprint), True
+        
+        try:
+            status_code, body = await produce()
+        except BaseException:
+            # Nothing was stored for this key; let the client retry it
+            if collection is not None:
+                with suppress(Exception):
+                    await collection.delete_one({"_id": key, "state": "pending"})
+            raise
+        
+        stored = StoredResponse(status_code, body, fingerprint, self._clock() + self.ttl)
+        self._remember(key, stored)
+        self.executed_total += 1
+        if collection is None:
+            return stored, False
+        try:
+            await collection.update_one(
+                {"_id": key}, {"$set": {"state": "completed", "status_code": status_code, "body": body}}
+            )
+        except Exception as e:
+            # The write happened; other processes see the claim as pending until lock_timeout
+            logger.warning("Failed to store idempotent response", error=str(e))
+        return stored, False
+    
+    async def _claim(self, collection: ResilientCollection, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Claim the key; returns the completed record if another request already ran"""
+        from pymongo.errors import DuplicateKeyError
+        
+        await self.ensure_indexes(collection)
+        for _ in range(2):
+            now = self._now()
+            try:
+                await collection.insert_one(
+                    {"_id": key, "fingerprint": fingerprint, "state": "pending", "created_at": now}
+                )
+                return None
+            except DuplicateKeyError:
+                existing = await collection.find_one({"_id": key})
+            if existing is None:
+                continue
+            age = (now - existing["created_at"]).total_seconds()
+            if age >= self.ttl or (existing["state"] == "pending" and age >= self.lock_timeout):
+                # Expired but not yet removed by the TTL monitor, or abandoned
+                await collection.delete_one({"_id": key, "created_at": existing["created_at"]})
+                continue
+            if existing["fingerprint"] != fingerprint:
+                raise ValidationError("Idempotency-Key was already used with a different request")
+            if existing["state"] != "completed":
+                self.conflicts_total += 1
+                raise ConflictError("A request with this Idempotency-Key is still in progress", retry_after=1)
+            return existing
+        self.conflicts_total += 1
+        raise ConflictError("A request with this Idempotency-Key is still in progress", retry_after=1)
+    
+    def _expires_at(self, record: Dict[str, Any]) -> float:
+        age = (self._now() - record["created_at"]).total_seconds()
+        return self._clock() + max(0.0, self.ttl - age)
+    
+    async def ensure_indexes(self, collection: ResilientCollection):
+        if self._indexes_ready:
+            return
+        await collection.create_index("created_at", expireAfterSeconds=int(self.ttl))
+        self._indexes_ready = True
+    
+    def clear(self):
+        self._cache.clear()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Idempotency cache state for the metrics endpoint"""
+        return {
+            "cached_keys": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "executed_total": self.executed_total,
+            "replayed_total": self.replayed_total,
+            "conflicts_total": self.conflicts_total,
+            "ttl_seconds": self.ttl
+        }
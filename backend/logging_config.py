@@ -4,26 +4,52 @@ Production-ready logging configuration
 import logging
 import structlog
 import sys
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional, TextIO
 from datetime import datetime
+from .profiling import ProfiledLoggingMixin
+from .error_log import error_log_throttle, exception_fingerprint
 
-def configure_logging(log_level: str = "INFO", app_name: str = "app") -> structlog.stdlib.BoundLogger:
+# Lowest level the application loggers emit, set by configure_logging
+_enabled_level = logging.INFO
+
+@lru_cache(maxsize=None)
+def make_bound_logger_class(level: int) -> type:
+    """Bound logger class that drops calls below level before any processing"""
+    return type("BoundLogger", (ProfiledLoggingMixin, structlog.make_filtering_bound_logger(level)), {})
+
+def configure_logging(
+    log_level: str = "INFO",
+    app_name: str = "app",
+    stream: Optional[TextIO] = None
+) -> structlog.stdlib.BoundLogger:
     """Configure structured logging for production"""
+    global _enabled_level
+    
+    level = getattr(logging, log_level.upper())
+    _enabled_level = level
     
-    # Configure standard library logging
+    # Configure standard library logging; an explicit stream replaces the
+    # handlers installed by an earlier call
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper())
+        stream=stream or sys.stdout,
+        level=level,
+        force=stream is not None
     )
     
-    # Configure structlog
+    # Configure structlog. The level is checked by the bound logger before the
+    # processors run, and cache_logger_on_first_use binds each logger to this
+    # processor chain once instead of resolving the configuration per call.
+    # Rendered lines go out through stdlib logging, so its handlers (and
+    # pytest's caplog) see them. Request context (request_id, method, path,
+    # trace ids) is bound once per request with structlog.contextvars and
+    # merged in by merge_contextvars.
     structlog.configure(
         processors=[
-            structlog.stdlib.filter_by_level,
+            structlog.contextvars.merge_contextvars,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
@@ -31,6 +57,7 @@ def configure_logging(log_level: str = "INFO", app_name: str = "app") -> structl
             structlog.processors.JSONRenderer()
         ],
         context_class=dict,
+        wrapper_class=make_bound_logger_class(level),
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
@@ -50,16 +77,22 @@ def log_request_middleware(request_id: str, method: str, path: str, **kwargs) ->
     }
 
 def log_error(logger: structlog.stdlib.BoundLogger, error: Exception, context: Dict[str, Any] = None):
-    """Log errors with context"""
-    error_context = {
-        "error_type": type(error).__name__,
-        "error_message": str(error),
+    """Log errors with context, once per exception fingerprint and interval"""
+    fingerprint = exception_fingerprint(error)
+    if not error_log_throttle.should_log(fingerprint, type(error).__name__, str(error)):
+        return
+    logger.error(
+        "Application error",
+        error_type=type(error).__name__,
+        error_message=str(error),
+        fingerprint=fingerprint,
         **(context or {})
-    }
-    logger.error("Application error", **error_context)
+    )
 
 def log_performance(logger: structlog.stdlib.BoundLogger, operation: str, duration: float, **kwargs):
     """Log performance metrics"""
+    if _enabled_level > logging.INFO:
+        return
     logger.info(
         "Performance metric",
         operation=operation,
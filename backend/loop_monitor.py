@@ -0,0 +1,202 @@
+"""
+Event loop lag monitoring and blocking call detection
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is unbounded
+LAG_BUCKETS_MS: Sequence[float] = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Frames of a blocked stack kept in reports
+MAX_STACK_FRAMES = 20
+
+class LagHistogram:
+    """Cumulative histogram of loop lag samples"""
+    
+    def __init__(self, buckets_ms: Sequence[float] = LAG_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, lag_ms: float):
+        for index, bound in enumerate(self.buckets_ms):
+            if lag_ms <= bound:
+                break
+        else:
+            index = len(self.buckets_ms)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip([*map(str, self.buckets_ms), "+Inf"], self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": buckets
+        }
+
+def format_stack(frame: Any, limit: int = MAX_STACK_FRAMES) -> List[str]:
+    """Innermost-last 'file:line in function' lines for a frame"""
+    summary = traceback.extract_stack(frame)[-limit:]
+    return [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in summary]
+
+class LoopMonitor:
+    """Measure event loop lag and report what is blocking the loop
+    
+    A coroutine sleeps for interval and records how late it wakes up. A
+    watchdog thread checks that coroutine's heartbeat; once the loop has not
+    run it for longer than the threshold, the watchdog captures the loop
+    thread's stack and the running task while the blocking call is still in
+    progress, logs it and keeps it in a short list of recent stalls.
+    """
+    
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.1,
+        max_reports: int = 20,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.enabled = enabled
+        self.histogram = LagHistogram()
+        self.stalls_total = 0
+        self.recent_stalls: Deque[Dict[str, Any]] = deque(maxlen=max_reports)
+        self._clock = clock
+        self._heartbeat = clock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+    
+    def start(self):
+        """Start sampling on the running loop; call from lifespan startup"""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = self._clock()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+    
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+    
+    async def _sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = self._clock()
+            self.histogram.observe(lag * 1000)
+    
+    def _watch(self):
+        reported_heartbeat = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = self._clock() - heartbeat - self.interval
+            if blocked_for > self.threshold and heartbeat != reported_heartbeat:
+                # One report per stall; the next heartbeat re-arms the watchdog
+                reported_heartbeat = heartbeat
+                self.report_stall(blocked_for)
+    
+    def report_stall(self, blocked_for: float):
+        """Capture and log what the loop thread is running right now"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        task = asyncio.current_task(self._loop)
+        stall = {
+            "detected_at": time.time(),
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "task": task.get_name() if task is not None else None,
+            "coroutine": getattr(task.get_coro(), "__qualname__", None) if task is not None else None,
+            "stack": format_stack(frame) if frame is not None else []
+        }
+        self.stalls_total += 1
+        self.recent_stalls.append(stall)
+        logger.warning("Event loop blocked", **stall)
+        return stall
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Lag histogram and recent stalls for the metrics endpoint"""
+        return {
+            "enabled": self.enabled,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "lag": self.histogram.snapshot(),
+            "stalls_total": self.stalls_total,
+            "recent_stalls": list(self.recent_stalls)
+        }
+
+class SlowCallbackRecorder(logging.Handler):
+    """Collect asyncio debug mode's "Executing ... took N seconds" warnings"""
+    
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.slow_callbacks: List[str] = []
+    
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith("Executing "):
+            self.slow_callbacks.append(message)
+
+@contextmanager
+def detect_blocking_calls(threshold: float = 0.1, loop: Optional[asyncio.AbstractEventLoop] = None) -> Iterator[List[str]]:
+    """Run the enclosed block with asyncio debug mode reporting slow callbacks
+    
+    Yields a list that collects a description of every callback or task step
+    that held the loop longer than threshold, e.g. for tests asserting a code
+    path never blocks. Must be entered from inside the event loop when no
+    loop is given.
+    """
+    loop = loop or asyncio.get_running_loop()
+    asyncio_logger = logging.getLogger("asyncio")
+    recorder = SlowCallbackRecorder()
+    previous = (loop.get_debug(), loop.slow_callback_duration, asyncio_logger.level)
+    
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold
+    asyncio_logger.addHandler(recorder)
+    if asyncio_logger.getEffectiveLevel() > logging.WARNING:
+        asyncio_logger.setLevel(logging.WARNING)
+    try:
+        yield recorder.slow_callbacks
+    finally:
+        asyncio_logger.removeHandler(recorder)
+        loop.set_debug(previous[0])
+        loop.slow_callback_duration = previous[1]
+        asyncio_logger.setLevel(previous[2])
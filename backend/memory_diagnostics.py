@@ -0,0 +1,160 @@
+"""
+On-demand memory diagnostics: tracemalloc snapshots, GC and object counts
+"""
+import gc
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# How allocation statistics can be grouped (tracemalloc key types)
+GROUP_BY = ("lineno", "filename", "traceback")
+
+# Allocations made by the diagnostics themselves are left out of reports
+_SELF_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+class MemorySnapshot:
+    """A tracemalloc snapshot with when it was taken and what was traced"""
+    
+    def __init__(self, snapshot: tracemalloc.Snapshot, traced_bytes: int, peak_bytes: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.taken_at = time.time()
+        self.snapshot = snapshot.filter_traces(_SELF_FILTERS)
+        self.traced_bytes = traced_bytes
+        self.peak_bytes = peak_bytes
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "taken_at": self.taken_at,
+            "traced_bytes": self.traced_bytes,
+            "peak_bytes": self.peak_bytes,
+            "traceback_limit": self.snapshot.traceback_limit
+        }
+    
+    def top(self, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+        """Largest allocation sites"""
+        statistics = self.snapshot.statistics(group_by)
+        return [
+            {"site": format_site(stat.traceback, group_by), "size_bytes": stat.size, "count": stat.count}
+            for stat in statistics[:limit]
+        ]
+    
+    def compare_to(self, base: "MemorySnapshot", group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+        """Allocation sites that grew or shrank the most since base"""
+        statistics = self.snapshot.compare_to(base.snapshot, group_by)
+        return [
+            {
+                "site": format_site(stat.traceback, group_by),
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff
+            }
+            for stat in statistics[:limit]
+            if stat.size_diff or stat.count_diff
+        ]
+
+def format_site(traceback: tracemalloc.Traceback, group_by: str) -> Any:
+    """'file:line' for a site, or its frames innermost-last when grouped by traceback"""
+    if group_by == "filename":
+        return traceback[0].filename
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+    return frames if group_by == "traceback" else frames[0]
+
+def gc_stats() -> Dict[str, Any]:
+    """Collector counters per generation; cheap enough for every metrics call"""
+    return {
+        "enabled": gc.isenabled(),
+        "counts": list(gc.get_count()),
+        "thresholds": list(gc.get_threshold()),
+        "generations": gc.get_stats(),
+        "garbage": len(gc.garbage)
+    }
+
+def object_counts(limit: int = 30) -> List[Dict[str, Any]]:
+    """Live objects tracked by the collector, by type, most numerous first
+    
+    Walks every tracked object, so it costs time proportional to the heap;
+    run it off the event loop.
+    """
+    counts = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+    return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+class MemoryDiagnostics:
+    """Starts and stops tracemalloc and keeps recent snapshots
+    
+    Nothing is traced until start(), so a running service pays nothing for
+    this until someone asks. While tracing, every allocation records up to
+    frames stack frames, which costs CPU and memory; stop() ends that and
+    drops the snapshots. At most max_snapshots are kept, oldest dropped
+    first.
+    """
+    
+    def __init__(self, frames: int = 1, max_snapshots: int = 5):
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, MemorySnapshot]" = OrderedDict()
+        self.started_at: Optional[float] = None
+    
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+    
+    def start(self, frames: Optional[int] = None):
+        """Begin tracing allocations; a no-op when already tracing"""
+        if self.tracing:
+            return
+        tracemalloc.start(frames or self.frames)
+        self.started_at = time.time()
+        logger.info("Memory tracing started", frames=tracemalloc.get_traceback_limit())
+    
+    def stop(self):
+        """Stop tracing and drop the snapshots taken so far"""
+        if self.tracing:
+            tracemalloc.stop()
+            logger.info("Memory tracing stopped")
+        self.started_at = None
+        self._snapshots.clear()
+    
+    def take_snapshot(self) -> MemorySnapshot:
+        """Snapshot current allocations; raises RuntimeError when not tracing"""
+        if not self.tracing:
+            raise RuntimeError("Memory tracing is not started")
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = MemorySnapshot(tracemalloc.take_snapshot(), traced_bytes, peak_bytes)
+        self._snapshots[snapshot.id] = snapshot
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot
+    
+    def get(self, snapshot_id: str) -> Optional[MemorySnapshot]:
+        return self._snapshots.get(snapshot_id)
+    
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """Summaries of kept snapshots, newest first"""
+        return [snapshot.summary() for snapshot in reversed(self._snapshots.values())]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Tracing state for the metrics endpoint"""
+        if not self.tracing:
+            return {"tracing": False, "snapshots": len(self._snapshots)}
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "started_at": self.started_at,
+            "traced_bytes": traced_bytes,
+            "peak_bytes": peak_bytes,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": len(self._snapshots)
+        }
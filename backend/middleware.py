@@ -3,14 +3,25 @@ Production-ready middleware for security, logging, and monitoring
 """
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 import time
 import uuid
 import structlog
 from .logging_config import log_performance
+from .profiling import RequestProfiler, bind_profile, unbind_profile
 
 logger = structlog.get_logger(__name__)
 
+SECURITY_HEADERS: Dict[str, str] = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Content-Security-Policy": "default-src 'self'"
+}
+
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """Log all requests with performance metrics"""
     
@@ -22,15 +33,21 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
         
+        # Bind request context once; every log line in this request carries it
+        with structlog.contextvars.bound_contextvars(
+            request_id=request_id,
+            method=request.method,
+            path=request.url.path
+        ):
+            return await self._log_request(request, call_next, request_id)
+    
+    async def _log_request(self, request: Request, call_next, request_id: str):
         # Start timing
         start_time = time.time()
         
         # Log request start
         logger.info(
             "Request started",
-            request_id=request_id,
-            method=request.method,
-            path=request.url.path,
             query=str(request.query_params) if request.query_params else None,
             user_agent=request.headers.get("user-agent"),
             client_ip=request.client.host if request.client else None
@@ -46,9 +63,6 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             # Log request completion
             logger.info(
                 "Request completed",
-                request_id=request_id,
-                method=request.method,
-                path=request.url.path,
                 status_code=response.status_code,
                 duration_ms=round(duration * 1000, 2)
             )
@@ -62,9 +76,6 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             duration = time.time() - start_time
             logger.error(
                 "Request failed",
-                request_id=request_id,
-                method=request.method,
-                path=request.url.path,
                 error=str(e),
                 duration_ms=round(duration * 1000, 2)
             )
@@ -80,14 +91,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         
         # Add security headers
-        response.headers.update({
-            "X-Content-Type-Options": "nosniff",
-            "X-Frame-Options": "DENY",
-            "X-XSS-Protection": "1; mode=block",
-            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
-            "Referrer-Policy": "strict-origin-when-cross-origin",
-            "Content-Security-Policy": "default-src 'self'"
-        })
+        response.headers.update(SECURITY_HEADERS)
         
         return response
 
@@ -143,4 +147,179 @@ class HealthCheckMiddleware(BaseHTTPMiddleware):
         if request.url.path == "/api/health" and request.method == "GET":
             return Response(content='{"status":"ok"}', media_type="application/json")
         
-        return await call_next(request)
\ No newline at end of file
+        return await call_next(request)
+
+# (method, path prefix, priority); first match wins, unmatched requests are "write"
+DEFAULT_ROUTE_PRIORITIES: Sequence[Tuple[str, str, str]] = (
+    ("GET", "/api/health", "critical"),
+    ("GET", "/api/metrics", "critical"),
+    # A lookup by POST only because many ids do not fit in a URL
+    ("POST", "/api/status/batch-get", "read"),
+    ("GET", "/", "read"),
+    ("HEAD", "/", "read"),
+    ("OPTIONS", "/", "read"),
+)
+
+# Fraction of the current limit each priority may occupy. Lower priorities are
+# shed first, leaving headroom for health checks and reads.
+DEFAULT_PRIORITY_SHARES: Dict[str, float] = {
+    "critical": 1.0,
+    "read": 0.9,
+    "write": 0.6,
+}
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit driven by observed request latency
+    
+    Every request that completes under the latency target grows the limit by
+    1/limit (about +1 per limit's worth of requests); a request over the
+    target shrinks it by backoff_ratio, at most once per target interval so a
+    single slow burst does not collapse the limit.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int = 100,
+        min_limit: int = 10,
+        max_limit: int = 1000,
+        latency_target: float = 0.25,
+        backoff_ratio: float = 0.9,
+        route_priorities: Sequence[Tuple[str, str, str]] = DEFAULT_ROUTE_PRIORITIES,
+        priority_shares: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.route_priorities = route_priorities
+        self.priority_shares = priority_shares or dict(DEFAULT_PRIORITY_SHARES)
+        self.enabled = enabled
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self.in_flight = 0
+        self.accepted_total = 0
+        self.shed_total = {priority: 0 for priority in self.priority_shares}
+    
+    def priority_for(self, method: str, path: str) -> str:
+        for rule_method, prefix, priority in self.route_priorities:
+            if method == rule_method and path.startswith(prefix):
+                return priority
+        return "write"
+    
+    def try_acquire(self, priority: str) -> bool:
+        """Take an in-flight slot, or return False if the request should be shed"""
+        share = self.priority_shares.get(priority, 1.0)
+        if self.in_flight >= max(1, int(self.limit * share)):
+            self.shed_total[priority] = self.shed_total.get(priority, 0) + 1
+            return False
+        self.in_flight += 1
+        self.accepted_total += 1
+        return True
+    
+    def release(self, latency: float):
+        """Return a slot and adapt the limit to the observed latency"""
+        self.in_flight -= 1
+        if latency > self.latency_target:
+            now = self._clock()
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif self.in_flight >= self.limit / 2:
+            # Only grow while the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Limiter state for the metrics endpoint"""
+        return {
+            "enabled": self.enabled,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "accepted_total": self.accepted_total,
+            "shed_total": dict(self.shed_total)
+        }
+
+class ConcurrencyLimitMiddleware:
+    """Shed load with 503 once in-flight requests exceed the adaptive limit
+    
+    Implemented as plain ASGI rather than BaseHTTPMiddleware: shedding has to
+    stay cheap under overload, and the limiter must hold its slot until the
+    response body has been sent, not just the headers. Long-lived streams are
+    exempt, since they would otherwise pin a slot for their whole lifetime.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: AdaptiveConcurrencyLimiter,
+        retry_after: int = 1,
+        exempt_paths: Sequence[str] = ("/api/status/stream",)
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = tuple(exempt_paths)
+        # Sent from here, outside SecurityHeadersMiddleware, so the headers are added directly
+        self.shed_response = Response(
+            content="Server overloaded",
+            status_code=503,
+            headers={**SECURITY_HEADERS, "Retry-After": str(retry_after)}
+        )
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.limiter.enabled or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        priority = self.limiter.priority_for(scope["method"], scope["path"])
+        if not self.limiter.try_acquire(priority):
+            await self.shed_response(scope, receive, send)
+            return
+        
+        start_time = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(time.monotonic() - start_time)
+
+class ProfilingMiddleware:
+    """Profile selected requests and tag their responses with X-Profile-ID
+    
+    Must be the outermost middleware so the profile is bound before any
+    other middleware runs and its time is attributed to the middleware phase.
+    """
+    
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        reason = self.profiler.select(scope["headers"])
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+        
+        profile = self.profiler.start(scope["method"], scope["path"], reason)
+        status_code = None
+        
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+                }
+            await send(message)
+        
+        token = bind_profile(profile)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            unbind_profile(token)
+            self.profiler.finish(profile, status_code)
@@ -0,0 +1,90 @@
+"""
+Migrate status checks from string ids to binary UUID _id
+
+Rewrites every status check that still has a string "id" field as a
+document whose _id is that UUID (BSON binary subtype 4) and removes the old
+document. Work is done in batches of insert_many(ordered=False) followed by
+delete_many, so the migration can be interrupted and re-run: documents
+already copied are skipped as duplicate keys. Ids that are not UUIDs are
+left in place and counted. Run it after deploying with
+STATUS_ID_STORAGE=uuid; reads accept both layouts in the meantime.
+
+Usage:
+    python -m backend.migrate_status_ids --batch-size 1000 [--dry-run]
+"""
+import argparse
+import uuid
+from typing import Any, Dict, List
+import structlog
+from .config import settings
+from .logging_config import configure_logging
+
+logger = structlog.get_logger(__name__)
+
+DUPLICATE_KEY = 11000
+
+def convert(document: Dict[str, Any]) -> Dict[str, Any]:
+    migrated = {"_id": uuid.UUID(document["id"])}
+    migrated.update((key, value) for key, value in document.items() if key not in ("_id", "id"))
+    return migrated
+
+def migrate(collection: Any, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+    """Migrate a pymongo collection; returns counts of what was done"""
+    from pymongo.errors import BulkWriteError
+    
+    counts = {"migrated": 0, "already_migrated": 0, "skipped_non_uuid": 0}
+    cursor = collection.find({"id": {"$type": "string"}}, batch_size=batch_size)
+    batch: List[Dict[str, Any]] = []
+    
+    def flush():
+        if not batch:
+            return
+        converted, old_ids = [], []
+        for document in batch:
+            try:
+                converted.append(convert(document))
+                old_ids.append(document["_id"])
+            except ValueError:
+                counts["skipped_non_uuid"] += 1
+        if not dry_run and converted:
+            inserted = len(converted)
+            try:
+                collection.insert_many(converted, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error["code"] != DUPLICATE_KEY for error in errors):
+                    raise
+                inserted -= len(errors)
+                counts["already_migrated"] += len(errors)
+            counts["migrated"] += inserted
+            collection.delete_many({"_id": {"$in": old_ids}})
+        elif dry_run:
+            counts["migrated"] += len(converted)
+        logger.info("Migrated status check batch", **counts)
+        batch.clear()
+    
+    for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Count what would be migrated without writing")
+    args = parser.parse_args()
+    
+    from pymongo import MongoClient
+    
+    configure_logging(settings.log_level, settings.app_name)
+    client = MongoClient(settings.mongo_url, uuidRepresentation="standard")
+    try:
+        counts = migrate(client[settings.db_name].status_checks, args.batch_size, args.dry_run)
+    finally:
+        client.close()
+    logger.info("Status id migration finished", dry_run=args.dry_run, **counts)
+
+if __name__ == "__main__":
+    main()
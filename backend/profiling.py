@@ -0,0 +1,368 @@
+"""
+Opt-in per-request profiling with phase timings and sampled stacks
+"""
+import asyncio
+import hmac
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import structlog
+from fastapi.routing import APIRoute
+
+logger = structlog.get_logger(__name__)
+
+PROFILE_REQUEST_HEADER = b"x-profile-request"
+
+# Phase a sample or slice of time is attributed to when nothing else applies
+BASE_PHASE = "middleware"
+
+# (qualified name, file, first line) of one frame in a sampled stack
+Frame = Tuple[str, str, int]
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+_NO_PHASE = nullcontext()
+
+def current_profile() -> Optional["RequestProfile"]:
+    return _current_profile.get()
+
+def profile_phase(name: str):
+    """Attribute the enclosed time to a phase of the current profile, if any"""
+    profile = _current_profile.get()
+    return _NO_PHASE if profile is None else profile.phase(name)
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_qualname}", code.co_filename, code.co_firstlineno
+
+class RequestProfile:
+    """Phase timings and stack samples for one profiled request
+    
+    Phases are exclusive: entering a nested phase pauses the enclosing one,
+    so the phase totals add up to the request's wall-clock duration.
+    """
+    
+    def __init__(self, method: str, path: str, reason: str, clock: Callable[[], float] = time.perf_counter):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = time.time()
+        self.status_code: Optional[int] = None
+        self.duration: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.samples: Counter = Counter()
+        self.task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread_id: Optional[int] = None
+        self._clock = clock
+        self._started = clock()
+        self._mark = self._started
+        self._stack: List[str] = [BASE_PHASE]
+    
+    @property
+    def current_phase(self) -> str:
+        return self._stack[-1]
+    
+    def _charge(self):
+        now = self._clock()
+        phase = self._stack[-1]
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._mark
+        self._mark = now
+    
+    def enter(self, name: str):
+        self._charge()
+        self._stack.append(name)
+    
+    def exit(self):
+        self._charge()
+        if len(self._stack) > 1:
+            self._stack.pop()
+    
+    def switch(self, name: str):
+        """Replace the current phase, e.g. validation -> serialization"""
+        self._charge()
+        self._stack[-1] = name
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+    
+    def finish(self, status_code: Optional[int]):
+        self._charge()
+        self._stack = [BASE_PHASE]
+        self.status_code = status_code
+        self.duration = self._clock() - self._started
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "samples": sum(self.samples.values())
+        }
+    
+    def collapsed(self) -> str:
+        """Samples in Brendan Gregg's collapsed-stack format (flamegraph.pl, speedscope)"""
+        lines = [
+            ";".join(name for name, _, _ in stack) + f" {count}"
+            for stack, count in self.samples.most_common()
+        ]
+        return "\n".join(lines) + "\n" if lines else ""
+    
+    def speedscope(self) -> Dict[str, Any]:
+        """Samples as a speedscope.app sampled profile, weighted in milliseconds"""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Frame, int] = {}
+        samples: List[List[int]] = []
+        weights: List[int] = []
+        for stack, count in self.samples.items():
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    name, file, line = frame
+                    frames.append({"name": name, "file": file, "line": line} if file else {"name": name})
+            samples.append([index[frame] for frame in stack])
+            weights.append(count)
+        
+        name = f"{self.method} {self.path} [{self.id}]"
+        interval_ms = self.summary()["duration_ms"] / max(1, sum(weights))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "backend.profiling",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(interval_ms * sum(weights), 3),
+                "samples": samples,
+                "weights": [round(interval_ms * count, 3) for count in weights]
+            }]
+        }
+
+class StackSampler:
+    """Background thread sampling the stacks of in-flight profiled requests
+    
+    Sampling is wall-clock and async-aware: when the profiled task is running
+    on the event loop thread the thread's stack is recorded, otherwise the
+    task's chain of awaiting coroutines is, ending in a "[waiting]" frame.
+    Every stack is rooted at the profile's current phase.
+    """
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._active: Dict[str, RequestProfile] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+    
+    def add(self, profile: RequestProfile):
+        with self._condition:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+    
+    def discard(self, profile: RequestProfile):
+        """Stop sampling a profile; its samples are not written after this returns"""
+        with self._condition:
+            self._active.pop(profile.id, None)
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._active:
+                    self._condition.wait()
+                # Counted under the lock so a discarded profile can be exported
+                # while this thread goes on sampling others
+                frames = sys._current_frames()
+                for profile in self._active.values():
+                    stack = self.sample(profile, frames)
+                    if stack:
+                        profile.samples[stack] += 1
+            time.sleep(self.interval)
+    
+    @staticmethod
+    def sample(profile: RequestProfile, frames: Dict[int, Any]) -> Tuple[Frame, ...]:
+        task = profile.task
+        if task is None or task.done():
+            return ()
+        
+        root = task.get_coro()
+        stack: List[Frame] = []
+        if asyncio.current_task(profile.loop) is task:
+            frame = frames.get(profile.thread_id)
+            root_code = getattr(root, "cr_code", None)
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                if frame.f_code is root_code:
+                    break
+                frame = frame.f_back
+            stack.reverse()
+        else:
+            awaitable = root
+            while awaitable is not None:
+                frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+                if frame is None:
+                    break
+                stack.append(_frame_key(frame))
+                awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+            stack.append(("[waiting]", "", 0))
+        return ((f"[{profile.current_phase}]", "", 0), *stack)
+
+class RequestProfiler:
+    """Selects requests to profile and keeps the most recent profiles
+    
+    A request is profiled when it carries the X-Profile-Request header with
+    the shared secret, or is picked by random sampling at sample_rate.
+    Finished profiles are kept in a ring buffer of buffer_size entries.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 0.0,
+        secret: str = "",
+        buffer_size: int = 50,
+        sample_interval: float = 0.005,
+        random_fn: Callable[[], float] = random.random
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.secret = secret.encode()
+        self.buffer_size = buffer_size
+        self.sampler = StackSampler(sample_interval)
+        self._random = random_fn
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self.profiled_total = 0
+    
+    def select(self, headers: List[Tuple[bytes, bytes]]) -> Optional[str]:
+        """Reason to profile a request with these raw headers, or None"""
+        if self.secret:
+            for name, value in headers:
+                if name == PROFILE_REQUEST_HEADER:
+                    if hmac.compare_digest(value, self.secret):
+                        return "requested"
+                    break
+        if self.sample_rate and self._random() < self.sample_rate:
+            return "sampled"
+        return None
+    
+    def start(self, method: str, path: str, reason: str) -> RequestProfile:
+        profile = RequestProfile(method, path, reason)
+        profile.task = asyncio.current_task()
+        profile.loop = asyncio.get_running_loop()
+        profile.thread_id = threading.get_ident()
+        self.sampler.add(profile)
+        return profile
+    
+    def finish(self, profile: RequestProfile, status_code: Optional[int]):
+        self.sampler.discard(profile)
+        profile.finish(status_code)
+        profile.task = None
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.buffer_size:
+            self._profiles.popitem(last=False)
+        self.profiled_total += 1
+        logger.info("Request profiled", profile_id=profile.id, **profile.summary())
+    
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+    
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Summaries of stored profiles, newest first"""
+        return [profile.summary() for profile in reversed(self._profiles.values())]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Profiler state for the metrics endpoint"""
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "stored": len(self._profiles),
+            "profiled_total": self.profiled_total
+        }
+
+def _profiled_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(call)
+    async def endpoint(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return await call(*args, **kwargs)
+        profile.enter("handler")
+        try:
+            return await call(*args, **kwargs)
+        finally:
+            profile.exit()
+            # Whatever the route does after the endpoint returns is serialization
+            profile.switch("serialization")
+    
+    endpoint.__profiled__ = True
+    return endpoint
+
+class ProfiledRoute(APIRoute):
+    """APIRoute splitting a profiled request into validation, handler and serialization
+    
+    Request parsing and dependency solving count as validation, the endpoint
+    body as handler, and response model validation and encoding as
+    serialization. Unprofiled requests only pay for a context variable lookup.
+    """
+    
+    def get_route_handler(self) -> Callable:
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call) and not getattr(call, "__profiled__", False):
+            self.dependant.call = _profiled_endpoint(call)
+        handler = super().get_route_handler()
+        
+        async def route_handler(request):
+            profile = _current_profile.get()
+            if profile is None:
+                return await handler(request)
+            # BaseHTTPMiddleware runs the app in a child task; sample that one
+            outer_task = profile.task
+            profile.task = asyncio.current_task()
+            profile.enter("validation")
+            try:
+                return await handler(request)
+            finally:
+                profile.exit()
+                profile.task = outer_task
+        
+        return route_handler
+
+class ProfiledLoggingMixin:
+    """Bound logger mixin charging time spent logging to the "logging" phase"""
+    
+    def _proxy_to_logger(self, method_name: str, event: Optional[str] = None, *event_args: str, **event_kw: Any) -> Any:
+        profile = _current_profile.get()
+        if profile is None:
+            return super()._proxy_to_logger(method_name, event, *event_args, **event_kw)
+        with profile.phase("logging"):
+            return super()._proxy_to_logger(method_name, event, *event_args, **event_kw)
+
+def bind_profile(profile: RequestProfile):
+    """Make profile the current profile; returns a token for unbind_profile"""
+    return _current_profile.set(profile)
+
+def unbind_profile(token):
+    _current_profile.reset(token)
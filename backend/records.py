@@ -0,0 +1,75 @@
+"""
+Compact in-memory records for status check data
+"""
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Union
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def pack_id(value: str) -> Union[bytes, str]:
+    """16 raw bytes for a canonical UUID string, anything else unchanged"""
+    try:
+        parsed = uuid.UUID(value)
+    except (TypeError, ValueError):
+        return value
+    return parsed.bytes if str(parsed) == value else value
+
+def to_epoch_us(value: Union[datetime, str]) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+def from_epoch_us(value: int) -> datetime:
+    """Naive UTC datetime for microseconds since the epoch"""
+    return _EPOCH + timedelta(microseconds=value)
+
+class StatusRecord:
+    """Status check held in caches and buffers instead of a StatusCheck model
+    
+    No per-instance dict and no validation: the id is kept as 16 bytes when it
+    is a UUID, client_name is interned so repeated clients share one string
+    and the timestamp is an int of epoch microseconds. Convert back with
+    to_document() (naive UTC datetime, like documents read from MongoDB) only
+    when building a response.
+    """
+    
+    __slots__ = ("key", "client_name", "timestamp_us")
+    
+    def __init__(self, key: Union[bytes, str], client_name: str, timestamp_us: int):
+        self.key = key
+        self.client_name = client_name
+        self.timestamp_us = timestamp_us
+    
+    @classmethod
+    def from_fields(cls, id: str, client_name: str, timestamp: Union[datetime, str]) -> "StatusRecord":
+        return cls(pack_id(id), sys.intern(client_name), to_epoch_us(timestamp))
+    
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> "StatusRecord":
+        """Build from a status check document or model dump"""
+        return cls.from_fields(document["id"], document["client_name"], document["timestamp"])
+    
+    @property
+    def id(self) -> str:
+        return str(uuid.UUID(bytes=self.key)) if isinstance(self.key, bytes) else self.key
+    
+    @property
+    def timestamp(self) -> datetime:
+        return from_epoch_us(self.timestamp_us)
+    
+    def to_document(self) -> Dict[str, Any]:
+        return {"id": self.id, "client_name": self.client_name, "timestamp": self.timestamp}
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StatusRecord):
+            return NotImplemented
+        return (self.key, self.client_name, self.timestamp_us) == (other.key, other.client_name, other.timestamp_us)
+    
+    def __repr__(self) -> str:
+        return f"StatusRecord(id={self.id!r}, client_name={self.client_name!r}, timestamp={self.timestamp.isoformat()!r})"
@@ -0,0 +1,526 @@
+"""
+Status check storage engines
+"""
+import abc
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import structlog
+from .clients import ClientRegistry
+from .records import StatusRecord, from_epoch_us, to_epoch_us
+from .resilience import QueryTimeLimitExceeded
+from .status_ids import StatusIdCodec
+
+logger = structlog.get_logger(__name__)
+
+# Fields of a status check, in response order
+STATUS_FIELDS = ("id", "client_name", "timestamp")
+
+Fields = Optional[Tuple[str, ...]]
+
+def parse_fields(value: Optional[str]) -> Fields:
+    """Requested fields from a comma-separated fields= value, None for all
+    
+    Raises ValueError naming any unknown field.
+    """
+    if not value:
+        return None
+    requested = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = sorted(requested.difference(STATUS_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(STATUS_FIELDS)}")
+    if not requested or len(requested) == len(STATUS_FIELDS):
+        return None
+    return tuple(field for field in STATUS_FIELDS if field in requested)
+
+def select_fields(document: Dict[str, Any], fields: Fields) -> Dict[str, Any]:
+    if fields is None:
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+@lru_cache(maxsize=256)
+def client_pattern(pattern: str) -> "re.Pattern[str]":
+    """Compiled client_name filter, with MongoDB's $regex/$options "i" semantics"""
+    return re.compile(pattern, re.IGNORECASE)
+
+def client_matches(pattern: str, client_name: str) -> bool:
+    return client_pattern(pattern).search(client_name) is not None
+
+class StatusCheckRepository(abc.ABC):
+    """Storage of status checks behind the /api/status endpoints
+    
+    Engines take and return plain StatusCheck field dicts ({"id",
+    "client_name", "timestamp"} with a naive UTC datetime); how a document is
+    laid out in storage is the engine's business. list() returns documents
+    in insertion order, optionally filtered by a case-insensitive client_name
+    regex, as the API has always done on MongoDB. Reads take an optional
+    tuple of fields (see parse_fields) and return only those. count() with
+    max_time_ms raises QueryTimeLimitExceeded instead of running longer.
+    Writes take a write concern tier, which engines without replication
+    ignore.
+    """
+    
+    engine = ""
+    
+    @property
+    def ready(self) -> bool:
+        """False while the backing store cannot serve requests"""
+        return True
+    
+    async def start(self):
+        pass
+    
+    async def close(self):
+        pass
+    
+    @abc.abstractmethod
+    async def insert(self, document: Dict[str, Any], write_concern: Optional[str] = None):
+        ...
+    
+    @abc.abstractmethod
+    async def insert_many(self, documents: List[Dict[str, Any]], write_concern: Optional[str] = None):
+        ...
+    
+    @abc.abstractmethod
+    async def get(self, status_id: str, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        ...
+    
+    @abc.abstractmethod
+    async def get_many(self, status_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored status checks among status_ids, keyed by id; missing ids are absent"""
+    
+    @abc.abstractmethod
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Fields = None
+    ) -> List[Dict[str, Any]]:
+        ...
+    
+    @abc.abstractmethod
+    async def count(self, client_name: Optional[str] = None, max_time_ms: Optional[int] = None) -> int:
+        ...
+    
+    async def estimated_count(self) -> int:
+        """Number of stored status checks, from metadata where the engine has it"""
+        return await self.count()
+    
+    async def health_check(self) -> bool:
+        return self.ready
+    
+    async def stats(self) -> Dict[str, Any]:
+        return {"status": "connected" if self.ready else "disconnected", "engine": self.engine}
+
+class MongoStatusCheckRepository(StatusCheckRepository):
+    """Status checks in MongoDB through the resilient collection wrapper
+    
+    Applies the configured id layout (StatusIdCodec) and client name
+    encoding (ClientRegistry) on the way in and out. Field selections are
+    sent as projections that leave out _id whenever the id layout allows.
+    With status indexes enabled, lookups by id use an index, and in the
+    default layout (string ids, no registry) one that asks only for id,
+    client_name and timestamp is answered from the index alone. Client name
+    filters are unanchored case-insensitive regexes, which no index can
+    bound, so list() and count() with client_name still scan.
+    """
+    
+    engine = "mongo"
+    
+    def __init__(
+        self,
+        manager,
+        codec: StatusIdCodec,
+        client_registry: ClientRegistry,
+        chunk_size: int = 1000,
+        id_indexes: bool = False,
+        write_concern: str = "default"
+    ):
+        self.manager = manager
+        self.codec = codec
+        self.client_registry = client_registry
+        self.chunk_size = chunk_size
+        self.id_indexes = id_indexes
+        self.write_concern = write_concern
+        self._indexes_ready = False
+    
+    @property
+    def ready(self) -> bool:
+        return self.manager.database is not None
+    
+    def _collection(self, write_concern: str = "default"):
+        return self.manager.collection("status_checks", write_concern)
+    
+    def _stored_fields(self, fields: Sequence[str]) -> List[str]:
+        """Stored field names holding the given StatusCheck fields"""
+        stored = []
+        for field in fields:
+            if field == "id":
+                # Binary _id, or the "id" string of documents written before the migration
+                stored.extend(("_id", "id") if self.codec.uses_uuid else ("id",))
+            elif field == "client_name":
+                stored.extend(("client_name", "client_id") if self.client_registry.enabled else ("client_name",))
+            else:
+                stored.append(field)
+        return stored
+    
+    def projection(self, fields: Fields) -> Optional[Dict[str, int]]:
+        """MongoDB projection for a field selection, None for whole documents"""
+        if fields is None:
+            return None
+        projection = dict.fromkeys(self._stored_fields(fields), 1)
+        if "_id" not in projection:
+            projection["_id"] = 0
+        return projection
+    
+    def index_specs(self) -> List[List[Tuple[str, int]]]:
+        """Indexes for lookups by id
+        
+        The string "id" field is indexed in every layout: with binary UUID
+        ids _id is indexed already, but documents written before the
+        migration are still found by "id". Only the default layout adds
+        client_name and timestamp, covering field selections by id; with
+        the registry a selection reads client_name and client_id, and with
+        UUID ids also the legacy "id", so the extra keys would cover nothing.
+        """
+        if self.codec.uses_uuid or self.client_registry.enabled:
+            return [[("id", 1)]]
+        return [[("id", 1), ("client_name", 1), ("timestamp", 1)]]
+    
+    async def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        for keys in self.index_specs():
+            await self._collection().create_index(keys)
+        self._indexes_ready = True
+    
+    async def start(self):
+        """Build the status check indexes; call once the database is connected"""
+        if not self.id_indexes:
+            return
+        try:
+            await self.ensure_indexes()
+        except Exception as e:
+            # Reads still work without them, only slower
+            logger.warning("Status check indexes not created", error=str(e))
+    
+    async def to_storage(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Document to insert for a status check"""
+        return self.codec.encode(await self.client_registry.encode(dict(document)))
+    
+    async def from_storage(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Turn stored documents back into StatusCheck fields, in place"""
+        for document in documents:
+            self.codec.decode(document)
+        return await self.client_registry.hydrate(documents)
+    
+    async def insert(self, document: Dict[str, Any], write_concern: Optional[str] = None):
+        collection = self._collection(write_concern or self.write_concern)
+        result = await collection.insert_one(await self.to_storage(document))
+        if not result.inserted_id:
+            raise RuntimeError("Insert did not return an id")
+    
+    async def insert_many(self, documents: List[Dict[str, Any]], write_concern: Optional[str] = None):
+        if documents:
+            collection = self._collection(write_concern or self.write_concern)
+            await collection.insert_many([await self.to_storage(document) for document in documents])
+    
+    async def get(self, status_id: str, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        # By _id when ids are stored as binary UUIDs, then the legacy layout
+        projection = self.projection(fields)
+        for lookup in self.codec.lookup_filters(status_id):
+            document = await self._collection().find_one(lookup, projection)
+            if document:
+                decoded, = await self.from_storage([document])
+                return select_fields(decoded, fields)
+        return None
+    
+    async def get_many(self, status_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        # One $in query per chunk keeps each query document well under the BSON limit
+        documents = []
+        for start in range(0, len(status_ids), self.chunk_size):
+            chunk = status_ids[start:start + self.chunk_size]
+            documents.extend(await self._collection().find_list(self.codec.lookup_many_filter(chunk)))
+        return {document["id"]: document for document in await self.from_storage(documents)}
+    
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Fields = None
+    ) -> List[Dict[str, Any]]:
+        query = await self.client_registry.client_filter(client_name) if client_name else {}
+        documents = await self._collection().find_list(query, skip=skip, limit=limit, projection=self.projection(fields))
+        await self.from_storage(documents)
+        return documents if fields is None else [select_fields(document, fields) for document in documents]
+    
+    async def count(self, client_name: Optional[str] = None, max_time_ms: Optional[int] = None) -> int:
+        query = await self.client_registry.client_filter(client_name) if client_name else {}
+        return await self._collection().count_documents(query, max_time_ms=max_time_ms)
+    
+    async def estimated_count(self) -> int:
+        return await self._collection().estimated_document_count()
+    
+    async def health_check(self) -> bool:
+        return await self.manager.health_check()
+    
+    async def stats(self) -> Dict[str, Any]:
+        return {**await self.manager.get_stats(), "engine": self.engine}
+
+class MemoryStatusCheckRepository(StatusCheckRepository):
+    """Process-local status checks, held as compact StatusRecords
+    
+    Nothing is persisted; meant for tests, benchmarks and throwaway
+    single-node deployments. Reads never leave the event loop.
+    """
+    
+    engine = "memory"
+    
+    def __init__(self):
+        self._records: Dict[str, StatusRecord] = {}
+        self._by_client: Dict[str, List[StatusRecord]] = {}
+        self._seq: Dict[str, int] = {}
+    
+    async def insert(self, document: Dict[str, Any], write_concern: Optional[str] = None):
+        self._add(document)
+    
+    async def insert_many(self, documents: List[Dict[str, Any]], write_concern: Optional[str] = None):
+        for document in documents:
+            self._add(document)
+    
+    def _add(self, document: Dict[str, Any]):
+        if document["id"] in self._records:
+            raise ValueError(f"Duplicate status check id: {document['id']}")
+        record = StatusRecord.from_document(document)
+        self._seq[document["id"]] = len(self._records)
+        self._records[document["id"]] = record
+        self._by_client.setdefault(record.client_name, []).append(record)
+    
+    async def get(self, status_id: str, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        record = self._records.get(status_id)
+        return select_fields(record.to_document(), fields) if record is not None else None
+    
+    async def get_many(self, status_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        records = self._records
+        return {status_id: records[status_id].to_document() for status_id in status_ids if status_id in records}
+    
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Fields = None
+    ) -> List[Dict[str, Any]]:
+        records: Iterable[StatusRecord]
+        if client_name is None:
+            records = islice(self._records.values(), skip, skip + limit)
+        else:
+            records = self._matching(client_name)[skip:skip + limit]
+        return [select_fields(record.to_document(), fields) for record in records]
+    
+    def _matching(self, pattern: str) -> List[StatusRecord]:
+        # The regex runs once per distinct client name, not once per record
+        groups = [records for name, records in self._by_client.items() if client_matches(pattern, name)]
+        if len(groups) == 1:
+            return groups[0]
+        return sorted((record for records in groups for record in records), key=lambda record: self._seq[record.id])
+    
+    async def count(self, client_name: Optional[str] = None, max_time_ms: Optional[int] = None) -> int:
+        if client_name is None:
+            return len(self._records)
+        return sum(len(records) for name, records in self._by_client.items() if client_matches(client_name, name))
+    
+    async def stats(self) -> Dict[str, Any]:
+        return {"status": "connected", "engine": self.engine, "objects": len(self._records)}
+
+class SQLiteStatusCheckRepository(StatusCheckRepository):
+    """Status checks in an embedded SQLite database
+    
+    The database runs in WAL mode, so readers never block the writer. Writes
+    go through one connection on a dedicated thread, reads through one
+    connection per reader thread, and the event loop only awaits the
+    results. Every query is a constant SQL string, so sqlite3's statement
+    cache prepares each one once per connection. Timestamps are stored as
+    epoch microseconds.
+    """
+    
+    engine = "sqlite"
+    
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS status_checks ("
+        " seq INTEGER PRIMARY KEY,"
+        " id TEXT NOT NULL UNIQUE,"
+        " client_name TEXT NOT NULL,"
+        " timestamp_us INTEGER NOT NULL)",
+    )
+    INSERT = "INSERT INTO status_checks (id, client_name, timestamp_us) VALUES (?, ?, ?)"
+    GET = "SELECT id, client_name, timestamp_us FROM status_checks WHERE id = ?"
+    # The ids travel as one JSON array parameter, so the statement stays constant
+    GET_MANY = "SELECT id, client_name, timestamp_us FROM status_checks WHERE id IN (SELECT value FROM json_each(?))"
+    LIST = "SELECT id, client_name, timestamp_us FROM status_checks ORDER BY seq LIMIT ? OFFSET ?"
+    LIST_BY_CLIENT = (
+        "SELECT id, client_name, timestamp_us FROM status_checks"
+        " WHERE client_matches(?, client_name) ORDER BY seq LIMIT ? OFFSET ?"
+    )
+    COUNT = "SELECT COUNT(*) FROM status_checks"
+    COUNT_BY_CLIENT = "SELECT COUNT(*) FROM status_checks WHERE client_matches(?, client_name)"
+    # Rows are never deleted, so the last seq is the row count
+    ESTIMATED_COUNT = "SELECT COALESCE(MAX(seq), 0) FROM status_checks"
+    
+    def __init__(self, path: str, readers: int = 2, busy_timeout_ms: int = 5000, chunk_size: int = 1000):
+        if path == ":memory:" or not path:
+            # Every connection would get its own private database
+            raise ValueError("SQLite storage needs a database file path")
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.chunk_size = chunk_size
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="sqlite-reader")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._started = False
+    
+    @property
+    def ready(self) -> bool:
+        return self._started
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit; multi-row writes open their own transaction
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, cached_statements=32
+            )
+            connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.create_function("client_matches", 2, client_matches, deterministic=True)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+    
+    def _create_schema(self):
+        connection = self._connection()
+        mode, = connection.execute("PRAGMA journal_mode = WAL").fetchone()
+        for statement in self.SCHEMA:
+            connection.execute(statement)
+        return mode
+    
+    async def _write(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer, fn, *args)
+    
+    async def _read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._readers, fn, *args)
+    
+    async def start(self):
+        if self._started:
+            return
+        mode = await self._write(self._create_schema)
+        self._started = True
+        logger.info("SQLite status store opened", path=self.path, journal_mode=mode)
+    
+    async def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._started = False
+    
+    @staticmethod
+    def _row(document: Dict[str, Any]) -> tuple:
+        return document["id"], document["client_name"], to_epoch_us(document["timestamp"])
+    
+    @staticmethod
+    def _document(row: tuple) -> Dict[str, Any]:
+        return {"id": row[0], "client_name": row[1], "timestamp": from_epoch_us(row[2])}
+    
+    def _insert_many(self, rows: List[tuple]):
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(self.INSERT, rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    
+    async def insert(self, document: Dict[str, Any], write_concern: Optional[str] = None):
+        await self._write(lambda row: self._connection().execute(self.INSERT, row), self._row(document))
+    
+    async def insert_many(self, documents: List[Dict[str, Any]], write_concern: Optional[str] = None):
+        if documents:
+            await self._write(self._insert_many, [self._row(document) for document in documents])
+    
+    async def get(self, status_id: str, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        row = await self._read(lambda: self._connection().execute(self.GET, (status_id,)).fetchone())
+        return select_fields(self._document(row), fields) if row is not None else None
+    
+    def _get_many(self, status_ids: List[str]) -> List[tuple]:
+        connection = self._connection()
+        rows = []
+        for start in range(0, len(status_ids), self.chunk_size):
+            chunk = json.dumps(status_ids[start:start + self.chunk_size])
+            rows.extend(connection.execute(self.GET_MANY, (chunk,)).fetchall())
+        return rows
+    
+    async def get_many(self, status_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        rows = await self._read(self._get_many, status_ids) if status_ids else []
+        return {row[0]: self._document(row) for row in rows}
+    
+    async def list(
+        self,
+        client_name: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Fields = None
+    ) -> List[Dict[str, Any]]:
+        # Rows are three narrow columns; selecting fewer would only multiply the statements
+        if client_name is None:
+            sql, params = self.LIST, (limit, skip)
+        else:
+            sql, params = self.LIST_BY_CLIENT, (client_name, limit, skip)
+        rows = await self._read(lambda: self._connection().execute(sql, params).fetchall())
+        return [select_fields(self._document(row), fields) for row in rows]
+    
+    def _count(self, sql: str, params: tuple, max_time_ms: Optional[int]) -> int:
+        connection = self._connection()
+        if max_time_ms is None:
+            return connection.execute(sql, params).fetchone()[0]
+        # SQLite calls the handler every N virtual machine steps; True interrupts the query
+        deadline = time.monotonic() + max_time_ms / 1000
+        connection.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+        try:
+            return connection.execute(sql, params).fetchone()[0]
+        except sqlite3.OperationalError:
+            if time.monotonic() <= deadline:
+                raise
+            raise QueryTimeLimitExceeded(f"count exceeded {max_time_ms} ms") from None
+        finally:
+            connection.set_progress_handler(None, 0)
+    
+    async def count(self, client_name: Optional[str] = None, max_time_ms: Optional[int] = None) -> int:
+        if client_name is None:
+            sql, params = self.COUNT, ()
+        else:
+            sql, params = self.COUNT_BY_CLIENT, (client_name,)
+        return await self._read(self._count, sql, params, max_time_ms)
+    
+    async def estimated_count(self) -> int:
+        return await self._read(lambda: self._connection().execute(self.ESTIMATED_COUNT).fetchone()[0])
+    
+    async def stats(self) -> Dict[str, Any]:
+        if not self._started:
+            return {"status": "disconnected", "engine": self.engine}
+        return {"status": "connected", "engine": self.engine, "path": self.path, "objects": await self.count()}
@@ -0,0 +1,275 @@
+"""
+Database resilience: per-operation deadlines, bounded retries and a circuit breaker
+"""
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+import structlog
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from .exceptions import CircuitOpenError, ServiceUnavailableError
+from .profiling import profile_phase
+
+logger = structlog.get_logger(__name__)
+
+class CircuitBreaker:
+    """Fail fast while the database keeps failing
+    
+    closed    -> operations run; consecutive failures are counted
+    open      -> operations are rejected until recovery_timeout has elapsed
+    half_open -> a single probe operation runs; success closes, failure re-opens
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        name: str = "database",
+        failure_threshold: int = 5,
+        recovery_timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected_total = 0
+        self.failures_total = 0
+        self.successes_total = 0
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+    
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a probe through"""
+        remaining = self.recovery_timeout - (self._clock() - self._opened_at)
+        return max(1, math.ceil(remaining))
+    
+    def before_call(self):
+        """Reserve a call slot or raise CircuitOpenError"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        
+        self.rejected_total += 1
+        raise CircuitOpenError(retry_after=self.retry_after())
+    
+    def record_success(self):
+        self.successes_total += 1
+        self._consecutive_failures = 0
+        if self._state != self.CLOSED:
+            logger.info("Circuit breaker closed", breaker=self.name)
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        self.failures_total += 1
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._trip()
+    
+    def release(self):
+        """Give back a half-open probe slot without judging the outcome"""
+        self._probe_in_flight = False
+    
+    def _trip(self):
+        if self._state != self.OPEN:
+            self.times_opened += 1
+            logger.warning(
+                "Circuit breaker opened",
+                breaker=self.name,
+                consecutive_failures=self._consecutive_failures,
+                recovery_timeout=self.recovery_timeout
+            )
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker state for the metrics endpoint"""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "times_opened": self.times_opened,
+            "rejected_total": self.rejected_total,
+            "failures_total": self.failures_total,
+            "successes_total": self.successes_total
+        }
+
+class QueryTimeLimitExceeded(Exception):
+    """A query stopped at a time limit its caller chose, tighter than the deadline
+    
+    Expected for deliberately bounded work such as exact counts; it is not
+    retried and says nothing about database health.
+    """
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Errors worth retrying: lost connections and failed server selection"""
+    from pymongo.errors import ConnectionFailure
+    return isinstance(exc, ConnectionFailure)
+
+def is_database_failure(exc: BaseException) -> bool:
+    """Errors that count against the circuit breaker
+    
+    Application errors such as duplicate keys or invalid queries say nothing
+    about database health and leave the breaker alone.
+    """
+    from pymongo.errors import ExecutionTimeout
+    return (
+        is_transient_error(exc)
+        or isinstance(exc, (ExecutionTimeout, asyncio.TimeoutError))
+    )
+
+class ResilientCollection:
+    """Collection wrapper enforcing deadlines, retries and the circuit breaker
+    
+    Reads get a server-side maxTimeMS plus an asyncio deadline covering all
+    attempts, and are retried with jittered backoff on transient errors.
+    Writes get the deadline but are never retried here; the driver already
+    applies retryWrites.
+    """
+    
+    def __init__(
+        self,
+        collection: Any,
+        breaker: CircuitBreaker,
+        timeout: float = 2.0,
+        read_retries: int = 2,
+        retry_backoff: float = 0.05,
+        write_stats: Optional[Any] = None
+    ):
+        self.collection = collection
+        self.breaker = breaker
+        self.timeout = timeout
+        self.read_retries = read_retries
+        self.retry_backoff = retry_backoff
+        self.write_stats = write_stats
+    
+    async def find_one(self, filter: Dict[str, Any], *args, **kwargs) -> Optional[Dict[str, Any]]:
+        return await self._read(
+            lambda max_time_ms: self.collection.find_one(filter, *args, max_time_ms=max_time_ms, **kwargs)
+        )
+    
+    async def find_list(
+        self,
+        filter: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 0,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Run a find() and materialize the page"""
+        def operation(max_time_ms: int):
+            cursor = self.collection.find(filter, max_time_ms=max_time_ms, **kwargs).skip(skip).limit(limit)
+            return cursor.to_list(length=limit or None)
+        return await self._read(operation)
+    
+    async def count_documents(self, filter: Dict[str, Any], max_time_ms: Optional[int] = None, **kwargs) -> int:
+        """Count matching documents, optionally stopping after max_time_ms
+        
+        A count stopped by max_time_ms raises QueryTimeLimitExceeded rather
+        than counting against the circuit breaker.
+        """
+        from pymongo.errors import ExecutionTimeout
+        
+        async def operation(remaining_ms: int) -> int:
+            limit = remaining_ms if max_time_ms is None else min(remaining_ms, max_time_ms)
+            try:
+                return await self.collection.count_documents(filter, maxTimeMS=limit, **kwargs)
+            except ExecutionTimeout:
+                if limit != max_time_ms:
+                    raise
+                raise QueryTimeLimitExceeded(f"count exceeded {max_time_ms} ms") from None
+        return await self._read(operation)
+    
+    async def estimated_document_count(self, **kwargs) -> int:
+        """Collection size from metadata, without scanning"""
+        return await self._read(
+            lambda max_time_ms: self.collection.estimated_document_count(maxTimeMS=max_time_ms, **kwargs)
+        )
+    
+    async def insert_one(self, document: Dict[str, Any], **kwargs) -> Any:
+        return await self._write(lambda: self.collection.insert_one(document, **kwargs))
+    
+    async def insert_many(self, documents: List[Dict[str, Any]], **kwargs) -> Any:
+        return await self._write(lambda: self.collection.insert_many(documents, **kwargs))
+    
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], **kwargs) -> Any:
+        return await self._write(lambda: self.collection.update_one(filter, update, **kwargs))
+    
+    async def delete_one(self, filter: Dict[str, Any], **kwargs) -> Any:
+        return await self._write(lambda: self.collection.delete_one(filter, **kwargs))
+    
+    async def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any], **kwargs) -> Optional[Dict[str, Any]]:
+        return await self._write(lambda: self.collection.find_one_and_update(filter, update, **kwargs))
+    
+    async def create_index(self, keys: Any, **kwargs) -> str:
+        return await self._write(lambda: self.collection.create_index(keys, **kwargs))
+    
+    async def _read(self, operation: Callable[[int], Any]) -> Any:
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        
+        async def attempt():
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            return await asyncio.wait_for(operation(max(1, int(remaining * 1000))), remaining)
+        
+        async def with_retries():
+            retrying = AsyncRetrying(
+                stop=stop_after_attempt(self.read_retries + 1),
+                wait=wait_random_exponential(multiplier=self.retry_backoff, max=self.timeout / 2),
+                retry=retry_if_exception(is_transient_error),
+                reraise=True
+            )
+            return await retrying(attempt)
+        
+        return await self._guarded(with_retries)
+    
+    async def _write(self, operation: Callable[[], Any]) -> Any:
+        if self.write_stats is None:
+            return await self._guarded(lambda: asyncio.wait_for(operation(), self.timeout))
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await self._guarded(lambda: asyncio.wait_for(operation(), self.timeout))
+            failed = False
+            return result
+        finally:
+            self.write_stats.record(time.perf_counter() - start, failed)
+    
+    async def _guarded(self, call: Callable[[], Any]) -> Any:
+        self.breaker.before_call()
+        try:
+            with profile_phase("db"):
+                result = await call()
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise ServiceUnavailableError("Database operation timed out")
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if is_database_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        
+        self.breaker.record_success()
+        return result
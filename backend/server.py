@@ -1,9 +1,11 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Header, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
-from pydantic import BaseModel, Field, ValidationError as PydanticValidationError
-from typing import List, Optional, Dict, Any
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError as PydanticValidationError
+import hmac
+from typing import List, Optional, Dict, Any, Union
 import uuid
 from datetime import datetime
 import asyncio
@@ -14,13 +16,32 @@ import structlog
 from .config import settings
 from .logging_config import configure_logging, log_error, log_performance
 from .database import db_manager
+from .coalescing import QueryCoalescer, normalize_query_key
+from .counting import COUNT_MODES, StatusCounter
+from .streaming import StatusBroadcaster, sse_events, watch_status_changes
+from .profiling import RequestProfiler, profile_phase
+from .memory_diagnostics import GROUP_BY, MemoryDiagnostics, gc_stats, object_counts
+from .loop_monitor import LoopMonitor
+from .executor import OffloadExecutor
+from .records import StatusRecord
+from .clients import ClientRegistry
+from .status_ids import StatusIdCodec
+from .repository import (
+    Fields, MemoryStatusCheckRepository, MongoStatusCheckRepository, SQLiteStatusCheckRepository,
+    StatusCheckRepository, parse_fields
+)
+from .idempotency import IdempotencyStore, request_fingerprint
+from .static_files import StaticBundle, StaticFilesMiddleware
+from .error_log import error_log_throttle
+from .tracing import LayerSpanMiddleware, TracedRoute, TracingMiddleware, tracer
 from .exceptions import (
-    APIError, DatabaseError, NotFoundError, ValidationError,
+    APIError, AuthorizationError, DatabaseError, NotFoundError, ValidationError, ServiceUnavailableError,
     api_error_handler, general_exception_handler, validation_exception_handler
 )
 from .middleware import (
     RequestLoggingMiddleware, SecurityHeadersMiddleware, 
-    RateLimitMiddleware, HealthCheckMiddleware
+    RateLimitMiddleware, HealthCheckMiddleware,
+    AdaptiveConcurrencyLimiter, ConcurrencyLimitMiddleware, ProfilingMiddleware
 )
 
 # Configure logging
@@ -31,11 +52,52 @@ async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
     logger.info("Starting application", version=settings.app_version)
+    connect_task = None
+    watch_task = None
+    error_summary_task = None
     
     try:
+        # Trace from startup so import-time and warm-up allocations show up too
+        if settings.memory_trace_on_startup:
+            memory_diagnostics.start()
+        
+        # Start measuring loop lag before anything else can block the loop
+        loop_monitor.start()
+        offload_executor.start()
+        
+        # Periodic counts of errors whose full log entries were suppressed
+        if error_log_throttle.interval > 0:
+            error_summary_task = asyncio.create_task(error_log_throttle.run())
+        
+        # Hash and precompress the frontend build before serving it
+        if settings.static_files_enabled:
+            await asyncio.to_thread(static_bundle.load)
+        
         # Connect to database
-        await db_manager.connect()
-        logger.info("Application startup completed")
+        if settings.storage_engine != "mongo":
+            await status_repository.start()
+        elif settings.db_startup_mode == "background":
+            # Accept traffic right away; handlers answer 503 until connected
+            connect_task = asyncio.create_task(
+                connect_status_store_in_background(settings.db_connect_retry_interval)
+            )
+        else:
+            await db_manager.connect()
+            await status_repository.start()
+        
+        # One change stream per process feeds every live subscriber
+        if status_broadcaster.configured_source != "local":
+            watch_task = asyncio.create_task(watch_status_changes(
+                status_broadcaster,
+                lambda: db_manager.database.status_checks if db_manager.database is not None else None,
+                status_record_from_change,
+                retry_interval=settings.db_connect_retry_interval
+            ))
+        logger.info(
+            "Application startup completed",
+            storage_engine=settings.storage_engine,
+            db_startup_mode=settings.db_startup_mode
+        )
         
         yield
         
@@ -45,7 +107,19 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down application")
+        status_broadcaster.close()
+        for task in (connect_task, watch_task, error_summary_task):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
         await db_manager.disconnect()
+        await status_repository.close()
+        offload_executor.shutdown()
+        await loop_monitor.stop()
+        error_log_throttle.flush()
+        tracer.shutdown()
+        memory_diagnostics.stop()
         logger.info("Application shutdown completed")
 
 # Create the main app with lifespan management
@@ -59,28 +133,94 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+# Adaptive in-flight limit shared with the metrics endpoint
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.concurrency_initial_limit,
+    min_limit=settings.concurrency_min_limit,
+    max_limit=settings.concurrency_max_limit,
+    latency_target=settings.concurrency_latency_target_ms / 1000,
+    enabled=settings.concurrency_limit_enabled
+)
+
+# Event loop lag histogram and blocked-loop stack reports
+loop_monitor = LoopMonitor(
+    interval=settings.loop_monitor_interval_ms / 1000,
+    threshold=settings.loop_block_threshold_ms / 1000,
+    enabled=settings.loop_monitor_enabled
+)
+
+# Worker pool that keeps large response bodies from stalling the event loop
+offload_executor = OffloadExecutor(
+    kind=settings.executor_kind,
+    max_workers=settings.executor_max_workers,
+    max_queue=settings.executor_max_queue,
+    min_items=settings.executor_offload_min_items
+)
+
+# Frontend build served by StaticFilesMiddleware when enabled
+static_bundle = StaticBundle(
+    settings.static_files_dir,
+    memory_max_bytes=settings.static_memory_max_bytes,
+    compress_min_bytes=settings.static_compress_min_bytes
+)
+
+# Opt-in request profiling; profiles are served by the admin endpoints
+request_profiler = RequestProfiler(
+    enabled=settings.profiling_enabled,
+    sample_rate=settings.profiling_sample_rate,
+    secret=settings.profiling_secret,
+    buffer_size=settings.profiling_buffer_size,
+    sample_interval=settings.profiling_sample_interval_ms / 1000
+)
+
+# tracemalloc is off until started here or through the admin endpoints
+memory_diagnostics = MemoryDiagnostics(
+    frames=settings.memory_trace_frames,
+    max_snapshots=settings.memory_snapshot_limit
+)
+
+def add_middleware(middleware_class, **options):
+    """Add a middleware with its own span in sampled traces"""
+    app.add_middleware(middleware_class, **options)
+    if tracer.enabled:
+        app.add_middleware(LayerSpanMiddleware, tracer=tracer, name=middleware_class.__name__)
+
 # Add middleware (order matters!)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RequestLoggingMiddleware)
-app.add_middleware(RateLimitMiddleware, requests_per_minute=120)
-app.add_middleware(HealthCheckMiddleware)
+add_middleware(SecurityHeadersMiddleware)
+add_middleware(RequestLoggingMiddleware)
+add_middleware(RateLimitMiddleware, requests_per_minute=settings.rate_limit_per_minute)
+add_middleware(HealthCheckMiddleware)
+# Shed excess load before any logging or rate-limit bookkeeping is done
+add_middleware(ConcurrencyLimitMiddleware, limiter=concurrency_limiter)
 
 # Add CORS with production settings
-app.add_middleware(
+add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
+    # Readable by browser clients paginating with total=
+    expose_headers=["X-Total-Count", "X-Total-Count-Type"],
 )
 
+# Server span per request, continuing the caller's traceparent
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Outermost apart from static files, so profiles cover every other middleware
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
+# Static assets bypass logging, rate limiting and every other layer
+if settings.static_files_enabled:
+    app.add_middleware(StaticFilesMiddleware, bundle=static_bundle, mount_path=settings.static_mount_path)
+
 # Add exception handlers
 app.add_exception_handler(APIError, api_error_handler)
 app.add_exception_handler(PydanticValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api", tags=["api"])
+api_router = APIRouter(prefix="/api", tags=["api"], route_class=TracedRoute)
 
 # Enhanced Models with validation
 class StatusCheck(BaseModel):
@@ -105,6 +245,52 @@ class StatusCheckCreate(BaseModel):
             }
         }
 
+status_check_list_adapter = TypeAdapter(List[StatusCheck])
+
+class StatusCheckFields(BaseModel):
+    """Status check reduced to the fields requested with fields="""
+    id: Optional[str] = None
+    client_name: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
+
+status_check_fields_list_adapter = TypeAdapter(List[StatusCheckFields])
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return: id, client_name, timestamp (default all)"
+
+def requested_fields(fields: Optional[str]) -> Fields:
+    """Parse the fields query parameter, rejecting unknown names"""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+def requested_write_concern(tier: Optional[str]) -> Optional[str]:
+    """Write concern tier from X-Write-Concern, limited to WRITE_CONCERN_HEADER_TIERS"""
+    if tier is None:
+        return None
+    if tier not in settings.write_concern_header_tiers:
+        raise ValidationError(
+            "Write concern tier not allowed",
+            details={"tier": tier, "allowed": settings.write_concern_header_tiers}
+        )
+    return tier
+
+class StatusCheckBatchGet(BaseModel):
+    """Batch lookup request model"""
+    ids: List[str] = Field(
+        ..., min_length=1, max_length=settings.batch_get_max_ids, description="Status check ids to look up"
+    )
+
+class StatusCheckBatchResult(BaseModel):
+    """Batch lookup response: found status checks in request order and the ids that were not found"""
+    results: List[StatusCheck]
+    missing: List[str]
+
 class HealthResponse(BaseModel):
     """Health check response model"""
     status: str
@@ -119,11 +305,128 @@ class MetricsResponse(BaseModel):
     database_stats: Dict[str, Any]
     uptime_seconds: float
     memory_usage: Dict[str, Any]
+    circuit_breaker: Dict[str, Any]
+    concurrency: Dict[str, Any]
+    status_query_cache: Dict[str, Any]
+    status_counts: Dict[str, Any]
+    write_concerns: Dict[str, Any]
+    status_stream: Dict[str, Any]
+    client_registry: Dict[str, Any]
+    idempotency: Dict[str, Any]
+    profiling: Dict[str, Any]
+    memory_tracing: Dict[str, Any]
+    tracing: Dict[str, Any]
+    event_loop: Dict[str, Any]
+    executor: Dict[str, Any]
+    static_files: Dict[str, Any]
+    error_log: Dict[str, Any]
 
 # Global variables for metrics
 app.state.start_time = time.time()
 app.state.request_count = 0
 
+# Identical concurrent list queries share one database call and response body
+status_query_coalescer = QueryCoalescer(ttl=settings.status_cache_ttl_ms / 1000)
+
+def encode_status_record(record: StatusRecord) -> str:
+    """Render a buffered record as the API's StatusCheck JSON"""
+    return StatusCheck.model_construct(**record.to_document()).model_dump_json()
+
+def status_event_id(record: StatusRecord) -> str:
+    """Stream event id: insert time in epoch milliseconds, then the status check id
+    
+    The same in every process, so Last-Event-ID resumes on any worker; in
+    milliseconds because that is what MongoDB keeps of the timestamp.
+    """
+    return f"{record.timestamp_us // 1000:013d}-{record.id}"
+
+# Optional dictionary encoding of client names in stored status checks
+client_registry = ClientRegistry(
+    db_manager.collection,
+    enabled=settings.client_registry_enabled,
+    refresh_interval=settings.client_registry_refresh_seconds
+)
+
+# How status check ids are stored: string "id" field or binary UUID _id
+status_id_codec = StatusIdCodec(settings.status_id_storage)
+
+def create_status_repository() -> StatusCheckRepository:
+    """Storage engine selected by STORAGE_ENGINE"""
+    if settings.storage_engine == "sqlite":
+        return SQLiteStatusCheckRepository(settings.sqlite_path, chunk_size=settings.batch_get_chunk_size)
+    if settings.storage_engine == "memory":
+        return MemoryStatusCheckRepository()
+    return MongoStatusCheckRepository(
+        db_manager,
+        status_id_codec,
+        client_registry,
+        chunk_size=settings.batch_get_chunk_size,
+        id_indexes=settings.status_id_indexes,
+        write_concern=settings.status_write_concern
+    )
+
+# Where the status check endpoints read and write
+status_repository = create_status_repository()
+
+async def connect_status_store_in_background(retry_interval: float):
+    """Connect to MongoDB once it is reachable, then set up the status store"""
+    await db_manager.connect_in_background(retry_interval)
+    await status_repository.start()
+
+# Totals for GET /api/status?total=..., cached per filter
+status_counter = StatusCounter(
+    lambda: status_repository,
+    max_time_ms=settings.status_count_max_time_ms,
+    ttl=settings.status_count_cache_ttl_seconds
+)
+
+async def status_record_from_change(document: Dict[str, Any]) -> StatusRecord:
+    """Buffered record for a status check document from the change stream"""
+    decoded, = await status_repository.from_storage([document])
+    return StatusRecord.from_document(decoded)
+
+# Responses of POST /api/status kept per Idempotency-Key for retried requests;
+# shared through MongoDB across processes, in process with embedded engines
+idempotency_store = IdempotencyStore(
+    db_manager.collection if settings.storage_engine == "mongo" else None,
+    ttl=settings.idempotency_ttl_seconds,
+    max_entries=settings.idempotency_cache_size
+)
+
+# Live feed of new status checks for SSE and WebSocket clients
+status_broadcaster = StatusBroadcaster(
+    # Change streams are a MongoDB feature; other engines publish in process
+    source=settings.status_stream_source if settings.storage_engine == "mongo" else "local",
+    queue_size=settings.status_stream_queue_size,
+    replay_size=settings.status_stream_replay_size,
+    max_subscribers=settings.status_stream_max_subscribers,
+    encode=encode_status_record,
+    event_id=status_event_id
+)
+
+@lru_cache(maxsize=1)
+def get_process():
+    """Return a cached psutil process handle, or None if psutil is unavailable"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process()
+
+def get_memory_usage() -> Dict[str, Any]:
+    """Collect process memory usage"""
+    process = get_process()
+    if process is None:
+        return {"message": "Memory monitoring not available", "gc": gc_stats()}
+    
+    memory_info = process.memory_info()
+    return {
+        "rss": memory_info.rss,
+        "vms": memory_info.vms,
+        "percent": process.memory_percent(),
+        "gc": gc_stats()
+    }
+
 @api_router.get("/", tags=["general"])
 async def root():
     """Root endpoint"""
@@ -141,8 +444,8 @@ async def health_check():
     
     try:
         # Check database health
-        db_healthy = await db_manager.health_check()
-        db_stats = await db_manager.get_stats()
+        db_healthy = await status_repository.health_check()
+        db_stats = await status_repository.stats()
         
         uptime = time.time() - app.state.start_time
         
@@ -169,52 +472,71 @@ async def health_check():
 @api_router.get("/metrics", response_model=MetricsResponse, tags=["monitoring"])
 async def get_metrics():
     """Application metrics endpoint"""
-    try:
-        import psutil
-        process = psutil.Process()
-        memory_info = process.memory_info()
-        
-        db_stats = await db_manager.get_stats()
-        uptime = time.time() - app.state.start_time
-        
-        return MetricsResponse(
-            requests_total=getattr(app.state, 'request_count', 0),
-            database_stats=db_stats,
-            uptime_seconds=uptime,
-            memory_usage={
-                "rss": memory_info.rss,
-                "vms": memory_info.vms,
-                "percent": process.memory_percent()
-            }
-        )
-    except ImportError:
-        # psutil not available
-        db_stats = await db_manager.get_stats()
-        uptime = time.time() - app.state.start_time
-        
-        return MetricsResponse(
-            requests_total=getattr(app.state, 'request_count', 0),
-            database_stats=db_stats,
-            uptime_seconds=uptime,
-            memory_usage={"message": "Memory monitoring not available"}
-        )
+    db_stats = await status_repository.stats()
+    uptime = time.time() - app.state.start_time
+    
+    return MetricsResponse(
+        requests_total=getattr(app.state, 'request_count', 0),
+        database_stats=db_stats,
+        uptime_seconds=uptime,
+        memory_usage=get_memory_usage(),
+        circuit_breaker=db_manager.breaker.snapshot(),
+        concurrency=concurrency_limiter.snapshot(),
+        status_query_cache=status_query_coalescer.snapshot(),
+        status_counts=status_counter.snapshot(),
+        write_concerns=db_manager.write_concern_snapshot(),
+        status_stream=status_broadcaster.snapshot(),
+        client_registry=client_registry.snapshot(),
+        idempotency=idempotency_store.snapshot(),
+        profiling=request_profiler.snapshot(),
+        memory_tracing=memory_diagnostics.snapshot(),
+        tracing=tracer.snapshot(),
+        event_loop=loop_monitor.snapshot(),
+        executor=offload_executor.snapshot(),
+        static_files=static_bundle.snapshot(),
+        error_log=error_log_throttle.snapshot()
+    )
 
 @api_router.post("/status", response_model=StatusCheck, tags=["status"])
-async def create_status_check(input: StatusCheckCreate, request: Request):
+async def create_status_check(
+    input: StatusCheckCreate,
+    idempotency_key: Optional[str] = Header(
+        None, min_length=1, max_length=255, description="Retries with the same key return the first response"
+    ),
+    x_write_concern: Optional[str] = Header(
+        None, description="Write concern tier for this insert, if listed in WRITE_CONCERN_HEADER_TIERS"
+    )
+):
+    """Create a new status check, at most once per Idempotency-Key"""
+    write_concern = requested_write_concern(x_write_concern)
+    # Before the idempotency store, which needs the database too
+    if not status_repository.ready:
+        raise ServiceUnavailableError("Database not connected")
+    if idempotency_key is None:
+        return await insert_status_check(input, write_concern)
+    
+    async def produce():
+        return 200, (await insert_status_check(input, write_concern)).model_dump_json().encode()
+    
+    fingerprint = request_fingerprint("POST /api/status", input.model_dump_json())
+    stored, replayed = await idempotency_store.execute(idempotency_key, fingerprint, produce)
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true" if replayed else "false"}
+    )
+
+async def insert_status_check(input: StatusCheckCreate, write_concern: Optional[str] = None) -> StatusCheck:
     """Create a new status check with enhanced error handling"""
     start_time = time.time()
-    request_id = getattr(request.state, "request_id", "unknown")
     
     try:
-        logger.info(
-            "Creating status check",
-            client_name=input.client_name,
-            request_id=request_id
-        )
+        logger.info("Creating status check", client_name=input.client_name)
         
         # Get database
-        if db_manager.database is None:
-            raise DatabaseError("Database not connected")
+        if not status_repository.ready:
+            raise ServiceUnavailableError("Database not connected")
         
         # Create status object
         status_dict = input.dict()
@@ -222,21 +544,23 @@ async def create_status_check(input: StatusCheckCreate, request: Request):
         
         # Insert into database with retry logic
         try:
-            result = await db_manager.database.status_checks.insert_one(status_obj.dict())
-            if not result.inserted_id:
-                raise DatabaseError("Failed to insert status check")
+            await status_repository.insert(status_obj.dict(), write_concern=write_concern)
+        except APIError:
+            raise
         except Exception as db_error:
             log_error(logger, db_error, {
                 "operation": "insert_status_check",
-                "client_name": input.client_name,
-                "request_id": request_id
+                "client_name": input.client_name
             })
             raise DatabaseError("Database operation failed")
         
+        # Without a change stream, live subscribers are fed from here
+        if status_broadcaster.publishes_locally:
+            status_broadcaster.publish(StatusRecord.from_fields(status_obj.id, status_obj.client_name, status_obj.timestamp))
+        
         # Log success
         duration = time.time() - start_time
-        log_performance(logger, "create_status_check", duration, 
-                       client_name=input.client_name, request_id=request_id)
+        log_performance(logger, "create_status_check", duration, client_name=input.client_name)
         
         # Increment request counter
         app.state.request_count = getattr(app.state, 'request_count', 0) + 1
@@ -249,44 +573,68 @@ async def create_status_check(input: StatusCheckCreate, request: Request):
     except Exception as e:
         log_error(logger, e, {
             "operation": "create_status_check",
-            "client_name": input.client_name,
-            "request_id": request_id
+            "client_name": input.client_name
         })
         raise DatabaseError("Failed to create status check")
 
-@api_router.get("/status", response_model=List[StatusCheck], tags=["status"])
+def build_status_checks_page(status_checks: List[Dict[str, Any]], fields: Fields = None) -> tuple:
+    """Validate and serialize raw status check documents into a JSON body"""
+    if fields is not None:
+        partial = [StatusCheckFields(**status_check) for status_check in status_checks]
+        return len(partial), status_check_fields_list_adapter.dump_json(partial, exclude_unset=True)
+    result = [StatusCheck(**status_check) for status_check in status_checks]
+    return len(result), status_check_list_adapter.dump_json(result)
+
+async def load_status_checks_page(client_name: Optional[str], skip: int, limit: int, fields: Fields = None) -> tuple:
+    """Fetch one page of status checks and serialize it once for every waiter"""
+    status_checks = await status_repository.list(client_name, skip=skip, limit=limit, fields=fields)
+    with profile_phase("serialization"):
+        # Large pages are built in the worker pool so small requests keep flowing
+        return await offload_executor.run(build_status_checks_page, status_checks, fields, size=len(status_checks))
+
+@api_router.get("/status", response_model=List[Union[StatusCheck, StatusCheckFields]], tags=["status"])
 async def get_status_checks(
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    client_name: Optional[str] = Query(None, description="Filter by client name")
+    client_name: Optional[str] = Query(None, description="Filter by client name"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    total: Optional[str] = Query(
+        None,
+        pattern=f"^({'|'.join(COUNT_MODES)})$",
+        description="Report the total in X-Total-Count: estimated or exact (at-least when it times out)"
+    )
 ):
     """Get status checks with pagination and filtering"""
     start_time = time.time()
     
     try:
-        logger.info("Fetching status checks", limit=limit, skip=skip, client_name=client_name)
-        
-        if db_manager.database is None:
-            raise DatabaseError("Database not connected")
+        logger.info("Fetching status checks", limit=limit, skip=skip, client_name=client_name, fields=fields)
         
-        # Build query
-        query = {}
-        if client_name:
-            query["client_name"] = {"$regex": client_name, "$options": "i"}
+        selected = requested_fields(fields)
         
-        # Execute query with pagination
-        cursor = db_manager.database.status_checks.find(query).skip(skip).limit(limit)
-        status_checks = await cursor.to_list(length=limit)
+        if not status_repository.ready:
+            raise ServiceUnavailableError("Database not connected")
         
-        # Convert to response models
-        result = [StatusCheck(**status_check) for status_check in status_checks]
+        # Execute query with pagination, coalesced with identical in-flight queries
+        key = normalize_query_key("status_checks", limit=limit, skip=skip, client_name=client_name, fields=selected)
+        page = status_query_coalescer.get(
+            key, lambda: load_status_checks_page(client_name or None, skip, limit, selected)
+        )
+        headers = {}
+        if total is None:
+            count, body = await page
+        else:
+            # The total is counted while the page is fetched
+            (count, body), total_count = await asyncio.gather(page, status_counter.total(client_name, total))
+            total_count = total_count.at_least(skip + count if count else 0)
+            headers = {"X-Total-Count": str(total_count.value), "X-Total-Count-Type": total_count.kind}
         
         # Log performance
         duration = time.time() - start_time
         log_performance(logger, "get_status_checks", duration, 
-                       count=len(result), limit=limit, skip=skip)
+                       count=count, limit=limit, skip=skip)
         
-        return result
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except APIError:
         raise
@@ -294,16 +642,131 @@ async def get_status_checks(
         log_error(logger, e, {"operation": "get_status_checks"})
         raise DatabaseError("Failed to fetch status checks")
 
-@api_router.get("/status/{status_id}", response_model=StatusCheck, tags=["status"])
-async def get_status_check(status_id: str):
+def parse_last_event_id(value: Optional[str]) -> Optional[str]:
+    """Parse a Last-Event-ID value, ignoring anything that is not ours"""
+    if not value:
+        return None
+    timestamp_ms, _, status_id = value.partition("-")
+    return value if len(timestamp_ms) == 13 and timestamp_ms.isdigit() and status_id else None
+
+@api_router.get("/status/stream", tags=["status"])
+async def stream_status_checks(last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """Server-sent events feed of newly created status checks"""
+    if not status_broadcaster.has_capacity():
+        raise ServiceUnavailableError("Too many stream subscribers")
+    
+    subscription = status_broadcaster.subscribe(parse_last_event_id(last_event_id))
+    return StreamingResponse(
+        sse_events(status_broadcaster, subscription, settings.status_stream_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.websocket("/status/ws")
+async def status_checks_websocket(websocket: WebSocket):
+    """WebSocket feed of newly created status checks"""
+    if not status_broadcaster.has_capacity():
+        await websocket.close(code=1013)
+        return
+    
+    await websocket.accept()
+    subscription = status_broadcaster.subscribe(
+        parse_last_event_id(websocket.query_params.get("last_event_id"))
+    )
+    try:
+        while True:
+            try:
+                event = await subscription.next_event(settings.status_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                await websocket.send_text('{"type":"heartbeat"}')
+                continue
+            if event is None:
+                break
+            event_id, data = event
+            await websocket.send_text(f'{{"type":"status_check","id":"{event_id}","data":{data}}}')
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        status_broadcaster.unsubscribe(subscription)
+
+def build_status_check_batch(status_checks: List[Dict[str, Any]], missing: List[str]) -> bytes:
+    """Serialize a batch lookup result"""
+    result = StatusCheckBatchResult.model_construct(
+        results=[StatusCheck(**status_check) for status_check in status_checks],
+        missing=missing
+    )
+    return result.model_dump_json().encode()
+
+@api_router.post("/status/batch-get", response_model=StatusCheckBatchResult, tags=["status"])
+async def batch_get_status_checks(batch: StatusCheckBatchGet):
+    """Look up many status checks by ID in one request
+    
+    Ids are compared in canonical UUID form, so spellings of one id (upper
+    case, braces, no hyphens) are looked up and returned once, at their
+    first position; missing ids are reported in that form too.
+    """
+    start_time = time.time()
+    
+    try:
+        logger.info("Fetching status check batch", ids=len(batch.ids))
+        
+        if not status_repository.ready:
+            raise ServiceUnavailableError("Database not connected")
+        
+        # Validate UUID format and normalize to the stored spelling
+        requested_ids = []
+        invalid_ids = []
+        for status_id in batch.ids:
+            try:
+                requested_ids.append(str(uuid.UUID(status_id)))
+            except ValueError:
+                invalid_ids.append(status_id)
+        if invalid_ids:
+            raise ValidationError(
+                "Invalid status check ID format",
+                details={"invalid_ids": invalid_ids[:20], "invalid_count": len(invalid_ids)}
+            )
+        
+        # One $in query per chunk instead of a request per id
+        status_ids = list(dict.fromkeys(requested_ids))
+        found = await status_repository.get_many(status_ids)
+        status_checks = [found[status_id] for status_id in status_ids if status_id in found]
+        missing = [status_id for status_id in status_ids if status_id not in found]
+        
+        with profile_phase("serialization"):
+            body = await offload_executor.run(
+                build_status_check_batch, status_checks, missing, size=len(status_checks)
+            )
+        
+        # Log performance
+        duration = time.time() - start_time
+        log_performance(logger, "batch_get_status_checks", duration,
+                       requested=len(status_ids), found=len(status_checks))
+        
+        return Response(content=body, media_type="application/json")
+        
+    except APIError:
+        raise
+    except Exception as e:
+        log_error(logger, e, {"operation": "batch_get_status_checks", "ids": len(batch.ids)})
+        raise DatabaseError("Failed to fetch status checks")
+
+@api_router.get("/status/{status_id}", response_model=Union[StatusCheck, StatusCheckFields], tags=["status"])
+async def get_status_check(
+    status_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Get a specific status check by ID"""
     start_time = time.time()
     
     try:
-        logger.info("Fetching status check", status_id=status_id)
+        logger.info("Fetching status check", status_id=status_id, fields=fields)
         
-        if db_manager.database is None:
-            raise DatabaseError("Database not connected")
+        selected = requested_fields(fields)
+        
+        if not status_repository.ready:
+            raise ServiceUnavailableError("Database not connected")
         
         # Validate UUID format
         try:
@@ -311,9 +774,8 @@ async def get_status_check(status_id: str):
         except ValueError:
             raise ValidationError("Invalid status check ID format")
         
-        # Find status check
-        status_check = await db_manager.database.status_checks.find_one({"id": status_id})
-        
+        # Find status check, fetching only the requested fields
+        status_check = await status_repository.get(status_id, fields=selected)
         if not status_check:
             raise NotFoundError("Status check", status_id)
         
@@ -321,6 +783,9 @@ async def get_status_check(status_id: str):
         duration = time.time() - start_time
         log_performance(logger, "get_status_check", duration, status_id=status_id)
         
+        if selected is not None:
+            body = StatusCheckFields(**status_check).model_dump_json(exclude_unset=True)
+            return Response(content=body, media_type="application/json")
         return StatusCheck(**status_check)
         
     except APIError:
@@ -329,6 +794,104 @@ async def get_status_check(status_id: str):
         log_error(logger, e, {"operation": "get_status_check", "status_id": status_id})
         raise DatabaseError("Failed to fetch status check")
 
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Allow admin endpoints only with the configured ADMIN_TOKEN"""
+    if not settings.admin_token:
+        raise AuthorizationError("Admin API is disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise AuthorizationError("Invalid admin token")
+
+@api_router.get("/admin/profiles", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def list_profiles():
+    """Summaries of the most recent request profiles"""
+    return {"profiling": request_profiler.snapshot(), "profiles": request_profiler.list_profiles()}
+
+@api_router.get("/admin/profiles/{profile_id}", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def download_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed|summary)$", description="Download format")
+):
+    """Download one request profile as speedscope JSON or collapsed stacks"""
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        raise NotFoundError("Profile", profile_id)
+    
+    if format == "summary":
+        return profile.summary()
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed.txt"'}
+        )
+    return JSONResponse(
+        profile.speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'}
+    )
+
+class MemoryTracingStart(BaseModel):
+    """Start memory tracing request model"""
+    frames: Optional[int] = Field(None, ge=1, le=100, description="Stack frames kept per allocation")
+
+def memory_snapshot_or_404(snapshot_id: str):
+    snapshot = memory_diagnostics.get(snapshot_id)
+    if snapshot is None:
+        raise NotFoundError("Memory snapshot", snapshot_id)
+    return snapshot
+
+@api_router.get("/admin/memory", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def memory_overview():
+    """Process memory, collector statistics, tracing state and kept snapshots"""
+    return {
+        "memory_usage": get_memory_usage(),
+        "tracing": memory_diagnostics.snapshot(),
+        "snapshots": memory_diagnostics.list_snapshots()
+    }
+
+@api_router.post("/admin/memory/tracing", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def start_memory_tracing(input: MemoryTracingStart):
+    """Start tracing allocations with tracemalloc"""
+    memory_diagnostics.start(input.frames)
+    return memory_diagnostics.snapshot()
+
+@api_router.delete("/admin/memory/tracing", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def stop_memory_tracing():
+    """Stop tracing allocations and drop the snapshots"""
+    memory_diagnostics.stop()
+    return memory_diagnostics.snapshot()
+
+@api_router.post("/admin/memory/snapshots", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def take_memory_snapshot(
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$", description="Group allocations by"),
+    limit: int = Query(20, ge=1, le=500, description="Allocation sites to return")
+):
+    """Snapshot traced allocations and return the largest sites"""
+    if not memory_diagnostics.tracing:
+        raise ValidationError("Memory tracing is not started")
+    # Snapshots walk every traced block; keep that off the event loop
+    snapshot = await asyncio.to_thread(memory_diagnostics.take_snapshot)
+    top = await asyncio.to_thread(snapshot.top, group_by, limit)
+    return {**snapshot.summary(), "top": top}
+
+@api_router.get("/admin/memory/snapshots/{snapshot_id}", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def get_memory_snapshot(
+    snapshot_id: str,
+    compare_to: Optional[str] = Query(None, description="Id of an earlier snapshot to diff against"),
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$", description="Group allocations by"),
+    limit: int = Query(20, ge=1, le=500, description="Allocation sites to return")
+):
+    """Largest allocation sites of a snapshot, or what changed since another"""
+    snapshot = memory_snapshot_or_404(snapshot_id)
+    if compare_to is None:
+        return {**snapshot.summary(), "top": await asyncio.to_thread(snapshot.top, group_by, limit)}
+    base = memory_snapshot_or_404(compare_to)
+    diff = await asyncio.to_thread(snapshot.compare_to, base, group_by, limit)
+    return {**snapshot.summary(), "compared_to": base.summary(), "diff": diff}
+
+@api_router.get("/admin/memory/objects", tags=["admin"], dependencies=[Depends(require_admin_token)])
+async def get_object_counts(limit: int = Query(30, ge=1, le=500, description="Types to return")):
+    """Live objects by type, most numerous first"""
+    return {"gc": gc_stats(), "objects": await asyncio.to_thread(object_counts, limit)}
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -0,0 +1,275 @@
+"""
+Static frontend serving with precompressed, content-hashed assets
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import structlog
+from starlette.responses import FileResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .middleware import SECURITY_HEADERS
+
+logger = structlog.get_logger(__name__)
+
+# Vite names build output like index-B7x2kQ9a.js; the hash segment has at least
+# eight characters and contains a digit or capital, unlike ordinary words
+HASHED_NAME = re.compile(r"[.-](?=[A-Za-z0-9_]*[0-9A-Z])[A-Za-z0-9_]{8,}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_TYPES = frozenset({
+    "application/javascript", "text/javascript", "application/json", "application/manifest+json",
+    "application/xml", "image/svg+xml", "application/wasm", "font/ttf", "font/otf", "image/x-icon",
+    "image/vnd.microsoft.icon"
+})
+
+# The API's Content-Security-Policy would block the app's calls to other origins
+STATIC_HEADERS = {name: value for name, value in SECURITY_HEADERS.items() if name != "Content-Security-Policy"}
+
+def load_brotli():
+    """Return the brotli module, or None if it is not installed"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+def accepted_encodings(header: str) -> List[str]:
+    """Content codings from an Accept-Encoding header, excluding q=0"""
+    encodings = []
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q=") and params[2:] in ("0", "0.0", "0.00", "0.000"):
+            continue
+        encodings.append(coding.strip().lower())
+    return encodings
+
+class StaticAsset:
+    """One file of the build output with its precomputed variants
+    
+    Files up to the bundle's memory limit keep their body in memory; larger
+    ones are sent with FileResponse, which uses zero-copy pathsend when the
+    server supports it. Compressed variants are always held in memory.
+    """
+    
+    __slots__ = ("path", "stat_result", "media_type", "etag", "cache_control", "body", "encodings")
+    
+    def __init__(
+        self,
+        path: Path,
+        stat_result: os.stat_result,
+        media_type: str,
+        etag: str,
+        cache_control: str,
+        body: Optional[bytes],
+        encodings: Dict[str, bytes]
+    ):
+        self.path = path
+        self.stat_result = stat_result
+        self.media_type = media_type
+        self.etag = etag
+        self.cache_control = cache_control
+        self.body = body
+        self.encodings = encodings
+    
+    def headers(self, encoding: Optional[str], length: int) -> Dict[str, str]:
+        headers = {
+            **STATIC_HEADERS,
+            "Content-Type": self.media_type,
+            "Content-Length": str(length),
+            "Cache-Control": self.cache_control,
+            "ETag": self.etag
+        }
+        if self.encodings:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+class StaticBundle:
+    """Build output loaded once at startup
+    
+    load() walks the directory, hashes every file for its ETag, marks
+    content-hashed filenames as immutable and precompresses text assets with
+    brotli (if installed) and gzip, keeping a variant only when it is smaller.
+    """
+    
+    def __init__(
+        self,
+        root: str,
+        memory_max_bytes: int = 262144,
+        compress_min_bytes: int = 1024,
+        index: str = "index.html"
+    ):
+        self.root = Path(root)
+        self.memory_max_bytes = memory_max_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.index_name = index
+        self.assets: Dict[str, StaticAsset] = {}
+        self.loaded = False
+        self.served_total = 0
+        self.not_modified_total = 0
+        self.encoded_total: Dict[str, int] = {"br": 0, "gzip": 0}
+    
+    @property
+    def index(self) -> Optional[StaticAsset]:
+        return self.assets.get(self.index_name)
+    
+    def load(self) -> int:
+        """Read and precompress the build output; returns the number of files"""
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"Static files directory {self.root} does not exist")
+        
+        brotli = load_brotli()
+        assets = {}
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file():
+                continue
+            relative = path.relative_to(self.root).as_posix()
+            assets[relative] = self._load_asset(path, relative, brotli)
+        
+        self.assets = assets
+        self.loaded = True
+        logger.info(
+            "Static files loaded",
+            root=str(self.root),
+            files=len(assets),
+            brotli=brotli is not None,
+            index=self.index is not None
+        )
+        return len(assets)
+    
+    def _load_asset(self, path: Path, relative: str, brotli) -> StaticAsset:
+        stat_result = path.stat()
+        media_type = mimetypes.guess_type(relative)[0] or "application/octet-stream"
+        compress = is_compressible(media_type) and stat_result.st_size >= self.compress_min_bytes
+        
+        digest = hashlib.sha256()
+        body = None
+        if compress or stat_result.st_size <= self.memory_max_bytes:
+            body = path.read_bytes()
+            digest.update(body)
+        else:
+            with path.open("rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+        
+        encodings = {}
+        if compress:
+            if brotli is not None:
+                encodings["br"] = brotli.compress(body, quality=11)
+            encodings["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            encodings = {name: data for name, data in encodings.items() if len(data) < len(body)}
+        if body is not None and len(body) > self.memory_max_bytes:
+            # Only needed for compression; the identity body is sent from disk
+            body = None
+        
+        if media_type.startswith("text/") and "charset" not in media_type:
+            media_type += "; charset=utf-8"
+        cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_NAME.search(path.name) else REVALIDATE_CACHE_CONTROL
+        return StaticAsset(
+            path, stat_result, media_type, f'"{digest.hexdigest()[:32]}"', cache_control, body, encodings
+        )
+    
+    def lookup(self, relative: str) -> Optional[StaticAsset]:
+        return self.assets.get(relative)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Static file state for the metrics endpoint"""
+        return {
+            "loaded": self.loaded,
+            "files": len(self.assets),
+            "precompressed_files": sum(1 for asset in self.assets.values() if asset.encodings),
+            "served_total": self.served_total,
+            "not_modified_total": self.not_modified_total,
+            "encoded_total": dict(self.encoded_total)
+        }
+
+class StaticFilesMiddleware:
+    """Serve the frontend build ahead of every other middleware
+    
+    GET and HEAD requests under mount_path that name a file of the bundle are
+    answered here, so they never reach request logging, rate limiting or the
+    concurrency limiter. Paths whose last segment has no extension are SPA
+    routes and get index.html; everything else, and anything under the
+    excluded prefixes, goes to the application.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        bundle: StaticBundle,
+        mount_path: str = "/",
+        exclude_prefixes: Sequence[str] = ("/api",)
+    ):
+        self.app = app
+        self.bundle = bundle
+        self.mount_path = mount_path
+        self.exclude_prefixes = tuple(exclude_prefixes)
+    
+    def resolve(self, path: str) -> Optional[StaticAsset]:
+        if path + "/" == self.mount_path:
+            return self.bundle.index
+        if not path.startswith(self.mount_path) or path.startswith(self.exclude_prefixes):
+            return None
+        relative = path[len(self.mount_path):]
+        asset = self.bundle.lookup(relative)
+        if asset is None and "." not in relative.rsplit("/", 1)[-1]:
+            asset = self.bundle.index
+        return asset
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or not self.bundle.loaded:
+            await self.app(scope, receive, send)
+            return
+        
+        asset = self.resolve(scope["path"])
+        if asset is None:
+            await self.app(scope, receive, send)
+            return
+        
+        request_headers = {}
+        for name, value in scope["headers"]:
+            if name in (b"accept-encoding", b"if-none-match"):
+                request_headers[name] = value.decode("latin-1")
+        
+        self.bundle.served_total += 1
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or asset.etag in if_none_match):
+            self.bundle.not_modified_total += 1
+            headers = [(b"etag", asset.etag.encode()), (b"cache-control", asset.cache_control.encode())]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        encoding = None
+        if asset.encodings:
+            accepted = accepted_encodings(request_headers.get(b"accept-encoding", ""))
+            encoding = next((name for name in ("br", "gzip") if name in asset.encodings and name in accepted), None)
+        
+        if encoding is not None:
+            self.bundle.encoded_total[encoding] += 1
+            body = asset.encodings[encoding]
+        elif asset.body is not None:
+            body = asset.body
+        else:
+            headers = asset.headers(None, asset.stat_result.st_size)
+            response = FileResponse(asset.path, headers=headers, stat_result=asset.stat_result)
+            await response(scope, receive, send)
+            return
+        
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in asset.headers(encoding, len(body)).items()
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
@@ -0,0 +1,55 @@
+"""
+Status check id storage: string field or native binary UUID _id
+"""
+import uuid
+from typing import Any, Dict, List, Union
+
+class StatusIdCodec:
+    """Translate between the API's string id and how the id is stored
+    
+    In "string" mode documents keep the API id in an "id" field next to
+    MongoDB's ObjectId _id. In "uuid" mode the id becomes the _id itself,
+    stored as BSON binary subtype 4 (the client needs
+    uuidRepresentation="standard"), so each document carries one 16-byte
+    identifier and lookups use the _id index. Reads accept both layouts, so
+    a collection can be migrated while the app runs.
+    """
+    
+    def __init__(self, mode: str = "string"):
+        self.mode = mode
+    
+    @property
+    def uses_uuid(self) -> bool:
+        return self.mode == "uuid"
+    
+    def encode(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Storage form of a status check document"""
+        if not self.uses_uuid:
+            return document
+        stored = {"_id": uuid.UUID(document["id"])}
+        stored.update((key, value) for key, value in document.items() if key != "id")
+        return stored
+    
+    @staticmethod
+    def decode(document: Dict[str, Any]) -> Dict[str, Any]:
+        """Restore the API "id" field in place; either layout is accepted"""
+        _id = document.pop("_id", None)
+        if isinstance(_id, uuid.UUID):
+            document["id"] = str(_id)
+        return document
+    
+    def lookup_filters(self, status_id: Union[str, uuid.UUID]):
+        """Filters to try, in order, to find one status check by id"""
+        if not self.uses_uuid:
+            return [{"id": str(status_id)}]
+        # Documents written before the migration still have a string id
+        return [{"_id": uuid.UUID(str(status_id))}, {"id": str(status_id)}]
+    
+    def lookup_many_filter(self, status_ids: List[str]) -> Dict[str, Any]:
+        """One $in filter matching any of the ids, in either layout"""
+        if not self.uses_uuid:
+            return {"id": {"$in": list(status_ids)}}
+        return {"$or": [
+            {"_id": {"$in": [uuid.UUID(status_id) for status_id in status_ids]}},
+            {"id": {"$in": list(status_ids)}}
+        ]}
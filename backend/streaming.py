@@ -0,0 +1,243 @@
+"""
+Live feed of new status checks for SSE and WebSocket subscribers
+"""
+import asyncio
+import inspect
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Error codes MongoDB returns when change streams are unavailable
+# (standalone server, or a storage engine without majority read concern)
+CHANGE_STREAMS_UNSUPPORTED_CODES = {40573, 40324}
+
+# Error codes meaning a resume token can no longer be used (ChangeStreamFatalError,
+# ChangeStreamHistoryLost); the stream has to start over from the present
+RESUME_TOKEN_LOST_CODES = {280, 286}
+
+class Subscription:
+    """One subscriber's bounded queue of pre-encoded events"""
+    
+    __slots__ = ("queue", "dropped")
+    
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[Optional[Tuple[str, str]]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+    
+    async def next_event(self, timeout: float) -> Optional[Tuple[str, str]]:
+        """Wait for the next (event_id, json) pair; None means the stream ended
+        
+        Raises asyncio.TimeoutError when nothing arrived within timeout, which
+        callers use to send heartbeats.
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout)
+    
+    def close(self):
+        # Discard anything pending so the end-of-stream marker always fits
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class StatusBroadcaster:
+    """Fan out new status checks to many subscribers from a single source
+    
+    Each event is serialized once with encode and shared by every subscriber.
+    Subscribers get a bounded queue; one that falls behind is dropped instead
+    of slowing down publishing, and can reconnect with its last event id to
+    replay the events still held in the replay buffer. The buffer keeps the
+    published items themselves (compact records in the app) and encodes them
+    again only for a replay.
+    
+    Event ids come from the item with event_id, so every process fed by the
+    same change stream numbers an event alike and a client can resume on any
+    of them. Ids must be unique per item and sort in publish order; an item
+    whose id is still in the replay buffer is a duplicate and is not sent
+    again.
+    """
+    
+    def __init__(
+        self,
+        source: str = "auto",
+        queue_size: int = 100,
+        replay_size: int = 1000,
+        max_subscribers: int = 10000,
+        encode: Callable[[Any], str] = str,
+        event_id: Callable[[Any], str] = str
+    ):
+        self.configured_source = source
+        # Until a change stream is open, new checks are published by the handler
+        self.source = "local"
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self.encode = encode
+        self.event_id = event_id
+        self._replay: "OrderedDict[str, Any]" = OrderedDict()
+        self.last_event_id: Optional[str] = None
+        self.published_total = 0
+        self.duplicates_total = 0
+        self.dropped_total = 0
+    
+    @property
+    def publishes_locally(self) -> bool:
+        return self.source == "local" and self.configured_source != "change_stream"
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+    
+    def has_capacity(self) -> bool:
+        return len(self._subscribers) < self.max_subscribers
+    
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a subscriber, replaying buffered events after last_event_id"""
+        subscription = Subscription(self.queue_size)
+        if last_event_id is not None:
+            for event_id in self._missed(last_event_id)[-self.queue_size:]:
+                subscription.queue.put_nowait((event_id, self.encode(self._replay[event_id])))
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def _missed(self, last_event_id: str) -> List[str]:
+        """Buffered event ids published after last_event_id
+        
+        Events from several processes can arrive slightly out of id order, so
+        an id still in the buffer is located by position; an older one is
+        compared by order.
+        """
+        event_ids = list(self._replay)
+        if last_event_id in self._replay:
+            return event_ids[event_ids.index(last_event_id) + 1:]
+        return [event_id for event_id in event_ids if event_id > last_event_id]
+    
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+    
+    def publish(self, item: Any) -> Optional[str]:
+        """Encode one status check and hand it to every subscriber
+        
+        Returns the event id, or None when the item was already published.
+        """
+        event_id = self.event_id(item)
+        if event_id in self._replay:
+            self.duplicates_total += 1
+            return None
+        event = (event_id, self.encode(item))
+        self._replay[event_id] = item
+        if len(self._replay) > self.replay_size:
+            self._replay.popitem(last=False)
+        self.last_event_id = event_id
+        self.published_total += 1
+        
+        slow: List[Subscription] = []
+        for subscription in self._subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                slow.append(subscription)
+        
+        for subscription in slow:
+            self._drop(subscription)
+        return event_id
+    
+    def _drop(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        subscription.dropped = True
+        subscription.close()
+        self.dropped_total += 1
+        logger.warning("Dropped slow stream subscriber", queue_size=self.queue_size)
+    
+    def close(self):
+        """End every open stream, e.g. at shutdown"""
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Stream state for the metrics endpoint"""
+        return {
+            "source": self.source,
+            "subscribers": len(self._subscribers),
+            "published_total": self.published_total,
+            "duplicates_total": self.duplicates_total,
+            "dropped_total": self.dropped_total,
+            "last_event_id": self.last_event_id
+        }
+
+async def watch_status_changes(
+    broadcaster: StatusBroadcaster,
+    get_collection: Callable[[], Any],
+    to_item: Callable[[Dict[str, Any]], Any],
+    retry_interval: float = 2.0
+):
+    """Feed the broadcaster from one MongoDB change stream per process
+    
+    Resumes after errors with the last seen resume token, which delivers the
+    inserts made while the stream was down, so publishing stays with the
+    stream meanwhile instead of falling back to the handler. Only while no
+    stream has been opened (or its token was lost) does create_status_check
+    publish directly; the broadcaster drops any insert seen both ways. If the
+    deployment does not support change streams (standalone mongod) the
+    broadcaster stays in local mode.
+    """
+    from pymongo.errors import OperationFailure
+    
+    resume_token = None
+    pipeline = [{"$match": {"operationType": "insert"}}]
+    while True:
+        collection = get_collection()
+        if collection is None:
+            await asyncio.sleep(retry_interval)
+            continue
+        
+        try:
+            async with collection.watch(pipeline, resume_after=resume_token) as stream:
+                broadcaster.source = "change_stream"
+                logger.info("Status change stream opened", resumed=resume_token is not None)
+                resume_token = stream.resume_token or resume_token
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    item = to_item(change["fullDocument"])
+                    if inspect.isawaitable(item):
+                        item = await item
+                    broadcaster.publish(item)
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAMS_UNSUPPORTED_CODES:
+                broadcaster.source = "local"
+                logger.info("Change streams unavailable, publishing status checks in-process")
+                return
+            if e.code in RESUME_TOKEN_LOST_CODES:
+                resume_token = None
+            logger.warning("Status change stream failed", error=str(e))
+        except Exception as e:
+            logger.warning("Status change stream failed", error=str(e))
+        
+        # Resuming replays what was missed; publishing locally too would repeat it
+        if resume_token is None:
+            broadcaster.source = "local"
+        await asyncio.sleep(retry_interval)
+
+async def sse_events(
+    broadcaster: StatusBroadcaster,
+    subscription: Subscription,
+    heartbeat_interval: float = 15.0,
+    retry_ms: int = 3000
+) -> AsyncIterator[str]:
+    """Render a subscription as a text/event-stream body"""
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            try:
+                event = await subscription.next_event(heartbeat_interval)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if event is None:
+                return
+            event_id, data = event
+            yield f"id: {event_id}\nevent: status_check\ndata: {data}\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
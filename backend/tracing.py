@@ -0,0 +1,489 @@
+"""
+Lightweight distributed tracing compatible with W3C Trace Context
+
+Spans follow the OpenTelemetry data model (trace/span ids, kind, attributes,
+status) and are propagated through the ``traceparent`` header, so traces
+line up with services instrumented by OpenTelemetry SDKs. Finished spans are
+batched off the event loop and written as JSON lines, which a collector
+(or a file shipper in front of one) can ingest.
+"""
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+import structlog
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .config import settings
+from .profiling import ProfiledRoute
+
+logger = structlog.get_logger(__name__)
+
+TRACEPARENT_HEADER = b"traceparent"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+class SpanContext:
+    """Identifiers propagated between services"""
+    
+    __slots__ = ("trace_id", "span_id", "sampled")
+    
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+    
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """Parse a W3C traceparent header, returning None if it is malformed"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if (
+        len(version) != 2 or version == "ff" or len(trace_id) != 32 or len(span_id) != 16
+        or len(flags) != 2 or (version == "00" and len(parts) != 4)
+    ):
+        return None
+    try:
+        if int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    return SpanContext(trace_id.lower(), span_id.lower(), sampled)
+
+class Span:
+    """One timed operation within a trace"""
+    
+    __slots__ = (
+        "name", "context", "parent_span_id", "kind", "attributes",
+        "start_time", "end_time", "status", "status_message", "recording", "_on_end"
+    )
+    
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_span_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        on_end: Optional[Callable[["Span"], None]] = None,
+        start_time: Optional[int] = None
+    ):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_time = start_time or time.time_ns()
+        self.end_time: Optional[int] = None
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.recording = context.sampled
+        self._on_end = on_end
+    
+    def set_attribute(self, key: str, value: Any):
+        if self.recording:
+            self.attributes[key] = value
+    
+    def set_status(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.status_message = message
+    
+    def record_exception(self, error: BaseException):
+        self.set_status("ERROR", f"{type(error).__name__}: {error}")
+        self.set_attribute("exception.type", type(error).__name__)
+    
+    def end(self, end_time: Optional[int] = None):
+        if self.end_time is not None:
+            return
+        self.end_time = end_time or time.time_ns()
+        if self.recording and self._on_end is not None:
+            self._on_end(self)
+    
+    def to_dict(self, resource: Dict[str, Any]) -> Dict[str, Any]:
+        """OpenTelemetry-style JSON representation"""
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "duration_ms": round(((self.end_time or self.start_time) - self.start_time) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "resource": resource
+        }
+
+class ParentBasedRatioSampler:
+    """Follow the caller's sampling decision, else sample a ratio of new traces
+    
+    The decision for new traces is derived from the trace id, so every
+    service using the same ratio makes the same choice for a trace.
+    """
+    
+    def __init__(self, ratio: float = 1.0):
+        self.ratio = ratio
+        self._bound = int(ratio * (1 << 64))
+    
+    def should_sample(self, parent: Optional[SpanContext], trace_id: str) -> bool:
+        if parent is not None:
+            return parent.sampled
+        return int(trace_id[-16:], 16) < self._bound
+
+class FileSpanExporter:
+    """Append finished spans to a file as JSON lines"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def export(self, spans: List[Dict[str, Any]]):
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(span, separators=(",", ":")) + "\n" for span in spans)
+    
+    def shutdown(self):
+        pass
+
+class InMemorySpanExporter:
+    """Keep exported spans in memory, for tests"""
+    
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+    
+    def export(self, spans: List[Dict[str, Any]]):
+        self.spans.extend(spans)
+    
+    def shutdown(self):
+        pass
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them in batches from a worker thread
+    
+    The queue is bounded; spans arriving while it is full are dropped and
+    counted rather than slowing down request handling.
+    """
+    
+    def __init__(
+        self,
+        exporter: Any,
+        resource: Dict[str, Any],
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        schedule_delay: float = 1.0
+    ):
+        self.exporter = exporter
+        self.resource = resource
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self._queue: Deque[Span] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._export_lock = threading.Lock()
+        self._shutdown = False
+        self.exported_total = 0
+        self.dropped_total = 0
+    
+    def on_end(self, span: Span):
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped_total += 1
+            return
+        self._queue.append(span)
+        if self._thread is None:
+            with self._condition:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+        if len(self._queue) >= self.max_batch_size:
+            with self._condition:
+                self._condition.notify()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._shutdown and len(self._queue) < self.max_batch_size:
+                    self._condition.wait(self.schedule_delay)
+                stopping = self._shutdown
+            self.force_flush()
+            if stopping:
+                return
+    
+    def force_flush(self):
+        """Export everything queued so far"""
+        with self._export_lock:
+            while self._queue:
+                batch = []
+                while self._queue and len(batch) < self.max_batch_size:
+                    batch.append(self._queue.popleft().to_dict(self.resource))
+                try:
+                    self.exporter.export(batch)
+                    self.exported_total += len(batch)
+                except Exception as e:
+                    self.dropped_total += len(batch)
+                    logger.warning("Span export failed", error=str(e), spans=len(batch))
+    
+    def shutdown(self):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.force_flush()
+        self.exporter.shutdown()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "exported_total": self.exported_total,
+            "dropped_total": self.dropped_total
+        }
+
+class Tracer:
+    """Creates spans, tracks the current one and hands finished spans to the processor"""
+    
+    def __init__(
+        self,
+        service_name: str,
+        enabled: bool = False,
+        sampler: Optional[ParentBasedRatioSampler] = None,
+        exporter: Optional[Any] = None
+    ):
+        self.enabled = enabled
+        self.sampler = sampler or ParentBasedRatioSampler()
+        self.resource = {"service.name": service_name}
+        self.processor = BatchSpanProcessor(exporter, self.resource) if exporter is not None else None
+    
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        start_time: Optional[int] = None
+    ) -> Span:
+        """Start a span under parent, or under the current span if parent is None"""
+        if parent is None:
+            span = _current_span.get()
+            parent = span.context if span is not None else None
+        
+        if parent is None:
+            trace_id = _new_id(128)
+            sampled = self.sampler.should_sample(None, trace_id)
+        else:
+            trace_id = parent.trace_id
+            sampled = self.sampler.should_sample(parent, trace_id)
+        
+        on_end = self.processor.on_end if self.processor is not None else None
+        return Span(
+            name,
+            SpanContext(trace_id, _new_id(64), sampled),
+            parent_span_id=parent.span_id if parent is not None else None,
+            kind=kind,
+            attributes=attributes,
+            on_end=on_end,
+            start_time=start_time
+        )
+    
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        """Run the enclosed block in a child span of the current span"""
+        span = self.start_span(name, kind=kind, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+    
+    def shutdown(self):
+        if self.processor is not None:
+            self.processor.shutdown()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Tracer state for the metrics endpoint"""
+        return {
+            "enabled": self.enabled,
+            "sample_ratio": self.sampler.ratio,
+            **(self.processor.snapshot() if self.processor is not None else {})
+        }
+
+class TracingMiddleware:
+    """Start a server span per request, continuing the caller's trace
+    
+    The trace and span ids are bound to structlog's context variables so
+    every log line written while handling the request can be joined to the
+    trace.
+    """
+    
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        parent = None
+        for name, value in scope["headers"]:
+            if name == TRACEPARENT_HEADER:
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        
+        span = self.tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            parent=parent,
+            kind="server",
+            attributes={
+                "http.method": scope["method"],
+                "http.target": scope["path"],
+                "http.scheme": scope.get("scheme", "http")
+            }
+        )
+        scope["trace_server_span"] = span
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_status("ERROR")
+            await send(message)
+        
+        token = _current_span.set(span)
+        try:
+            with structlog.contextvars.bound_contextvars(
+                trace_id=span.context.trace_id, span_id=span.context.span_id
+            ):
+                await self.app(scope, receive, send_with_status)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+class LayerSpanMiddleware:
+    """Wrap the next middleware layer in its own span"""
+    
+    def __init__(self, app: ASGIApp, tracer: Tracer, name: str):
+        self.app = app
+        self.tracer = tracer
+        self.span_name = f"middleware {name}"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        span = _current_span.get()
+        if span is None or not span.recording:
+            await self.app(scope, receive, send)
+            return
+        with self.tracer.span(self.span_name):
+            await self.app(scope, receive, send)
+
+class TracedRoute(ProfiledRoute):
+    """Route that records a handler span and names the server span after the route template"""
+    
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        span_name = f"handler {self.path}"
+        
+        async def route_handler(request):
+            span = _current_span.get()
+            if span is None or not span.recording:
+                return await handler(request)
+            server_span = request.scope.get("trace_server_span")
+            if server_span is not None:
+                server_span.name = f"{request.method} {self.path}"
+                server_span.set_attribute("http.route", self.path)
+            with tracer.span(span_name, attributes={"code.function": self.name}):
+                return await handler(request)
+        
+        return route_handler
+
+@lru_cache(maxsize=1)
+def _command_listener_class() -> type:
+    # pymongo is only imported once a MongoDB client is created
+    from pymongo import monitoring
+    
+    class MongoCommandSpanListener(monitoring.CommandListener):
+        """Record a client span for every MongoDB command issued inside a sampled trace
+        
+        Motor runs driver calls on its executor with a copy of the caller's
+        context, so the current span is visible from the listener callbacks.
+        """
+        
+        def __init__(self, tracer: Tracer):
+            self.tracer = tracer
+            self._spans: Dict[Any, Span] = {}
+        
+        def started(self, event):
+            parent = _current_span.get()
+            if parent is None or not parent.recording:
+                return
+            host, port = event.connection_id
+            target = event.command.get(event.command_name)
+            span = self.tracer.start_span(
+                f"mongodb.{event.command_name}",
+                parent=parent.context,
+                kind="client",
+                attributes={
+                    "db.system": "mongodb",
+                    "db.name": event.database_name,
+                    "db.operation": event.command_name,
+                    "db.mongodb.collection": target if isinstance(target, str) else None,
+                    "net.peer.name": host,
+                    "net.peer.port": port
+                }
+            )
+            self._spans[(event.connection_id, event.request_id)] = span
+        
+        def succeeded(self, event):
+            span = self._spans.pop((event.connection_id, event.request_id), None)
+            if span is not None:
+                span.end(span.start_time + event.duration_micros * 1000)
+        
+        def failed(self, event):
+            span = self._spans.pop((event.connection_id, event.request_id), None)
+            if span is not None:
+                span.set_status("ERROR", str(event.failure.get("errmsg", "")))
+                span.set_attribute("db.mongodb.error_code", event.failure.get("code"))
+                span.end(span.start_time + event.duration_micros * 1000)
+    
+    return MongoCommandSpanListener
+
+def mongo_command_listener(tracer: Tracer):
+    """pymongo CommandListener recording MongoDB command spans"""
+    return _command_listener_class()(tracer)
+
+def create_tracer() -> Tracer:
+    """Build the tracer described by the settings"""
+    exporter = None
+    if settings.tracing_exporter == "file":
+        exporter = FileSpanExporter(settings.tracing_file_path)
+    return Tracer(
+        service_name=settings.tracing_service_name,
+        enabled=settings.tracing_enabled,
+        sampler=ParentBasedRatioSampler(settings.tracing_sample_ratio),
+        exporter=exporter
+    )
+
+# Global tracer instance
+tracer = create_tracer()
@@ -0,0 +1,108 @@
+"""
+Resolving many status check ids: one GET per id versus POST /api/status/batch-get
+
+Drives the app in-process against the in-memory Mongo stand-in, whose
+per-operation service time models a database round trip. For each batch
+size, the same random ids are resolved either with concurrent
+GET /api/status/{id} requests (each a full middleware pass and a find_one)
+or with one batch-get request (one $in query per chunk).
+
+Usage:
+    python -m benchmarks.bench_batch_get --sizes 10 100 1000 --concurrency 16 --output batch_get.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .common import percentile, run_metadata
+from .fakes import FakeDatabase
+
+import httpx
+
+from backend.database import db_manager
+from backend.server import app, concurrency_limiter
+
+async def resolve_individually(client: httpx.AsyncClient, ids: List[str], concurrency: int):
+    queue = iter(ids)
+    
+    async def worker():
+        for status_id in queue:
+            response = await client.get(f"/api/status/{status_id}")
+            assert response.status_code == 200
+    
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+async def resolve_batch(client: httpx.AsyncClient, ids: List[str], concurrency: int):
+    response = await client.post("/api/status/batch-get", json={"ids": ids})
+    assert response.status_code == 200 and not response.json()["missing"]
+
+MODES = {"individual": resolve_individually, "batch": resolve_batch}
+
+async def run(args) -> Dict[str, Any]:
+    database = FakeDatabase(pool_size=100, service_time=args.service_time_ms / 1000)
+    db_manager.database = database
+    start = datetime(2024, 1, 1)
+    ids = [str(uuid.uuid4()) for _ in range(args.documents)]
+    database.status_checks.documents = [
+        {"id": status_id, "client_name": f"client-{index % 50}", "timestamp": start + timedelta(seconds=index)}
+        for index, status_id in enumerate(ids)
+    ]
+    rng = random.Random(1)
+    
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in args.sizes:
+            row: Dict[str, Any] = {}
+            for mode, resolve in MODES.items():
+                samples = []
+                for _ in range(args.rounds + 1):
+                    wanted = rng.sample(ids, size)
+                    begin = time.perf_counter()
+                    await resolve(client, wanted, args.concurrency)
+                    samples.append(time.perf_counter() - begin)
+                # The first round warms up caches and lazy imports
+                samples = samples[1:]
+                row[mode] = {
+                    "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                    "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                    "ids_per_second": round(size / statistics.fmean(samples), 1)
+                }
+            row["speedup"] = round(row["individual"]["mean_ms"] / row["batch"]["mean_ms"], 2)
+            results[f"ids={size}"] = row
+            print(f"ids={size:<6} individual {row['individual']['mean_ms']:>10} ms  "
+                  f"batch {row['batch']['mean_ms']:>9} ms  speedup {row['speedup']}x")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Ids resolved per round")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent GETs in the individual mode")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--documents", type=int, default=5000, help="Status checks in the collection")
+    parser.add_argument("--service-time-ms", type=float, default=1.0, help="Simulated database round trip")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    # Measure the lookups themselves, not load shedding of the GET fan-out
+    concurrency_limiter.enabled = False
+    results = asyncio.run(run(args))
+    
+    if args.output:
+        meta = run_metadata(
+            sizes=args.sizes, concurrency=args.concurrency, rounds=args.rounds,
+            documents=args.documents, service_time_ms=args.service_time_ms
+        )
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Heartbeat submission and bulk reads: ad-hoc requests versus the status_client SDK
+
+"adhoc" sends heartbeats the way agents did before the SDK: one at a time,
+each on a fresh HTTP client (so a fresh connection over the network), with
+no retries. "sdk" submits the same number through one pooled StatusClient
+with create_status_checks at --concurrency in flight, then reads everything
+back with iter_status_checks, which prefetches the next page while the
+current one is consumed.
+
+By default the app runs in-process behind httpx.ASGITransport against the
+in-memory Mongo stand-in, whose service time models a database round trip;
+there are no sockets there, so connection reuse saves nothing and the gain
+is from concurrency alone. Pass --url to run against a live server, where
+connection setup and HTTP/2 (with h2 installed) count too.
+
+Usage:
+    python -m benchmarks.bench_client --heartbeats 2000 --concurrency 64 --output client.json
+    python -m benchmarks.bench_client --url http://localhost:8001 --heartbeats 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .common import run_metadata
+from .fakes import FakeDatabase
+
+import httpx
+
+from status_client import StatusClient
+
+async def adhoc(base_url: str, count: int, transport: Optional[Callable[[], httpx.AsyncBaseTransport]]) -> float:
+    start = time.perf_counter()
+    for n in range(count):
+        async with httpx.AsyncClient(base_url=base_url, transport=transport() if transport else None) as client:
+            response = await client.post("/api/status", json={"client_name": f"adhoc-{n % 100}"})
+            response.raise_for_status()
+    return time.perf_counter() - start
+
+async def run(args) -> Dict[str, Any]:
+    transport: Optional[Callable[[], httpx.AsyncBaseTransport]] = None
+    base_url = args.url or "http://bench"
+    if not args.url:
+        from backend.database import db_manager
+        from backend.server import app, concurrency_limiter
+        
+        db_manager.database = FakeDatabase(pool_size=100, service_time=args.service_time_ms / 1000)
+        # Measure the client, not load shedding of the burst it sends
+        concurrency_limiter.enabled = False
+        transport = lambda: httpx.ASGITransport(app=app)
+    
+    results: Dict[str, Any] = {}
+    elapsed = await adhoc(base_url, args.heartbeats, transport)
+    results["adhoc"] = {"seconds": round(elapsed, 3), "heartbeats_per_second": round(args.heartbeats / elapsed, 1)}
+    
+    async with StatusClient(
+        base_url,
+        max_connections=args.connections,
+        max_concurrency=args.concurrency,
+        transport=transport() if transport else None
+    ) as client:
+        start = time.perf_counter()
+        await client.create_status_checks(f"sdk-{n % 100}" for n in range(args.heartbeats))
+        elapsed = time.perf_counter() - start
+        results["sdk"] = {
+            "seconds": round(elapsed, 3),
+            "heartbeats_per_second": round(args.heartbeats / elapsed, 1),
+            "retries": client.retries_total,
+            "http2": client.http2
+        }
+        
+        start = time.perf_counter()
+        read = 0
+        async for _ in client.iter_status_checks(page_size=args.page_size):
+            read += 1
+        elapsed = time.perf_counter() - start
+        results["sdk_iterate"] = {"seconds": round(elapsed, 3), "records": read, "records_per_second": round(read / elapsed, 1)}
+    
+    results["speedup"] = round(results["sdk"]["heartbeats_per_second"] / results["adhoc"]["heartbeats_per_second"], 2)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--heartbeats", type=int, default=2000, help="Heartbeats submitted per mode")
+    parser.add_argument("--concurrency", type=int, default=64, help="Heartbeats in flight with the SDK")
+    parser.add_argument("--connections", type=int, default=10, help="SDK connection pool size")
+    parser.add_argument("--page-size", type=int, default=500, help="Page size when reading back")
+    parser.add_argument("--service-time-ms", type=float, default=1.0, help="Simulated database round trip (in-process)")
+    parser.add_argument("--url", help="Base URL of a running server instead of the in-process app")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    for mode in ("adhoc", "sdk"):
+        print(f"{mode:<6} {results[mode]['heartbeats_per_second']:>10} heartbeats/s  ({results[mode]['seconds']} s)")
+    print(f"read   {results['sdk_iterate']['records_per_second']:>10} records/s  ({results['sdk_iterate']['records']} records)")
+    print(f"speedup {results['speedup']}x")
+    
+    if args.output:
+        meta = run_metadata(
+            heartbeats=args.heartbeats, concurrency=args.concurrency, connections=args.connections,
+            source=args.url or "api in-process"
+        )
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
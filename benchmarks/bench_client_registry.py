@@ -0,0 +1,102 @@
+"""
+Storage and index size of client names versus registry ids
+
+Generates status checks for a number of clients and compares storing
+client_name in every document against storing the registry's integer
+client_id. Without --mongo-url it reports BSON bytes of the documents and of
+the index keys; with it, both variants are loaded into scratch collections
+with an index on the client field and MongoDB's collStats sizes are reported.
+
+Usage:
+    python -m benchmarks.bench_client_registry --documents 1000000 --clients 3000
+    python -m benchmarks.bench_client_registry --mongo-url mongodb://localhost:27017 --output registry.json
+"""
+import argparse
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from .common import run_metadata
+
+import bson
+
+def client_names(count: int) -> List[str]:
+    return [f"customer-{index:05d}-{uuid.uuid4().hex[:12]}.example.com" for index in range(count)]
+
+def documents(count: int, names: List[str], encoded: bool, seed: int = 0) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for index in range(count):
+        client = rng.randrange(len(names))
+        document = {"id": str(uuid.UUID(int=rng.getrandbits(128))), "timestamp": start + timedelta(seconds=index)}
+        if encoded:
+            document["client_id"] = client + 1
+        else:
+            document["client_name"] = names[client]
+        yield document
+
+def bson_sizes(count: int, names: List[str], encoded: bool) -> Dict[str, int]:
+    field = "client_id" if encoded else "client_name"
+    document_bytes = key_bytes = 0
+    for document in documents(count, names, encoded):
+        document_bytes += len(bson.encode(document))
+        key_bytes += len(bson.encode({"": document[field]}))
+    registry_bytes = sum(len(bson.encode({"_id": i + 1, "name": name})) for i, name in enumerate(names)) if encoded else 0
+    return {"document_bytes": document_bytes, "index_key_bytes": key_bytes, "registry_bytes": registry_bytes}
+
+def mongo_sizes(mongo_url: str, count: int, names: List[str], encoded: bool) -> Dict[str, int]:
+    from pymongo import MongoClient
+    
+    field = "client_id" if encoded else "client_name"
+    client = MongoClient(mongo_url)
+    collection = client["benchmark"][f"bench_registry_{field}"]
+    collection.drop()
+    try:
+        collection.create_index(field)
+        batch = []
+        for document in documents(count, names, encoded):
+            batch.append(document)
+            if len(batch) == 10000:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+        stats = client["benchmark"].command("collStats", collection.name)
+        return {
+            "size": stats["size"],
+            "storage_size": stats["storageSize"],
+            "total_index_size": stats["totalIndexSize"],
+            "client_index_size": stats["indexSizes"][f"{field}_1"]
+        }
+    finally:
+        collection.drop()
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=3000)
+    parser.add_argument("--mongo-url", help="Load both variants into this mongod and report collStats")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    names = client_names(args.clients)
+    measure = (lambda encoded: mongo_sizes(args.mongo_url, args.documents, names, encoded)) if args.mongo_url \
+        else (lambda encoded: bson_sizes(args.documents, names, encoded))
+    results = {"client_name": measure(False), "client_id": measure(True)}
+    
+    for metric, name_bytes in results["client_name"].items():
+        id_bytes = results["client_id"][metric]
+        saved = f"{100 * (1 - id_bytes / name_bytes):6.1f}%" if name_bytes else "    n/a"
+        print(f"{metric:>18}  names {name_bytes:>14,}  ids {id_bytes:>14,}  saved {saved}")
+    
+    if args.output:
+        meta = run_metadata(documents=args.documents, clients=args.clients, source="mongod" if args.mongo_url else "bson")
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
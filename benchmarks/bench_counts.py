@@ -0,0 +1,143 @@
+"""
+Cost of totals on GET /api/status: no total, estimated, exact (cached and uncached)
+
+Without --mongo-url it drives GET /api/status in-process against the
+in-memory Mongo stand-in, whose service time models a database round trip,
+and reports page latency per total= strategy. An uncached exact total runs
+concurrently with the page query, so it should cost about one round trip
+rather than two. With --mongo-url it loads a scratch collection and times
+estimated_document_count against count_documents, unfiltered and with a
+client name regex, with and without a maxTimeMS cap.
+
+Usage:
+    python -m benchmarks.bench_counts --requests 1000 --service-time-ms 2
+    python -m benchmarks.bench_counts --mongo-url mongodb://localhost:27017 --documents 1000000 --output counts.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .common import percentile, run_metadata
+from .fakes import FakeDatabase
+
+def documents(count: int, clients: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1)
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"client-{index % clients}", "timestamp": start + timedelta(seconds=index)}
+        for index in range(count)
+    ]
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    return {
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3)
+    }
+
+async def measure_api(args) -> Dict[str, Any]:
+    import httpx
+    from backend.database import db_manager
+    from backend.server import app, status_counter, status_query_coalescer
+    
+    database = FakeDatabase(pool_size=100, service_time=args.service_time_ms / 1000)
+    database.status_checks.documents = documents(args.documents, args.clients)
+    db_manager.database = database
+    # Every request fetches its page; only the count cache differs between variants
+    status_query_coalescer.ttl = 0
+    
+    variants = {
+        "none": ({}, 0.0),
+        "estimated": ({"total": "estimated"}, 0.0),
+        "exact_uncached": ({"total": "exact"}, 0.0),
+        "exact_cached": ({"total": "exact"}, 60.0)
+    }
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, (params, ttl) in variants.items():
+            status_counter.coalescer.ttl = ttl
+            status_counter.clear()
+            samples = []
+            for n in range(args.requests + 20):
+                start = time.perf_counter()
+                response = await client.get("/api/status", params={"limit": 20, "skip": n % 50, **params})
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                if n >= 20:
+                    samples.append(elapsed)
+            results[name] = summarize(samples)
+    return results
+
+def measure_mongo(args) -> Dict[str, Any]:
+    from pymongo import MongoClient
+    from pymongo.errors import ExecutionTimeout
+    
+    client = MongoClient(args.mongo_url)
+    collection = client["benchmark"]["bench_counts"]
+    collection.drop()
+    try:
+        loaded = documents(args.documents, args.clients)
+        for start in range(0, args.documents, 10000):
+            collection.insert_many(loaded[start:start + 10000], ordered=False)
+        by_client = {"client_name": {"$regex": "client-7", "$options": "i"}}
+        
+        def capped(filter: Dict[str, Any]) -> Callable[[], Any]:
+            def run():
+                try:
+                    return collection.count_documents(filter, maxTimeMS=args.max_time_ms)
+                except ExecutionTimeout:
+                    return "timed out"
+            return run
+        
+        variants = {
+            "estimated": lambda: collection.estimated_document_count(),
+            "exact": lambda: collection.count_documents({}),
+            "exact_capped": capped({}),
+            "filtered_exact": lambda: collection.count_documents(by_client),
+            "filtered_exact_capped": capped(by_client)
+        }
+        results: Dict[str, Any] = {}
+        for name, run in variants.items():
+            samples, outcome = [], None
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                outcome = run()
+                samples.append(time.perf_counter() - start)
+            results[name] = {**summarize(samples), "result": outcome}
+        return results
+    finally:
+        collection.drop()
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=100, help="Distinct client names")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests (or counts with --mongo-url) per variant")
+    parser.add_argument("--service-time-ms", type=float, default=2.0, help="Simulated database round trip")
+    parser.add_argument("--max-time-ms", type=int, default=200, help="maxTimeMS of capped counts (with --mongo-url)")
+    parser.add_argument("--mongo-url", help="Time the count commands against this mongod")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    results = measure_mongo(args) if args.mongo_url else asyncio.run(measure_api(args))
+    for name, row in results.items():
+        outcome = f"  result {row['result']}" if "result" in row else ""
+        print(f"{name:<24} mean {row['mean_ms']:>9} ms  p50 {row['p50_ms']:>9} ms  p99 {row['p99_ms']:>9} ms{outcome}")
+    
+    if args.output:
+        meta = run_metadata(
+            documents=args.documents, requests=args.requests,
+            source="mongod" if args.mongo_url else "api in-process"
+        )
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
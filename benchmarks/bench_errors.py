@@ -0,0 +1,190 @@
+"""
+Error-storm throughput, before and after throttled error logging
+
+Drives the app in-process while every request fails, logging at INFO to a
+byte-counting null stream, with two handler setups:
+
+- legacy: the previous handlers, which log every error (with a formatted
+  traceback for unhandled exceptions) and build an ErrorResponse model per
+  response
+- current: backend.exceptions with fingerprinted, rate-limited logging and
+  error bodies spliced from cached parts
+
+Scenarios are a MongoDB outage (GET /api/status answering 503 while the
+database is disconnected), query errors (the database connected but every
+query rejected, as after revoked credentials; such errors leave the circuit
+breaker closed, so the handler logs each one with log_error before
+answering 500) and an unhandled exception raised a few frames deep in a
+benchmark-only route. Legacy runs of query errors log every failure, as
+log_error did before it was throttled.
+
+Usage:
+    python -m benchmarks.bench_errors --requests 5000 --concurrency 50 --output errors.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+import traceback
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from .common import run_metadata
+from .fakes import FakeDatabase
+
+import httpx
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pymongo.errors import OperationFailure
+
+from backend import exceptions
+from backend.database import db_manager
+from backend.error_log import error_log_throttle
+from backend.logging_config import configure_logging
+from backend.server import app, concurrency_limiter
+
+SCENARIOS = {
+    "outage": "/api/status",
+    "query_errors": "/api/status",
+    "unhandled": "/api/bench/unhandled"
+}
+
+# Throttle interval of the current setup; legacy runs log everything
+THROTTLE_INTERVAL = error_log_throttle.interval
+
+class CountingStream(io.TextIOBase):
+    def __init__(self):
+        self.lines = 0
+        self.bytes = 0
+    
+    def write(self, text: str) -> int:
+        self.lines += text.count("\n")
+        self.bytes += len(text)
+        return len(text)
+
+async def legacy_api_error_handler(request: Request, exc: exceptions.APIError) -> JSONResponse:
+    request_id = getattr(request.state, "request_id", str(uuid.uuid4()))
+    log_func = getattr(exceptions.logger, exc.log_level, exceptions.logger.error)
+    log_func("API error", status_code=exc.status_code, message=exc.message, details=exc.details)
+    error_response = exceptions.ErrorResponse(
+        error=type(exc).__name__,
+        message=exc.message,
+        request_id=request_id,
+        timestamp=datetime.utcnow().isoformat(),
+        details=exc.details
+    )
+    return JSONResponse(status_code=exc.status_code, content=error_response.dict(), headers=exc.headers)
+
+async def legacy_general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    request_id = getattr(request.state, "request_id", str(uuid.uuid4()))
+    exceptions.logger.error(
+        "Unhandled exception",
+        request_id=request_id,
+        path=request.url.path,
+        method=request.method,
+        error_type=type(exc).__name__,
+        error_message=str(exc),
+        traceback=traceback.format_exc()
+    )
+    error_response = exceptions.ErrorResponse(
+        error="InternalServerError",
+        message="An internal server error occurred",
+        request_id=request_id,
+        timestamp=datetime.utcnow().isoformat()
+    )
+    return JSONResponse(status_code=500, content=error_response.dict())
+
+HANDLERS = {
+    "legacy": (legacy_api_error_handler, legacy_general_exception_handler),
+    "current": (exceptions.api_error_handler, exceptions.general_exception_handler)
+}
+
+def load_document(depth: int):
+    if depth == 0:
+        raise KeyError("client_name")
+    return load_document(depth - 1)
+
+async def unhandled():
+    return load_document(8)
+
+def failing_database(failures: int) -> FakeDatabase:
+    """Connected database rejecting every query"""
+    database = FakeDatabase()
+    database.status_checks.fail_next(
+        *(OperationFailure("not authorized on test to execute command", code=13) for _ in range(failures))
+    )
+    return database
+
+def install_handlers(variant: str):
+    api_handler, general_handler = HANDLERS[variant]
+    app.exception_handlers[exceptions.APIError] = api_handler
+    app.exception_handlers[Exception] = general_handler
+    # Rebuilt on the next request with the new handlers
+    app.middleware_stack = None
+
+async def storm(path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter(range(requests))
+        
+        async def worker():
+            for _ in queue:
+                response = await client.get(path)
+                assert response.status_code in (500, 503)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+def run(variant: str, scenario: str, stream: CountingStream, args) -> Dict[str, Any]:
+    install_handlers(variant)
+    error_log_throttle.interval = 0 if variant == "legacy" else THROTTLE_INTERVAL
+    error_log_throttle._states.clear()
+    warmup = min(200, args.requests)
+    db_manager.database = failing_database(warmup) if scenario == "query_errors" else None
+    asyncio.run(storm(SCENARIOS[scenario], warmup, args.concurrency))
+    
+    stream.lines = stream.bytes = 0
+    db_manager.database = failing_database(args.requests) if scenario == "query_errors" else None
+    elapsed = asyncio.run(storm(SCENARIOS[scenario], args.requests, args.concurrency))
+    return {
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "log_lines_per_1000": round(stream.lines / args.requests * 1000, 1),
+        "log_bytes_per_request": round(stream.bytes / args.requests, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    # Loggers are bound to the configuration on first use, so configure once
+    stream = CountingStream()
+    configure_logging("INFO", "bench", stream)
+    # Shed requests skip the error handlers; measure every request failing in them
+    concurrency_limiter.enabled = False
+    app.add_api_route("/api/bench/unhandled", unhandled)
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    for scenario in SCENARIOS:
+        results[scenario] = {variant: run(variant, scenario, stream, args) for variant in HANDLERS}
+        legacy, current = results[scenario]["legacy"], results[scenario]["current"]
+        results[scenario]["speedup"] = round(current["throughput_rps"] / legacy["throughput_rps"], 2)
+        for variant in HANDLERS:
+            row = results[scenario][variant]
+            print(f"{scenario:<12} {variant:<8} {row['throughput_rps']:>9} req/s  "
+                  f"{row['log_lines_per_1000']:>8} log lines/1000 requests  {row['log_bytes_per_request']:>8} log bytes/request")
+        print(f"{scenario:<12} speedup  {results[scenario]['speedup']}x")
+    
+    if args.output:
+        meta = run_metadata(requests=args.requests, concurrency=args.concurrency)
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Import-time profile for the backend package
+
+Runs ``python -X importtime -c "import backend.server"`` in fresh interpreters
+and reports the total cold import cost plus the slowest modules.
+
+Usage:
+    python -m benchmarks.bench_import_time --runs 5 --top 15 --output import_time.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def profile_import(module: str) -> Dict[str, Tuple[int, int]]:
+    """Import a module in a fresh interpreter and parse its importtime output
+    
+    Returns a mapping of module name to (self_us, cumulative_us).
+    """
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        timings[name] = (int(self_us), int(cumulative_us))
+    return timings
+
+def summarize(runs: List[Dict[str, Tuple[int, int]]], module: str, top: int) -> Dict:
+    """Aggregate several profiles into median timings"""
+    totals = [run[module][1] for run in runs]
+    names = set().union(*runs)
+    cumulative = {
+        name: statistics.median(run[name][1] for run in runs if name in run)
+        for name in names
+    }
+    slowest = sorted(
+        (name for name in names if name != module),
+        key=cumulative.get,
+        reverse=True
+    )[:top]
+    
+    return {
+        "module": module,
+        "runs": len(runs),
+        "total_ms": {
+            "median": round(statistics.median(totals) / 1000, 2),
+            "min": round(min(totals) / 1000, 2),
+            "max": round(max(totals) / 1000, 2)
+        },
+        "modules_imported": len(names),
+        "slowest": [
+            {"module": name, "cumulative_ms": round(cumulative[name] / 1000, 2)}
+            for name in slowest
+        ]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="backend.server", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to report")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    runs = [profile_import(args.module) for _ in range(args.runs)]
+    report = summarize(runs, args.module, args.top)
+    
+    print(f"{report['module']}: median {report['total_ms']['median']} ms "
+          f"(min {report['total_ms']['min']}, max {report['total_ms']['max']}) "
+          f"over {report['runs']} runs, {report['modules_imported']} modules")
+    for entry in report["slowest"]:
+        print(f"  {entry['cumulative_ms']:>9.2f} ms  {entry['module']}")
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Per-request logging overhead, before and after request-scoped context
+
+Replays the log calls a typical request makes (request started, handler
+message, performance metric, request completed) against two structlog setups
+writing to a null stream:
+
+- legacy: the previous configuration, output through stdlib logging, level
+  filtering as a processor and request_id/method/path passed to every call
+- current: backend.logging_config.configure_logging, with the level checked
+  before processing and request context bound once via structlog.contextvars
+
+Usage:
+    python -m benchmarks.bench_logging --requests 20000 --output logging.json
+"""
+import argparse
+import io
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict
+
+from .common import run_metadata
+
+import structlog
+
+from backend.logging_config import configure_logging, log_performance
+
+class NullStream(io.TextIOBase):
+    def write(self, text: str) -> int:
+        return len(text)
+
+def configure_legacy():
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer()
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+
+def legacy_request(logger, request_id: str):
+    logger.info("Request started", request_id=request_id, method="GET", path="/api/status",
+                query="limit=20", user_agent="bench", client_ip="127.0.0.1")
+    logger.info("Fetching status checks", limit=20, skip=0, client_name=None)
+    logger.info("Performance metric", operation="get_status_checks", duration_ms=1.23,
+                count=20, limit=20, skip=0, request_id=request_id)
+    logger.info("Request completed", request_id=request_id, method="GET", path="/api/status",
+                status_code=200, duration_ms=1.5)
+
+def current_request(logger, request_id: str):
+    with structlog.contextvars.bound_contextvars(request_id=request_id, method="GET", path="/api/status"):
+        logger.info("Request started", query="limit=20", user_agent="bench", client_ip="127.0.0.1")
+        logger.info("Fetching status checks", limit=20, skip=0, client_name=None)
+        log_performance(logger, "get_status_checks", 0.00123, count=20, limit=20, skip=0)
+        logger.info("Request completed", status_code=200, duration_ms=1.5)
+
+def measure(configure: Callable[[], None], request: Callable, level: str, requests: int) -> float:
+    """Mean microseconds of logging per request"""
+    structlog.reset_defaults()
+    configure()
+    logging.getLogger().setLevel(level)
+    logger = structlog.get_logger("bench")
+    request_ids = [str(uuid.uuid4()) for _ in range(requests)]
+    
+    for request_id in request_ids[:1000]:
+        request(logger, request_id)
+    
+    start = time.perf_counter()
+    for request_id in request_ids:
+        request(logger, request_id)
+    return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request logging overhead")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    # Both setups write through a root handler on the null stream
+    stream = NullStream()
+    logging.basicConfig(format="%(message)s", stream=stream)
+    
+    results: Dict[str, Dict[str, float]] = {}
+    for level in ("INFO", "WARNING"):
+        legacy = measure(configure_legacy, legacy_request, level, args.requests)
+        current = measure(lambda: configure_logging(level, "bench", stream), current_request, level, args.requests)
+        results[level] = {
+            "legacy_us_per_request": round(legacy, 2),
+            "current_us_per_request": round(current, 2),
+            "speedup": round(legacy / current, 2)
+        }
+        print(f"{level:<8} legacy {legacy:8.2f} us/request   current {current:8.2f} us/request   "
+              f"speedup {legacy / current:.2f}x")
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps({"meta": run_metadata(requests=args.requests), "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Request latency with memory tracing off and on at different stack depths
+
+Drives GET /api/status in-process against the in-memory Mongo stand-in
+with tracemalloc stopped, then started through the diagnostics at each
+--frames depth, and reports latency and the memory tracemalloc itself
+uses. The "off" row is the steady state of a service that never asks for
+memory diagnostics.
+
+Usage:
+    python -m benchmarks.bench_memory_tracing --requests 2000 --frames 1 10 25 --output memory_tracing.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .common import percentile, run_metadata
+from .fakes import FakeDatabase
+
+import httpx
+
+from backend.database import db_manager
+from backend.server import app, memory_diagnostics, status_query_coalescer
+
+async def measure(client: httpx.AsyncClient, requests: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    for n in range(requests + 20):
+        start = time.perf_counter()
+        response = await client.get("/api/status", params={"limit": 50, "skip": n % 50})
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        if n >= 20:
+            samples.append(elapsed)
+    return {
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3)
+    }
+
+async def run(args) -> Dict[str, Any]:
+    database = FakeDatabase(pool_size=100, service_time=0.0)
+    start = datetime(2024, 1, 1)
+    database.status_checks.documents = [
+        {"id": str(uuid.uuid4()), "client_name": f"client-{index % 50}", "timestamp": start + timedelta(seconds=index)}
+        for index in range(args.documents)
+    ]
+    db_manager.database = database
+    # Every request builds its page, so allocations are on the measured path
+    status_query_coalescer.ttl = 0
+    
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results["off"] = await measure(client, args.requests)
+        for frames in args.frames:
+            memory_diagnostics.start(frames)
+            try:
+                row = await measure(client, args.requests)
+                row["tracemalloc_bytes"] = tracemalloc.get_tracemalloc_memory()
+            finally:
+                memory_diagnostics.stop()
+            results[f"frames={frames}"] = row
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per variant")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--frames", type=int, nargs="+", default=[1, 10, 25], help="Traceback depths to trace with")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    baseline = results["off"]["mean_ms"]
+    for name, row in results.items():
+        overhead = f"  x{row['mean_ms'] / baseline:.2f}  tracemalloc {row['tracemalloc_bytes']} bytes" if name != "off" else ""
+        print(f"{name:<10} mean {row['mean_ms']:>8} ms  p50 {row['p50_ms']:>8} ms  p99 {row['p99_ms']:>8} ms{overhead}")
+    
+    if args.output:
+        meta = run_metadata(requests=args.requests, documents=args.documents, frames=args.frames)
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Small-request latency while large pages are being serialized
+
+Runs a background of clients fetching 1000-item status pages alongside
+clients hitting the health endpoint, first with every response built on the
+event loop and then with large pages handed to the offload executor, and
+reports the health endpoint's latency percentiles and the page throughput.
+
+Usage:
+    python -m benchmarks.bench_offload --duration 5 --output offload.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .common import percentile, run_metadata
+from .fakes import FakeDatabase
+
+import httpx
+
+from backend.database import db_manager
+from backend.server import app, offload_executor, status_query_coalescer
+
+PAGE_SIZE = 1000
+
+async def client_loop(client: httpx.AsyncClient, path: str, deadline: float, samples: List[float]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+
+async def run_mode(offload: bool, args) -> Dict:
+    if offload:
+        offload_executor.start()
+    db_manager.database = FakeDatabase(service_time=0.001)
+    db_manager.database.status_checks.documents = [
+        {"id": f"bench-{index}", "client_name": f"client-{index % 10}", "timestamp": "2024-01-01T00:00:00"}
+        for index in range(PAGE_SIZE)
+    ]
+    # Every page request must build its body; no sharing through the micro-cache
+    status_query_coalescer.ttl = 0
+
+    pages: List[float] = []
+    health: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(client_loop(client, f"/api/status?limit={PAGE_SIZE}&skip={index}", deadline, pages)
+              for index in range(args.page_clients)),
+            *(client_loop(client, "/api/health", deadline, health) for _ in range(args.small_clients))
+        )
+    offload_executor.shutdown()
+
+    return {
+        "pages_per_second": round(len(pages) / args.duration, 1),
+        "page_p50_ms": round(percentile(pages, 50) * 1000, 2),
+        "small_requests": len(health),
+        "small_p50_ms": round(percentile(health, 50) * 1000, 2),
+        "small_p99_ms": round(percentile(health, 99) * 1000, 2),
+        "small_max_ms": round(max(health) * 1000, 2) if health else 0.0
+    }
+
+async def run(args) -> Dict[str, Dict]:
+    results = {}
+    for offload in (False, True):
+        label = "offload" if offload else "inline"
+        results[label] = row = await run_mode(offload, args)
+        print(f"{label:>8}  pages={row['pages_per_second']:>7}/s  small p50={row['small_p50_ms']:>7}ms "
+              f"p99={row['small_p99_ms']:>7}ms max={row['small_max_ms']:>7}ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--page-clients", type=int, default=4, help="Clients fetching large pages")
+    parser.add_argument("--small-clients", type=int, default=8, help="Clients hitting the health endpoint")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        meta = run_metadata(duration=args.duration, page_clients=args.page_clients, small_clients=args.small_clients)
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
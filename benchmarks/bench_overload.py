@@ -0,0 +1,101 @@
+"""
+Overload harness for the adaptive concurrency limiter
+
+Drives the in-process ASGI app with closed-loop virtual users at increasing
+concurrency against a simulated database whose connection pool saturates, and
+reports goodput (2xx per second), shed rate and latency percentiles with the
+limiter enabled and disabled.
+
+Usage:
+    python -m benchmarks.bench_overload --levels 25 100 400 --duration 5 --pool-size 4
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .common import percentile
+
+import httpx
+
+from backend.database import db_manager
+from backend.server import app, concurrency_limiter
+from .fakes import FakeDatabase
+
+async def virtual_user(client: httpx.AsyncClient, deadline: float, write_ratio: float, results: Dict[str, List]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if random.random() < write_ratio:
+            response = await client.post("/api/status", json={"client_name": "bench"})
+        else:
+            response = await client.get("/api/status", params={"limit": 20})
+        elapsed = time.perf_counter() - start
+        if response.status_code < 300:
+            results["ok"].append(elapsed)
+        elif response.status_code == 503:
+            results["shed"].append(elapsed)
+            # Well-behaved clients honour Retry-After (with jitter) instead of spinning
+            retry_after = float(response.headers.get("retry-after", 1))
+            await asyncio.sleep(retry_after * random.uniform(0.5, 1.0))
+        else:
+            results["error"].append(elapsed)
+
+async def run_level(concurrency: int, duration: float, write_ratio: float) -> Dict:
+    results = {"ok": [], "shed": [], "error": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            virtual_user(client, deadline, write_ratio, results) for _ in range(concurrency)
+        ))
+    
+    ok = results["ok"]
+    return {
+        "concurrency": concurrency,
+        "goodput_rps": round(len(ok) / duration, 1),
+        "shed_rps": round(len(results["shed"]) / duration, 1),
+        "errors": len(results["error"]),
+        "p50_ms": round(percentile(ok, 50) * 1000, 2),
+        "p99_ms": round(percentile(ok, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(ok) * 1000, 2) if ok else 0.0,
+        "final_limit": round(concurrency_limiter.limit, 1)
+    }
+
+async def run(args) -> Dict:
+    report = {"pool_size": args.pool_size, "service_time_ms": args.service_time_ms, "runs": {}}
+    for enabled in (False, True):
+        label = "limiter" if enabled else "no_limiter"
+        concurrency_limiter.enabled = enabled
+        rows = []
+        for level in args.levels:
+            # Fresh simulated database and limiter state per level
+            db_manager.database = FakeDatabase(args.pool_size, args.service_time_ms / 1000)
+            concurrency_limiter.limit = float(concurrency_limiter.min_limit)
+            rows.append(await run_level(level, args.duration, args.write_ratio))
+            row = rows[-1]
+            print(f"{label:>10}  c={row['concurrency']:<5} goodput={row['goodput_rps']:>8}/s "
+                  f"shed={row['shed_rps']:>8}/s p50={row['p50_ms']:>8}ms p99={row['p99_ms']:>8}ms "
+                  f"limit={row['final_limit']}")
+        report["runs"][label] = rows
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", type=int, nargs="+", default=[25, 100, 400])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per concurrency level")
+    parser.add_argument("--pool-size", type=int, default=4, help="Simulated Mongo pool size")
+    parser.add_argument("--service-time-ms", type=float, default=40.0, help="Simulated per-operation time")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of POST requests")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Bytes on the wire and latency of status check reads with and without fields=
+
+Without --mongo-url it drives GET /api/status and GET /api/status/{id}
+in-process against the in-memory Mongo stand-in and reports response bytes
+and latency for each field selection. With it, documents are loaded into a
+scratch collection with the status check indexes, and the projected queries
+the API sends are run directly: BSON bytes returned by mongod, latency, and
+whether explain() shows the query answered from the index alone
+(totalDocsExamined == 0).
+
+Usage:
+    python -m benchmarks.bench_projection --requests 2000
+    python -m benchmarks.bench_projection --mongo-url mongodb://localhost:27017 --documents 100000 --output projection.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .common import percentile, run_metadata
+from .fakes import FakeDatabase
+
+import bson
+
+from backend.clients import ClientRegistry
+from backend.database import db_manager
+from backend.repository import MongoStatusCheckRepository, parse_fields
+from backend.status_ids import StatusIdCodec
+
+SELECTIONS = ("", "id", "id,timestamp", "client_name,timestamp")
+
+def documents(count: int, ids: List[str], clients: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1)
+    return [
+        {"id": status_id, "client_name": f"client-{index % clients}", "timestamp": start + timedelta(seconds=index)}
+        for index, status_id in enumerate(ids[:count])
+    ]
+
+def summarize(samples: List[float], sizes: List[int]) -> Dict[str, Any]:
+    return {
+        "mean_bytes": round(statistics.fmean(sizes), 1),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3)
+    }
+
+async def measure_api(args) -> Dict[str, Any]:
+    import httpx
+    from backend.server import app
+    
+    database = FakeDatabase(pool_size=100, service_time=0.0)
+    db_manager.database = database
+    ids = [str(uuid.uuid4()) for _ in range(args.documents)]
+    database.status_checks.documents = documents(args.documents, ids, args.clients)
+    rng = random.Random(1)
+    
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for selection in SELECTIONS:
+            params = {"fields": selection} if selection else {}
+            for query in ("list", "get"):
+                samples, sizes = [], []
+                for n in range(args.requests + 20):
+                    if query == "list":
+                        # Distinct pages so the micro-cache does not answer
+                        path, page = "/api/status", {"limit": args.page_size, "skip": n % 50}
+                    else:
+                        path, page = f"/api/status/{rng.choice(ids)}", {}
+                    start = time.perf_counter()
+                    response = await client.get(path, params={**params, **page})
+                    elapsed = time.perf_counter() - start
+                    response.raise_for_status()
+                    if n >= 20:
+                        samples.append(elapsed)
+                        sizes.append(len(response.content))
+                results[f"{query}[{selection or 'all'}]"] = summarize(samples, sizes)
+    return results
+
+def measure_mongo(args) -> Dict[str, Any]:
+    from pymongo import MongoClient
+    
+    client = MongoClient(args.mongo_url, uuidRepresentation="standard")
+    collection = client["benchmark"]["bench_projection"]
+    collection.drop()
+    # Only used for the projections and index keys the API would use
+    repository = MongoStatusCheckRepository(None, StatusIdCodec("string"), ClientRegistry(None))
+    try:
+        ids = [str(uuid.uuid4()) for _ in range(args.documents)]
+        loaded = documents(args.documents, ids, args.clients)
+        for start in range(0, args.documents, 10000):
+            collection.insert_many(loaded[start:start + 10000], ordered=False)
+        for keys in repository.index_specs():
+            collection.create_index(keys)
+        rng = random.Random(1)
+        
+        results: Dict[str, Any] = {}
+        for selection in SELECTIONS:
+            projection: Optional[Dict[str, int]] = repository.projection(parse_fields(selection))
+            queries = {
+                "get": lambda: {"id": rng.choice(ids)},
+                "client": lambda: {"client_name": f"client-{rng.randrange(args.clients)}"}
+            }
+            for query, make_filter in queries.items():
+                samples, sizes = [], []
+                for _ in range(args.requests):
+                    filter = make_filter()
+                    start = time.perf_counter()
+                    found = list(collection.find(filter, projection).limit(args.page_size))
+                    samples.append(time.perf_counter() - start)
+                    sizes.append(sum(len(bson.encode(document)) for document in found))
+                explain = collection.find(make_filter(), projection).limit(args.page_size).explain()
+                row = summarize(samples, sizes)
+                row["docs_examined"] = explain["executionStats"]["totalDocsExamined"]
+                row["covered"] = row["docs_examined"] == 0
+                results[f"{query}[{selection or 'all'}]"] = row
+        return results
+    finally:
+        collection.drop()
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=500, help="Distinct client names")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per query and selection")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--mongo-url", help="Run the projected queries against this mongod")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    results = measure_mongo(args) if args.mongo_url else asyncio.run(measure_api(args))
+    for key, row in results.items():
+        covered = f"  covered {row['covered']}" if "covered" in row else ""
+        print(f"{key:<32} {row['mean_bytes']:>10} bytes  mean {row['mean_ms']:>8} ms  "
+              f"p99 {row['p99_ms']:>8} ms{covered}")
+    
+    if args.output:
+        meta = run_metadata(
+            documents=args.documents, requests=args.requests, page_size=args.page_size,
+            source="mongod" if args.mongo_url else "api in-process"
+        )
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
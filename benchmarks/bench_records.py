@@ -0,0 +1,91 @@
+"""
+Memory per million status checks held in process
+
+Builds the same status checks as StatusCheck models, as raw documents
+(dicts), as the JSON strings the stream buffer used to keep, and as
+backend.records.StatusRecord, and reports the traced allocation of each,
+scaled to one million records.
+
+Usage:
+    python -m benchmarks.bench_records --records 200000 --clients 2000 --output records.json
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .common import run_metadata
+
+from backend.records import StatusRecord
+from backend.server import StatusCheck
+
+def make_fields(count: int, clients: int) -> List[tuple]:
+    start = datetime(2024, 1, 1)
+    return [
+        (str(uuid.uuid4()), f"client-{index % clients}", start + timedelta(microseconds=index * 1017))
+        for index in range(count)
+    ]
+
+def build_models(fields: List[tuple]) -> list:
+    return [StatusCheck(id=id, client_name=name, timestamp=ts) for id, name, ts in fields]
+
+def build_documents(fields: List[tuple]) -> list:
+    return [{"id": id, "client_name": name, "timestamp": ts} for id, name, ts in fields]
+
+def build_json(fields: List[tuple]) -> list:
+    return [StatusCheck(id=id, client_name=name, timestamp=ts).model_dump_json() for id, name, ts in fields]
+
+def build_records(fields: List[tuple]) -> list:
+    return [StatusRecord.from_fields(id, name, ts) for id, name, ts in fields]
+
+def measure(build: Callable[[List[tuple]], list], count: int, clients: int) -> int:
+    """Bytes still allocated by the built list once the input fields are gone
+    
+    Tracing starts before the fields are generated so that representations
+    keeping the input strings alive are charged for them.
+    """
+    gc.collect()
+    tracemalloc.start()
+    fields = make_fields(count, clients)
+    built = build(fields)
+    del fields
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return retained
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200000, help="Records built per representation")
+    parser.add_argument("--clients", type=int, default=2000, help="Distinct client names")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    builders = {
+        "pydantic_model": build_models,
+        "document_dict": build_documents,
+        "json_string": build_json,
+        "status_record": build_records
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for name, build in builders.items():
+        retained = measure(build, args.records, args.clients)
+        per_million = retained * 1_000_000 / args.records
+        results[name] = {
+            "bytes_per_record": round(retained / args.records, 1),
+            "mib_per_million": round(per_million / 2**20, 1)
+        }
+        print(f"{name:>15}  {retained / args.records:8.1f} bytes/record  {per_million / 2**20:8.1f} MiB per million")
+    
+    if args.output:
+        meta = run_metadata(records=args.records, clients=args.clients)
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Server matrix: asyncio vs uvloop and h11 vs httptools
+
+For every installed combination of event loop and HTTP parser, starts the
+API in a subprocess with the options from ``python -m backend`` (backed by
+the in-memory Mongo stand-in), then drives the /api/status endpoints over
+keep-alive connections and reports throughput and latency percentiles.
+Combinations whose packages are missing are reported as skipped.
+
+Usage:
+    python -m benchmarks.bench_server --concurrency 16 64 --requests 3000 --output server.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .common import REPO_ROOT, run_metadata
+from .suite import free_port, measure, seed
+
+from backend.__main__ import module_available
+
+LOOPS = ("asyncio", "uvloop")
+HTTP_PARSERS = ("h11", "httptools")
+SCENARIOS = ("create", "list", "get")
+
+def serve(loop: str, http: str, port: int):
+    """Child process: the launcher's server options around the in-memory database"""
+    import uvicorn
+    from backend.__main__ import server_options
+    from backend.database import db_manager
+    from backend.server import app
+    from .fakes import FakeDatabase
+    
+    db_manager.database = FakeDatabase(pool_size=100, service_time=0.0)
+    options = {**server_options(), "host": "127.0.0.1", "port": port, "loop": loop, "http": http, "workers": None}
+    uvicorn.Server(uvicorn.Config(app, **options)).run()
+
+def start_server(loop: str, http: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "STATUS_STREAM_SOURCE": "local", "LOG_LEVEL": "WARNING"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_server", "--serve", loop, http, str(port)],
+        cwd=REPO_ROOT, env=env
+    )
+    deadline = time.monotonic() + 30
+    import httpx
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/", timeout=0.5)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+async def drive_combination(port: int, args) -> Dict[str, Any]:
+    import httpx
+    
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        ids = await seed(client, args.seed)
+        results = {}
+        for scenario, concurrency in itertools.product(SCENARIOS, args.concurrency):
+            results[f"{scenario}@c{concurrency}"] = await measure(client, scenario, ids, concurrency, args.requests, 0)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per scenario and concurrency level")
+    parser.add_argument("--seed", type=int, default=200, help="Status checks created for the get scenario")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--serve", nargs=3, metavar=("LOOP", "HTTP", "PORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        loop, http, port = args.serve
+        serve(loop, http, int(port))
+        return
+    
+    results: Dict[str, Any] = {}
+    for loop, http in itertools.product(LOOPS, HTTP_PARSERS):
+        label = f"{loop}+{http}"
+        missing: List[str] = [name for name in (loop, http) if name in ("uvloop", "httptools") and not module_available(name)]
+        if missing:
+            results[label] = {"skipped": f"{', '.join(missing)} not installed"}
+            print(f"{label:<18} skipped: {results[label]['skipped']}")
+            continue
+        
+        port = free_port()
+        process = start_server(loop, http, port)
+        try:
+            results[label] = asyncio.run(drive_combination(port, args))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        for key, row in results[label].items():
+            print(f"{label:<18} {key:<12} {row['throughput_rps']:>9} req/s  p50 {row['p50_ms']:>8} ms  "
+                  f"p99 {row['p99_ms']:>8} ms  errors {row['errors']}")
+    
+    if args.output:
+        meta = run_metadata(concurrency=args.concurrency, requests=args.requests)
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
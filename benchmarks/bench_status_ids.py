@@ -0,0 +1,116 @@
+"""
+Document size, index size and lookup latency of string ids versus UUID _id
+
+Compares the two STATUS_ID_STORAGE layouts:
+
+- string: ObjectId _id plus a 36-character "id" string with its own index
+- uuid: the id as _id in BSON binary subtype 4, no second identifier
+
+Without --mongo-url it reports BSON bytes of documents and index keys; with
+it, both layouts are loaded into scratch collections and collStats sizes
+plus point-lookup latency (find_one by id vs by _id) are reported.
+
+Usage:
+    python -m benchmarks.bench_status_ids --documents 200000
+    python -m benchmarks.bench_status_ids --mongo-url mongodb://localhost:27017 --lookups 5000 --output ids.json
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from .common import percentile, run_metadata
+
+import bson
+
+def documents(count: int, ids: List[str], layout: str) -> Iterator[Dict]:
+    start = datetime(2024, 1, 1)
+    for index in range(count):
+        document = {"client_name": f"client-{index % 3000}", "timestamp": start + timedelta(seconds=index)}
+        if layout == "uuid":
+            yield {"_id": uuid.UUID(ids[index]), **document}
+        else:
+            yield {"_id": bson.ObjectId(), "id": ids[index], **document}
+
+def bson_sizes(count: int, ids: List[str], layout: str) -> Dict[str, int]:
+    options = bson.CodecOptions(uuid_representation=bson.binary.UuidRepresentation.STANDARD)
+    document_bytes = key_bytes = 0
+    for document in documents(count, ids, layout):
+        document_bytes += len(bson.encode(document, codec_options=options))
+        key_bytes += len(bson.encode({"": document["_id"]}, codec_options=options))
+        if layout == "string":
+            key_bytes += len(bson.encode({"": document["id"]}))
+    return {"document_bytes": document_bytes, "index_key_bytes": key_bytes}
+
+def mongo_sizes(mongo_url: str, count: int, ids: List[str], layout: str, lookups: int) -> Dict[str, float]:
+    from pymongo import MongoClient
+    
+    client = MongoClient(mongo_url, uuidRepresentation="standard")
+    collection = client["benchmark"][f"bench_status_ids_{layout}"]
+    collection.drop()
+    try:
+        if layout == "string":
+            collection.create_index("id")
+        batch = []
+        for document in documents(count, ids, layout):
+            batch.append(document)
+            if len(batch) == 10000:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+        stats = client["benchmark"].command("collStats", collection.name)
+        
+        rng = random.Random(1)
+        samples = []
+        for _ in range(lookups):
+            status_id = ids[rng.randrange(count)]
+            lookup = {"_id": uuid.UUID(status_id)} if layout == "uuid" else {"id": status_id}
+            start = time.perf_counter()
+            assert collection.find_one(lookup) is not None
+            samples.append(time.perf_counter() - start)
+        return {
+            "size": stats["size"],
+            "storage_size": stats["storageSize"],
+            "total_index_size": stats["totalIndexSize"],
+            "lookup_p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "lookup_p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "lookup_mean_ms": round(statistics.fmean(samples) * 1000, 3)
+        }
+    finally:
+        collection.drop()
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=5000, help="Point lookups per layout (with --mongo-url)")
+    parser.add_argument("--mongo-url", help="Load both layouts into this mongod and report collStats and latency")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    ids = [str(uuid.uuid4()) for _ in range(args.documents)]
+    results = {}
+    for layout in ("string", "uuid"):
+        if args.mongo_url:
+            results[layout] = mongo_sizes(args.mongo_url, args.documents, ids, layout, args.lookups)
+        else:
+            results[layout] = bson_sizes(args.documents, ids, layout)
+    
+    for metric, string_value in results["string"].items():
+        uuid_value = results["uuid"][metric]
+        change = f"{100 * (uuid_value / string_value - 1):+6.1f}%" if string_value else "    n/a"
+        print(f"{metric:>18}  string {string_value:>14,}  uuid {uuid_value:>14,}  {change}")
+    
+    if args.output:
+        meta = run_metadata(documents=args.documents, source="mongod" if args.mongo_url else "bson")
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Insert latency and throughput per write concern tier
+
+With --mongo-url (a replica set, e.g. a local three-member one started with
+mongod --replSet) it inserts into a scratch collection through Motor with
+each tier's write concern at the given concurrency, so the cost of journal
+flushes and majority acknowledgement shows up directly. Without it, it
+drives POST /api/status in-process with X-Write-Concern against the
+in-memory Mongo stand-in; that stand-in does not model replication, so this
+only measures what the tier selection adds to the request path.
+
+Usage:
+    python -m benchmarks.bench_write_concern --inserts 2000 --concurrency 16
+    python -m benchmarks.bench_write_concern --mongo-url "mongodb://localhost:27017/?replicaSet=rs0" --output write_concern.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+from .common import percentile, run_metadata
+from .fakes import FakeDatabase
+
+from backend.config import WRITE_CONCERN_TIERS, settings
+from backend.database import WRITE_CONCERN_OPTIONS
+
+async def timed_inserts(insert: Callable[[int], Awaitable[Any]], count: int, concurrency: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    queue = iter(range(count))
+    
+    async def worker():
+        for n in queue:
+            start = time.perf_counter()
+            await insert(n)
+            samples.append(time.perf_counter() - start)
+    
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - began
+    return {
+        "inserts_per_second": round(count / elapsed, 1),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3)
+    }
+
+async def measure_api(args) -> Dict[str, Any]:
+    import httpx
+    from backend.database import db_manager
+    from backend.server import app
+    
+    db_manager.database = FakeDatabase(pool_size=100, service_time=args.service_time_ms / 1000)
+    settings.write_concern_header_tiers = list(WRITE_CONCERN_TIERS)
+    
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for tier in WRITE_CONCERN_TIERS:
+            async def insert(n: int):
+                response = await client.post(
+                    "/api/status", json={"client_name": f"client-{n % 50}"}, headers={"X-Write-Concern": tier}
+                )
+                response.raise_for_status()
+            
+            await timed_inserts(insert, 20, args.concurrency)
+            results[tier] = await timed_inserts(insert, args.inserts, args.concurrency)
+    return results
+
+async def measure_mongo(args) -> Dict[str, Any]:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import WriteConcern
+    
+    client = AsyncIOMotorClient(args.mongo_url, maxPoolSize=max(args.concurrency, 10))
+    collection = client["benchmark"]["bench_write_concern"]
+    await collection.drop()
+    try:
+        results: Dict[str, Any] = {}
+        for tier in WRITE_CONCERN_TIERS:
+            options = WRITE_CONCERN_OPTIONS[tier]
+            tiered = collection.with_options(write_concern=WriteConcern(**options)) if options else collection
+            
+            async def insert(n: int):
+                await tiered.insert_one(
+                    {"id": str(uuid.uuid4()), "client_name": f"client-{n % 50}", "timestamp": datetime.utcnow()}
+                )
+            
+            await timed_inserts(insert, 20, args.concurrency)
+            results[tier] = await timed_inserts(insert, args.inserts, args.concurrency)
+            # Unacknowledged inserts may still be in flight; let them land before the next tier
+            if tier == "telemetry":
+                await client.admin.command("ping")
+        return results
+    finally:
+        await collection.drop()
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--inserts", type=int, default=2000, help="Inserts per tier")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent inserts")
+    parser.add_argument("--service-time-ms", type=float, default=1.0, help="Simulated database round trip")
+    parser.add_argument("--mongo-url", help="Insert into this replica set instead of the in-process stand-in")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    results = asyncio.run(measure_mongo(args) if args.mongo_url else measure_api(args))
+    for tier, row in results.items():
+        print(f"{tier:<10} {row['inserts_per_second']:>10} inserts/s  mean {row['mean_ms']:>8} ms  "
+              f"p50 {row['p50_ms']:>8} ms  p99 {row['p99_ms']:>8} ms")
+    
+    if args.output:
+        meta = run_metadata(
+            inserts=args.inserts, concurrency=args.concurrency,
+            source="mongod" if args.mongo_url else "api in-process"
+        )
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
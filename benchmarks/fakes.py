@@ -0,0 +1,188 @@
+"""
+In-memory MongoDB stand-ins with fault injection, for benchmarks and tests
+
+FakeDatabase can model a connection pool of fixed size and a fixed
+per-operation service time, so latency grows with offered concurrency the
+way it does against a real mongod once the Motor pool is saturated.
+"""
+import asyncio
+import copy
+import re
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+
+def matches(document, filter):
+    """Evaluate the small subset of query operators the API uses"""
+    for key, condition in filter.items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(condition, dict):
+            if "$regex" in condition:
+                flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+                if not isinstance(value, str) or not re.search(condition["$regex"], value, flags):
+                    return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def project(document, projection):
+    """Apply an inclusion projection; _id is kept unless excluded"""
+    if not projection:
+        return dict(document)
+    keep = {key for key, value in projection.items() if value}
+    if projection.get("_id", 1):
+        keep.add("_id")
+    return {key: value for key, value in document.items() if key in keep}
+
+class FakeCursor:
+    """Minimal Motor cursor stand-in"""
+    
+    def __init__(self, collection, filter, projection=None):
+        self.collection = collection
+        self.filter = filter
+        self.projection = projection
+        self._skip = 0
+        self._limit = 0
+    
+    def skip(self, skip):
+        self._skip = skip
+        return self
+    
+    def limit(self, limit):
+        self._limit = limit
+        return self
+    
+    async def to_list(self, length=None):
+        await self.collection.inject_fault()
+        docs = [project(d, self.projection) for d in self.collection.documents if matches(d, self.filter)][self._skip:]
+        return docs[:self._limit] if self._limit else docs
+
+class FaultInjectingCollection:
+    """In-memory collection that fails or stalls on demand"""
+    
+    def __init__(self, documents=None, unique=(), pool=None, service_time=0.0):
+        self.documents = list(documents or [])
+        self.unique = tuple(unique)
+        self.pool = pool
+        self.service_time = service_time
+        self.indexes = []
+        self.calls = 0
+        self.failures = []
+        self.delay = 0.0
+        self.max_time_ms = []
+        self.projections = []
+        self.written_with = []
+        self.write_concern = None
+    
+    def with_options(self, write_concern=None, **kwargs):
+        """View sharing this collection's documents, like Motor's with_options"""
+        view = copy.copy(self)
+        view.write_concern = write_concern
+        return view
+    
+    def fail_next(self, *errors):
+        self.failures.extend(errors)
+    
+    async def inject_fault(self):
+        self.calls += 1
+        if self.service_time:
+            if self.pool is None:
+                await asyncio.sleep(self.service_time)
+            else:
+                async with self.pool:
+                    await asyncio.sleep(self.service_time)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+    
+    async def find_one(self, filter, projection=None, *args, max_time_ms=None, **kwargs):
+        self.max_time_ms.append(max_time_ms)
+        self.projections.append(projection)
+        await self.inject_fault()
+        return next((project(d, projection) for d in self.documents if matches(d, filter)), None)
+    
+    def find(self, filter, projection=None, *args, max_time_ms=None, **kwargs):
+        self.max_time_ms.append(max_time_ms)
+        self.projections.append(projection)
+        return FakeCursor(self, filter, projection)
+    
+    async def count_documents(self, filter, maxTimeMS=None, **kwargs):
+        self.max_time_ms.append(maxTimeMS)
+        await self.inject_fault()
+        return sum(1 for d in self.documents if matches(d, filter))
+    
+    async def estimated_document_count(self, maxTimeMS=None, **kwargs):
+        self.max_time_ms.append(maxTimeMS)
+        await self.inject_fault()
+        return len(self.documents)
+    
+    async def insert_one(self, document, **kwargs):
+        await self.inject_fault()
+        self.written_with.append(self.write_concern)
+        for key in self.unique:
+            if any(d.get(key) == document.get(key) for d in self.documents):
+                raise DuplicateKeyError(f"E11000 duplicate key error: {key}")
+        self.documents.append(dict(document))
+        return SimpleNamespace(inserted_id=document.get("id", document.get("_id")))
+    
+    async def insert_many(self, documents, **kwargs):
+        await self.inject_fault()
+        self.written_with.append(self.write_concern)
+        self.documents.extend(dict(document) for document in documents)
+        return SimpleNamespace(inserted_ids=[document.get("id", document.get("_id")) for document in documents])
+    
+    async def update_one(self, filter, update, **kwargs):
+        await self.inject_fault()
+        document = next((d for d in self.documents if matches(d, filter)), None)
+        if document is not None:
+            document.update(update.get("$set", {}))
+        return SimpleNamespace(matched_count=int(document is not None))
+    
+    async def delete_one(self, filter, **kwargs):
+        await self.inject_fault()
+        for index, document in enumerate(self.documents):
+            if matches(document, filter):
+                del self.documents[index]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+    
+    async def find_one_and_update(self, filter, update, upsert=False, **kwargs):
+        await self.inject_fault()
+        document = next((d for d in self.documents if matches(d, filter)), None)
+        if document is None:
+            if not upsert:
+                return None
+            document = dict(filter)
+            self.documents.append(document)
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
+        return dict(document)
+    
+    async def create_index(self, keys, **kwargs):
+        self.indexes.append((keys, kwargs))
+        return keys if isinstance(keys, str) else "_".join(key for key, _ in keys)
+
+class FakeDatabase:
+    """Database stand-in exposing fault-injecting collections"""
+    
+    def __init__(self, pool_size=100, service_time=0.0):
+        # One pool shared by all collections, like a client's connection pool
+        pool = asyncio.Semaphore(pool_size) if service_time else None
+        self.status_checks = FaultInjectingCollection(pool=pool, service_time=service_time)
+        self.clients = FaultInjectingCollection(unique=("_id", "name"), pool=pool, service_time=service_time)
+        self.counters = FaultInjectingCollection(pool=pool, service_time=service_time)
+        self.idempotency_keys = FaultInjectingCollection(unique=("_id",), pool=pool, service_time=service_time)
+    
+    def __getitem__(self, name):
+        return getattr(self, name)
+    
+    async def command(self, name, *args, **kwargs):
+        if name == "dbStats":
+            return {"collections": 4, "objects": len(self.status_checks.documents), "dataSize": 0, "indexSize": 0}
+        return {"ok": 1}
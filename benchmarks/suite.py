@@ -0,0 +1,270 @@
+"""
+End-to-end API benchmark suite with regression gates
+
+Drives every endpoint at fixed concurrency levels, either in-process through
+httpx.ASGITransport or over a real socket against uvicorn, backed by the
+in-memory Mongo stand-in (default) or a local mongod (--mongo-url). Results
+are written as JSON; ``compare`` flags regressions against a stored baseline
+and exits non-zero so it can gate CI.
+
+Usage:
+    python -m benchmarks.suite run --transport asgi --output benchmarks/baseline.json
+    python -m benchmarks.suite run --transport uvicorn --output results.json
+    python -m benchmarks.suite compare benchmarks/baseline.json results.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .common import percentile, run_metadata
+
+SCENARIOS = ("create", "list", "get", "health", "metrics")
+
+def build_request(scenario: str, ids: List[str], n: int) -> Tuple[str, str, Dict[str, Any]]:
+    """Method, path and httpx kwargs for the n-th request of a scenario"""
+    if scenario == "create":
+        return "POST", "/api/status", {"json": {"client_name": f"bench-client-{n % 50}"}}
+    if scenario == "list":
+        return "GET", "/api/status", {"params": {"limit": 20}}
+    if scenario == "get":
+        return "GET", f"/api/status/{ids[n % len(ids)]}", {}
+    if scenario == "health":
+        return "GET", "/api/health", {}
+    if scenario == "metrics":
+        return "GET", "/api/metrics", {}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+async def drive(client, scenario: str, ids: List[str], concurrency: int, requests: int) -> Tuple[List[float], int, float]:
+    """Send requests from closed-loop workers; returns latencies, errors and wall time"""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+    
+    async def worker():
+        nonlocal errors
+        for n in iter(lambda: next(counter), None):
+            if n >= requests:
+                return
+            method, path, kwargs = build_request(scenario, ids, n)
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+async def measure(client, scenario: str, ids: List[str], concurrency: int, requests: int, alloc_requests: int) -> Dict[str, Any]:
+    # Warm up caches, connection pools and lazy imports
+    await drive(client, scenario, ids, concurrency, min(requests, max(concurrency, 50)))
+    
+    latencies, errors, elapsed = await drive(client, scenario, ids, concurrency, requests)
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3)
+    }
+    
+    # Separate pass under tracemalloc, which distorts timings
+    if alloc_requests:
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        await drive(client, scenario, ids, concurrency, alloc_requests)
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["alloc_peak_kib"] = round((peak - before) / 1024, 1)
+        result["alloc_retained_kib"] = round((after - before) / 1024, 1)
+    return result
+
+async def seed(client, count: int) -> List[str]:
+    """Create status checks to read back in the get scenario"""
+    ids = []
+    for n in range(count):
+        response = await client.post("/api/status", json={"client_name": f"seed-client-{n % 10}"})
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class UvicornThread:
+    """Run uvicorn for the app in a background thread"""
+    
+    def __init__(self, app, port: int):
+        import uvicorn
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+    
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+async def run_suite(args) -> Dict[str, Any]:
+    import httpx
+    from backend.database import db_manager
+    from backend.server import app, status_repository
+    from .fakes import FakeDatabase
+    
+    if not args.mongo_url:
+        # Tied to no event loop, so uvicorn's loop can use it as well
+        db_manager.database = FakeDatabase(pool_size=100, service_time=0.0)
+    
+    async def run_all(client) -> Dict[str, Any]:
+        ids = await seed(client, args.seed)
+        results = {}
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                key = f"{scenario}@c{concurrency}"
+                results[key] = await measure(client, scenario, ids, concurrency, args.requests, args.alloc_requests)
+                row = results[key]
+                print(f"{key:<16} {row['throughput_rps']:>9} req/s  p50 {row['p50_ms']:>8} ms  "
+                      f"p95 {row['p95_ms']:>8} ms  p99 {row['p99_ms']:>8} ms  errors {row['errors']}")
+        return results
+    
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    if args.transport == "asgi":
+        # ASGITransport runs no lifespan, so the client is opened on this loop
+        if args.mongo_url:
+            await db_manager.connect()
+            await status_repository.start()
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                results = await run_all(client)
+        finally:
+            await db_manager.disconnect()
+    else:
+        # The app's lifespan connects on uvicorn's loop in the server thread
+        port = free_port()
+        with UvicornThread(app, port):
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+                results = await run_all(client)
+    
+    return {
+        "meta": run_metadata(
+            transport=args.transport,
+            database="mongod" if args.mongo_url else "in-memory stand-in",
+            requests=args.requests,
+            concurrency=args.concurrency
+        ),
+        "results": results
+    }
+
+# Metrics compared by the regression gate: name -> True if higher is better
+GATED_METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p99_ms": False
+}
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    throughput_tolerance: float = 0.10,
+    latency_tolerance: float = 0.20
+) -> List[Dict[str, Any]]:
+    """Compare two result files; every row carries a regression flag"""
+    rows = []
+    for key, base in baseline["results"].items():
+        result = current["results"].get(key)
+        if result is None:
+            continue
+        for metric, higher_is_better in GATED_METRICS.items():
+            if metric not in base or metric not in result or not base[metric]:
+                continue
+            change = (result[metric] - base[metric]) / base[metric]
+            if higher_is_better:
+                regression = change < -throughput_tolerance
+            else:
+                regression = change > latency_tolerance
+            rows.append({
+                "benchmark": key,
+                "metric": metric,
+                "baseline": base[metric],
+                "current": result[metric],
+                "change_pct": round(change * 100, 1),
+                "regression": regression
+            })
+    return rows
+
+def command_run(args) -> int:
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    else:
+        # The in-memory stand-in does not support change streams
+        os.environ.setdefault("STATUS_STREAM_SOURCE", "local")
+    
+    report = asyncio.run(run_suite(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+    return 0
+
+def command_compare(args) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    rows = compare_results(baseline, current, args.throughput_tolerance / 100, args.latency_tolerance / 100)
+    
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['benchmark']:<16} {row['metric']:<15} {row['baseline']:>10} -> {row['current']:>10} "
+              f"({row['change_pct']:+.1f}%)  {flag}")
+    
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(regressions)} regression(s) in {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="Run the benchmark suite")
+    run.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    run.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    run.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    run.add_argument("--requests", type=int, default=1000, help="Timed requests per scenario and level")
+    run.add_argument("--alloc-requests", type=int, default=200, help="Requests in the tracemalloc pass (0 to skip)")
+    run.add_argument("--seed", type=int, default=200, help="Status checks created for the get scenario")
+    run.add_argument("--mongo-url", help="Benchmark against this mongod instead of the in-memory stand-in")
+    run.add_argument("--output", help="Write the JSON results to this file")
+    run.set_defaults(handler=command_run)
+    
+    compare = commands.add_parser("compare", help="Flag regressions against a baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--throughput-tolerance", type=float, default=10.0, help="Allowed throughput drop in percent")
+    compare.add_argument("--latency-tolerance", type=float, default=20.0, help="Allowed latency increase in percent")
+    compare.set_defaults(handler=command_compare)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
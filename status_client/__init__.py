@@ -0,0 +1,23 @@
+"""
+Async Python client for the status check API
+
+Depends only on httpx and pydantic; HTTP/2 is used when h2 is installed
+(pip install "httpx[http2]").
+
+    async with StatusClient("https://api.example.com") as client:
+        await client.create_status_checks(["agent-1", "agent-2"])
+        async for check in client.iter_status_checks(client_name="agent"):
+            ...
+"""
+from .client import RetryPolicy, StatusAPIError, StatusClient
+from .models import StatusCheck, StatusCheckBatchResult, StatusCheckCreate, StatusCheckFields
+
+__all__ = [
+    "RetryPolicy",
+    "StatusAPIError",
+    "StatusCheck",
+    "StatusCheckBatchResult",
+    "StatusCheckCreate",
+    "StatusCheckFields",
+    "StatusClient"
+]
@@ -0,0 +1,269 @@
+"""
+Async client for the status check API
+"""
+import asyncio
+import logging
+import random
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
+import httpx
+from .models import StatusCheck, StatusCheckBatchResult, StatusCheckCreate, StatusCheckFields
+
+logger = logging.getLogger(__name__)
+
+# Responses after which the same request may be sent again: shed or throttled,
+# or (409) an earlier attempt with the same Idempotency-Key still in progress
+RETRY_STATUSES = frozenset({409, 429, 502, 503, 504})
+
+# Ids per POST /api/status/batch-get, the API's default BATCH_GET_MAX_IDS
+BATCH_GET_MAX_IDS = 5000
+
+class StatusAPIError(Exception):
+    """Non-success response from the API, with its standard error body"""
+    
+    def __init__(self, status_code: int, message: str, details: Optional[Dict[str, Any]] = None, request_id: Optional[str] = None):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+        self.details = details
+        self.request_id = request_id
+    
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "StatusAPIError":
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            return cls(response.status_code, response.text or response.reason_phrase)
+        return cls(response.status_code, body.get("message", response.reason_phrase), body.get("details"), body.get("request_id"))
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """How often and how long to wait before retrying a request
+    
+    Waits are exponential with full jitter: a uniform draw between 0 and
+    min(max_backoff, base_backoff * 2 ** attempt), so a burst of clients
+    that failed together does not retry together. A Retry-After from the
+    server is honored as the lower bound of the wait; one longer than
+    max_retry_after is not waited for and the error is raised instead.
+    """
+    
+    def __init__(
+        self,
+        attempts: int = 4,
+        base_backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        max_retry_after: float = 60.0,
+        random_fn=random.random
+    ):
+        self.attempts = attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self._random = random_fn
+    
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number attempt + 1, or None to give up"""
+        if attempt + 1 >= self.attempts:
+            return None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        jitter = self._random() * min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        return jitter if retry_after is None else retry_after + jitter
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class StatusClient:
+    """Pooled, concurrency-limited, retrying client for the status check API
+    
+    One client holds a pool of at most max_connections keep-alive
+    connections, over HTTP/2 when the h2 package is installed (http2=None)
+    so concurrent requests share streams on few connections. At most
+    max_concurrency requests are in flight at once; more wait on the
+    client rather than on the server. Connection failures and RETRY_STATUSES
+    responses are retried per the RetryPolicy. Inserts carry a generated
+    Idempotency-Key, so a retried insert is stored once.
+    
+    Use as an async context manager, or call aclose().
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        max_connections: int = 10,
+        max_concurrency: int = 100,
+        http2: Optional[bool] = None,
+        timeout: float = 10.0,
+        retry: Optional[RetryPolicy] = None,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.retry = retry or RetryPolicy()
+        self.http2 = http2_available() if http2 is None else http2
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            http2=self.http2,
+            # Waiting for a pooled connection is bounded by max_concurrency, not by a timeout
+            timeout=httpx.Timeout(timeout, pool=None),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers=headers,
+            transport=transport
+        )
+        self.retries_total = 0
+    
+    async def __aenter__(self) -> "StatusClient":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        await self._http.aclose()
+    
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send a request with retries; raises StatusAPIError on a non-2xx answer"""
+        attempt = 0
+        while True:
+            try:
+                async with self._limit:
+                    response = await self._http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                delay = self.retry.backoff(attempt)
+                if delay is None:
+                    raise
+                logger.debug("Retrying %s %s after %r", method, path, e)
+            else:
+                if response.is_success:
+                    return response
+                if response.status_code not in RETRY_STATUSES:
+                    raise StatusAPIError.from_response(response)
+                delay = self.retry.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                if delay is None:
+                    raise StatusAPIError.from_response(response)
+                logger.debug("Retrying %s %s after %s", method, path, response.status_code)
+            self.retries_total += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    async def health(self) -> Dict[str, Any]:
+        return (await self.request("GET", "/api/health")).json()
+    
+    async def create_status_check(
+        self,
+        client_name: str,
+        *,
+        idempotency_key: Optional[str] = None,
+        write_concern: Optional[str] = None
+    ) -> StatusCheck:
+        """Record one heartbeat; write_concern needs the tier in WRITE_CONCERN_HEADER_TIERS"""
+        headers = {"Idempotency-Key": idempotency_key or str(uuid.uuid4())}
+        if write_concern is not None:
+            headers["X-Write-Concern"] = write_concern
+        body = StatusCheckCreate(client_name=client_name).model_dump()
+        response = await self.request("POST", "/api/status", json=body, headers=headers)
+        return StatusCheck.model_validate_json(response.content)
+    
+    async def create_status_checks(
+        self,
+        client_names: Iterable[str],
+        *,
+        write_concern: Optional[str] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[StatusCheck, BaseException]]:
+        """Record many heartbeats concurrently, within max_concurrency, in input order"""
+        return await asyncio.gather(
+            *(self.create_status_check(name, write_concern=write_concern) for name in client_names),
+            return_exceptions=return_exceptions
+        )
+    
+    async def get_status_check(self, status_id: str, fields: Optional[Sequence[str]] = None) -> Union[StatusCheck, StatusCheckFields]:
+        params = {"fields": ",".join(fields)} if fields else None
+        response = await self.request("GET", f"/api/status/{status_id}", params=params)
+        model = StatusCheckFields if fields else StatusCheck
+        return model.model_validate_json(response.content)
+    
+    async def get_status_checks(self, status_ids: Sequence[str]) -> StatusCheckBatchResult:
+        """Look up many ids with POST /api/status/batch-get, in requests of BATCH_GET_MAX_IDS"""
+        chunks = [status_ids[start:start + BATCH_GET_MAX_IDS] for start in range(0, len(status_ids), BATCH_GET_MAX_IDS)]
+        responses = await asyncio.gather(
+            *(self.request("POST", "/api/status/batch-get", json={"ids": list(chunk)}) for chunk in chunks)
+        )
+        batches = [StatusCheckBatchResult.model_validate_json(response.content) for response in responses]
+        return StatusCheckBatchResult(
+            results=[check for batch in batches for check in batch.results],
+            missing=[status_id for batch in batches for status_id in batch.missing]
+        )
+    
+    async def list_status_checks(
+        self,
+        *,
+        limit: int = 100,
+        skip: int = 0,
+        client_name: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Union[StatusCheck, StatusCheckFields]]:
+        """One page of GET /api/status"""
+        params: Dict[str, Any] = {"limit": limit, "skip": skip}
+        if client_name is not None:
+            params["client_name"] = client_name
+        if fields:
+            params["fields"] = ",".join(fields)
+        response = await self.request("GET", "/api/status", params=params)
+        model = StatusCheckFields if fields else StatusCheck
+        return [model.model_validate(item) for item in response.json()]
+    
+    async def iter_status_checks(
+        self,
+        *,
+        page_size: int = 500,
+        client_name: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Union[StatusCheck, StatusCheckFields]]:
+        """Every matching status check, page by page
+        
+        The API lists in insertion order, so new checks are appended and
+        offset pages stay stable while iterating. The next page is fetched
+        while the current one is consumed; iteration stops at the first
+        short page.
+        """
+        skip = 0
+        next_page = asyncio.ensure_future(
+            self.list_status_checks(limit=page_size, skip=skip, client_name=client_name, fields=fields)
+        )
+        try:
+            while True:
+                page = await next_page
+                skip += len(page)
+                if len(page) == page_size:
+                    next_page = asyncio.ensure_future(
+                        self.list_status_checks(limit=page_size, skip=skip, client_name=client_name, fields=fields)
+                    )
+                for item in page:
+                    yield item
+                if len(page) < page_size:
+                    return
+        finally:
+            if not next_page.done():
+                next_page.cancel()
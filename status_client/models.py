@@ -0,0 +1,28 @@
+"""
+Status check models, mirroring the API's in backend/server.py
+"""
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class StatusCheck(BaseModel):
+    """A stored status check"""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_name: str = Field(..., min_length=1, max_length=100)
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class StatusCheckCreate(BaseModel):
+    """Body of POST /api/status"""
+    client_name: str = Field(..., min_length=1, max_length=100, description="Client name")
+
+class StatusCheckFields(BaseModel):
+    """Status check reduced to the fields requested with fields="""
+    id: Optional[str] = None
+    client_name: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class StatusCheckBatchResult(BaseModel):
+    """Batch lookup response: found status checks in request order and the ids that were not found"""
+    results: List[StatusCheck]
+    missing: List[str]
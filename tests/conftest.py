@@ -15,10 +15,13 @@ os.environ["MONGO_URL"] = "mongodb://localhost:27017"
 os.environ["DB_NAME"] = "test_database"
 os.environ["DEBUG"] = "true"
 os.environ["LOG_LEVEL"] = "DEBUG"
+os.environ["DB_STARTUP_MODE"] = "background"
+os.environ["STATUS_STREAM_SOURCE"] = "local"
 
 from backend.server import app
 from backend.database import db_manager
 from backend.config import settings
+from .fakes import FakeDatabase
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -58,6 +61,17 @@ async def mock_database():
     # Restore original database
     db_manager.database = original_db
 
+@pytest.fixture
+def fake_database() -> Generator[FakeDatabase, None, None]:
+    """In-memory database with fault injection, installed on the db manager"""
+    fake_db = FakeDatabase()
+    original_db = db_manager.database
+    db_manager.database = fake_db
+    
+    yield fake_db
+    
+    db_manager.database = original_db
+
 @pytest.fixture
 def sample_status_check():
     """Sample status check data"""
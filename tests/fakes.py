@@ -0,0 +1,15 @@
+"""
+Test doubles: a manual clock, and the MongoDB stand-ins shared with the benchmarks
+"""
+from benchmarks.fakes import FakeCursor, FakeDatabase, FaultInjectingCollection, matches, project
+
+__all__ = ["FakeClock", "FakeCursor", "FakeDatabase", "FaultInjectingCollection", "matches", "project"]
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self, now: float = 0.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
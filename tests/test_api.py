@@ -43,6 +43,21 @@ class TestHealthEndpoints:
         assert "version" in data
         assert "status" in data
 
+class TestStartup:
+    """Test startup behaviour before the database is connected"""
+    
+    def test_requests_served_before_database_connects(self, client: TestClient):
+        """Test the app accepts traffic and answers 503 while the database is unavailable"""
+        from backend.database import db_manager
+        assert db_manager.database is None
+        
+        response = client.get("/api/")
+        assert response.status_code == 200
+        
+        response = client.post("/api/status", json={"client_name": "test-client"})
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+
 class TestStatusCheckEndpoints:
     """Test status check CRUD endpoints"""
     
@@ -132,6 +147,25 @@ class TestStatusCheckEndpoints:
         response = await async_client.get("/api/status/invalid-uuid-format")
         assert response.status_code == 422
 
+class TestStatusListCoalescing:
+    """Test coalescing of identical list queries"""
+    
+    def test_repeated_list_queries_served_from_micro_cache(self, client: TestClient, fake_database):
+        """Test repeats within the cache window do not hit the database"""
+        from backend.server import status_query_coalescer
+        status_query_coalescer.clear()
+        fake_database.status_checks.documents = [
+            {"id": "test-id-1", "client_name": "client-1", "timestamp": "2024-01-01T00:00:00"}
+        ]
+        
+        first = client.get("/api/status?client_name=Client&limit=5")
+        second = client.get("/api/status?limit=5&client_name=Client")
+        
+        assert first.status_code == 200
+        assert first.json() == second.json()
+        assert first.json()[0]["client_name"] == "client-1"
+        assert fake_database.status_checks.calls == 1
+
 class TestErrorHandling:
     """Test error handling and validation"""
     
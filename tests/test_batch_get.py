@@ -0,0 +1,102 @@
+"""
+Test the batch status check lookup endpoint
+"""
+import uuid
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from backend.status_ids import StatusIdCodec
+
+class TestLookupManyFilter:
+    """Test the $in filter for batch lookups"""
+    
+    def test_string_mode(self):
+        """Test string ids are matched on the id field"""
+        ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        assert StatusIdCodec("string").lookup_many_filter(ids) == {"id": {"$in": ids}}
+    
+    def test_uuid_mode_covers_both_layouts(self):
+        """Test binary _id and legacy string ids are matched in one query"""
+        ids = [str(uuid.uuid4())]
+        assert StatusIdCodec("uuid").lookup_many_filter(ids) == {"$or": [
+            {"_id": {"$in": [uuid.UUID(ids[0])]}},
+            {"id": {"$in": ids}}
+        ]}
+
+class TestBatchGetEndpoint:
+    """Test POST /api/status/batch-get"""
+    
+    def test_results_in_request_order_with_missing_ids(self, client: TestClient, fake_database):
+        """Test found checks come back in request order, once each, in one query"""
+        created = [client.post("/api/status", json={"client_name": f"client-{n}"}).json() for n in range(4)]
+        unknown = str(uuid.uuid4())
+        ids = [created[2]["id"], unknown, created[0]["id"], created[2]["id"], created[3]["id"]]
+        
+        calls = fake_database.status_checks.calls
+        response = client.post("/api/status/batch-get", json={"ids": ids})
+        
+        assert response.status_code == 200
+        assert response.json() == {"results": [created[2], created[0], created[3]], "missing": [unknown]}
+        assert fake_database.status_checks.calls == calls + 1
+    
+    def test_id_spellings_are_normalized(self, client: TestClient, fake_database):
+        """Test upper case and unhyphenated spellings of an id find it once"""
+        created = client.post("/api/status", json={"client_name": "spelled"}).json()
+        unknown = uuid.uuid4()
+        ids = [created["id"].upper(), uuid.UUID(created["id"]).hex, created["id"], str(unknown).upper()]
+        
+        response = client.post("/api/status/batch-get", json={"ids": ids})
+        
+        assert response.status_code == 200
+        assert response.json() == {"results": [created], "missing": [str(unknown)]}
+    
+    def test_large_batches_are_chunked(self, client: TestClient, fake_database, monkeypatch):
+        """Test inputs above the chunk size run one query per chunk"""
+        from backend.server import status_repository
+        monkeypatch.setattr(status_repository, "chunk_size", 2)
+        created = [client.post("/api/status", json={"client_name": "chunked"}).json() for _ in range(5)]
+        
+        calls = fake_database.status_checks.calls
+        response = client.post("/api/status/batch-get", json={"ids": [check["id"] for check in created]})
+        
+        assert response.json()["results"] == created
+        assert fake_database.status_checks.calls == calls + 3
+    
+    def test_uuid_storage_with_legacy_documents(self, client: TestClient, fake_database, monkeypatch):
+        """Test binary _id and legacy string id documents resolve in the same batch"""
+        from backend.server import status_id_codec
+        monkeypatch.setattr(status_id_codec, "mode", "uuid")
+        legacy_id = str(uuid.uuid4())
+        fake_database.status_checks.documents = [
+            {"_id": ObjectId(), "id": legacy_id, "client_name": "legacy", "timestamp": "2024-01-01T00:00:00"}
+        ]
+        created = client.post("/api/status", json={"client_name": "uuid-client"}).json()
+        
+        response = client.post("/api/status/batch-get", json={"ids": [legacy_id, created["id"]]})
+        
+        results = response.json()["results"]
+        assert [result["id"] for result in results] == [legacy_id, created["id"]]
+        assert results[0]["client_name"] == "legacy"
+    
+    def test_invalid_ids_are_reported(self, client: TestClient, fake_database):
+        """Test malformed ids fail the whole request and are listed"""
+        response = client.post("/api/status/batch-get", json={"ids": [str(uuid.uuid4()), "not-a-uuid"]})
+        
+        assert response.status_code == 422
+        assert response.json()["details"] == {"invalid_ids": ["not-a-uuid"], "invalid_count": 1}
+    
+    def test_batch_size_limits(self, client: TestClient, fake_database):
+        """Test empty and oversized batches are rejected"""
+        from backend.config import settings
+        too_many = [str(uuid.uuid4()) for _ in range(settings.batch_get_max_ids + 1)]
+        
+        assert client.post("/api/status/batch-get", json={"ids": []}).status_code == 422
+        assert client.post("/api/status/batch-get", json={"ids": too_many}).status_code == 422
+    
+    def test_database_unavailable(self, client: TestClient, fake_database, monkeypatch):
+        """Test 503 while the database is disconnected"""
+        from backend.database import db_manager
+        monkeypatch.setattr(db_manager, "database", None)
+        
+        response = client.post("/api/status/batch-get", json={"ids": [str(uuid.uuid4())]})
+        
+        assert response.status_code == 503
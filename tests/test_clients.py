@@ -0,0 +1,127 @@
+"""
+Test the client registry
+"""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.clients import ClientRegistry
+from backend.database import db_manager
+from .fakes import FakeClock
+
+@pytest.fixture
+def registry(fake_database) -> ClientRegistry:
+    return ClientRegistry(db_manager.collection, enabled=True)
+
+class TestClientRegistry:
+    """Test name to id registration and bulk rehydration"""
+    
+    @pytest.mark.asyncio
+    async def test_ids_are_allocated_once_and_cached(self, registry, fake_database):
+        """Test each name gets one id and known names cost no query"""
+        first = await registry.id_for("client-a")
+        second = await registry.id_for("client-b")
+        calls = fake_database.clients.calls
+        
+        assert (first, second) == (1, 2)
+        assert await registry.id_for("client-a") == 1
+        assert fake_database.clients.calls == calls
+        assert ("name", {"unique": True}) in fake_database.clients.indexes
+        assert fake_database.clients.documents == [{"_id": 1, "name": "client-a"}, {"_id": 2, "name": "client-b"}]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_first_writes_share_one_registration(self, registry, fake_database):
+        """Test simultaneous writes for a new client register it once"""
+        ids = await asyncio.gather(*(registry.id_for("client-a") for _ in range(10)))
+        
+        assert set(ids) == {1}
+        assert registry.registered_total == 1
+        assert fake_database.counters.documents == [{"_id": "clients", "seq": 1}]
+    
+    @pytest.mark.asyncio
+    async def test_lost_registration_race_uses_winning_id(self, registry, fake_database, monkeypatch):
+        """Test a name inserted by another process first resolves to that id"""
+        clients = fake_database.clients
+        original_find_one = clients.find_one
+        
+        async def find_one_then_race(filter, *args, **kwargs):
+            # Miss the lookup, then let the "other process" insert the name
+            monkeypatch.setattr(clients, "find_one", original_find_one)
+            clients.documents.append({"_id": 41, "name": filter["name"]})
+            return None
+        
+        monkeypatch.setattr(clients, "find_one", find_one_then_race)
+        
+        assert await registry.id_for("client-a") == 41
+        assert registry.registered_total == 0
+    
+    @pytest.mark.asyncio
+    async def test_hydrate_restores_names_in_one_query(self, registry, fake_database):
+        """Test documents with client ids get their names back in bulk"""
+        fake_database.clients.documents = [{"_id": 1, "name": "client-a"}, {"_id": 2, "name": "client-b"}]
+        documents = [{"id": "1", "client_id": 1}, {"id": "2", "client_id": 2}, {"id": "3", "client_name": "legacy"}]
+        
+        await registry.hydrate(documents)
+        
+        assert [document["client_name"] for document in documents] == ["client-a", "client-b", "legacy"]
+        assert all("client_id" not in document for document in documents)
+        assert fake_database.clients.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_filters_resolve_from_cache(self, registry, fake_database):
+        """Test name filters load the catalog once and then cost no query"""
+        fake_database.clients.documents = [{"_id": 1, "name": "client-a"}, {"_id": 2, "name": "other"}]
+        
+        assert await registry.ids_matching("CLIENT") == [1]
+        calls = fake_database.clients.calls
+        assert await registry.ids_matching("^o") == [2]
+        assert fake_database.clients.calls == calls
+        assert registry.snapshot()["cache_matches_total"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_filter_cache_miss_queries(self, registry, fake_database):
+        """Test a pattern matching no cached name falls back to the database"""
+        await registry.ids_matching("client")
+        fake_database.clients.documents = [{"_id": 7, "name": "client-late"}]
+        calls = fake_database.clients.calls
+        
+        assert await registry.ids_matching("late") == [7]
+        assert fake_database.clients.calls == calls + 1
+        assert await registry.id_for("client-late") == 7
+    
+    @pytest.mark.asyncio
+    async def test_filter_cache_reloads_after_interval(self, fake_database):
+        """Test the cached catalog is reloaded once refresh_interval has passed"""
+        clock = FakeClock()
+        registry = ClientRegistry(db_manager.collection, enabled=True, refresh_interval=60.0, clock=clock)
+        fake_database.clients.documents = [{"_id": 1, "name": "client-a"}]
+        assert await registry.ids_matching("client") == [1]
+        
+        fake_database.clients.documents.append({"_id": 2, "name": "client-b"})
+        assert await registry.ids_matching("client") == [1]
+        clock.now += 60.0
+        assert await registry.ids_matching("client") == [1, 2]
+
+class TestClientRegistryEndpoints:
+    """Test the API with the registry enabled"""
+    
+    def test_responses_unchanged_with_encoded_storage(self, client: TestClient, fake_database, monkeypatch):
+        """Test stored checks carry ids while responses still carry names"""
+        from backend.server import client_registry, status_query_coalescer
+        monkeypatch.setattr(client_registry, "enabled", True)
+        client_registry.clear()
+        status_query_coalescer.clear()
+        fake_database.status_checks.documents = [
+            {"id": "legacy-1", "client_name": "registry-client", "timestamp": "2024-01-01T00:00:00"}
+        ]
+        
+        created = client.post("/api/status", json={"client_name": "registry-client"})
+        assert created.status_code == 200
+        stored = fake_database.status_checks.documents[-1]
+        assert "client_name" not in stored and isinstance(stored["client_id"], int)
+        
+        fetched = client.get(f"/api/status/{created.json()['id']}")
+        assert fetched.json() == created.json()
+        
+        listed = client.get("/api/status?client_name=REGISTRY&limit=10").json()
+        assert [item["client_name"] for item in listed] == ["registry-client", "registry-client"]
+        assert client.get("/api/metrics").json()["client_registry"]["enabled"]
@@ -0,0 +1,114 @@
+"""
+Test request coalescing and the micro-cache
+"""
+import asyncio
+import pytest
+from backend.coalescing import QueryCoalescer, normalize_query_key
+from .fakes import FakeClock
+
+class TestNormalizeQueryKey:
+    """Test cache key normalization"""
+    
+    def test_parameter_order_does_not_matter(self):
+        """Test keys ignore keyword order"""
+        assert normalize_query_key("q", limit=10, skip=0) == normalize_query_key("q", skip=0, limit=10)
+    
+    def test_empty_and_case_variants_share_key(self):
+        """Test empty strings equal None and non-regex strings are case-folded"""
+        assert normalize_query_key("q", client_name="") == normalize_query_key("q", client_name=None)
+        assert normalize_query_key("q", mode="Exact") == normalize_query_key("q", mode="exact")
+        assert normalize_query_key("q", limit=10) != normalize_query_key("q", limit=20)
+    
+    def test_client_name_pattern_is_kept_verbatim(self):
+        """Test regex filters differing only in case get different keys"""
+        assert normalize_query_key("q", client_name=r"\w") != normalize_query_key("q", client_name=r"\W")
+        assert normalize_query_key("q", client_name="Web") != normalize_query_key("q", client_name="web")
+
+class TestQueryCoalescer:
+    """Test single-flight loading and micro-cache expiry"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_share_one_load(self):
+        """Test concurrent callers with the same key run the loader once"""
+        coalescer = QueryCoalescer(ttl=0)
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return b"[]"
+        
+        results = await asyncio.gather(*(coalescer.get("key", loader) for _ in range(50)))
+        
+        assert results == [b"[]"] * 50
+        assert len(calls) == 1
+        snapshot = coalescer.snapshot()
+        assert snapshot["executed"] == 1
+        assert snapshot["coalesced"] == 49
+        assert snapshot["coalescing_ratio"] == pytest.approx(0.98)
+    
+    @pytest.mark.asyncio
+    async def test_micro_cache_serves_repeats_until_expiry(self):
+        """Test results are reused within the TTL and reloaded after it"""
+        clock = FakeClock()
+        coalescer = QueryCoalescer(ttl=0.5, clock=clock)
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            return len(calls)
+        
+        assert await coalescer.get("key", loader) == 1
+        clock.now = 0.4
+        assert await coalescer.get("key", loader) == 1
+        clock.now = 0.6
+        assert await coalescer.get("key", loader) == 2
+        assert coalescer.snapshot()["cache_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_failures_reach_all_waiters_and_are_not_cached(self):
+        """Test a failed load is raised to every waiter and retried next time"""
+        coalescer = QueryCoalescer(ttl=5)
+        calls = []
+        
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database down")
+        
+        results = await asyncio.gather(
+            *(coalescer.get("key", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        
+        with pytest.raises(RuntimeError):
+            await coalescer.get("key", failing)
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_load(self):
+        """Test a disconnecting caller leaves the load running for others"""
+        coalescer = QueryCoalescer(ttl=0)
+        
+        async def loader():
+            await asyncio.sleep(0.02)
+            return "done"
+        
+        first = asyncio.create_task(coalescer.get("key", loader))
+        second = asyncio.create_task(coalescer.get("key", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        assert await second == "done"
+    
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self):
+        """Test the least recently used entries are evicted"""
+        coalescer = QueryCoalescer(ttl=5, max_entries=2)
+        
+        async def loader():
+            return 1
+        
+        for key in ("a", "b", "c"):
+            await coalescer.get(key, loader)
+        assert coalescer.snapshot()["cached_entries"] == 2
@@ -63,4 +63,20 @@ class TestSettings:
         }):
             settings = get_settings()
             assert isinstance(settings, Settings)
-            assert settings.mongo_url == 'mongodb://localhost:27017'
\ No newline at end of file
+            assert settings.mongo_url == 'mongodb://localhost:27017'
+    
+    def test_db_startup_mode_validation(self):
+        """Test DB startup mode only accepts known modes"""
+        settings = Settings(
+            mongo_url='mongodb://localhost:27017',
+            db_name='test_db',
+            db_startup_mode='background'
+        )
+        assert settings.db_startup_mode == 'background'
+        
+        with pytest.raises(ValueError, match="DB_STARTUP_MODE"):
+            Settings(
+                mongo_url='mongodb://localhost:27017',
+                db_name='test_db',
+                db_startup_mode='eventually'
+            )
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Test total counts for status check lists
+"""
+import uuid
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from pymongo.errors import ExecutionTimeout
+from backend.counting import StatusCounter, TotalCount
+from backend.database import db_manager
+from backend.repository import MemoryStatusCheckRepository, SQLiteStatusCheckRepository
+from backend.resilience import QueryTimeLimitExceeded
+
+def status_check(client_name: str):
+    return {"id": str(uuid.uuid4()), "client_name": client_name, "timestamp": datetime(2024, 1, 1)}
+
+class CountingRepository(MemoryStatusCheckRepository):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+    
+    async def count(self, client_name=None, max_time_ms=None):
+        self.calls.append(("count", client_name, max_time_ms))
+        return await super().count(client_name)
+    
+    async def estimated_count(self):
+        self.calls.append(("estimated",))
+        return len(self._records)
+
+class TestStatusCounter:
+    """Test count strategies and caching"""
+    
+    @pytest.mark.asyncio
+    async def test_strategies(self):
+        """Test metadata counts only for unfiltered estimates, bounded exact counts otherwise"""
+        repository = CountingRepository()
+        await repository.insert_many([status_check("alpha"), status_check("alpha"), status_check("beta")])
+        counter = StatusCounter(lambda: repository, max_time_ms=50)
+        
+        assert await counter.total(None, "estimated") == TotalCount(3, "estimated")
+        assert await counter.total("alpha", "estimated") == TotalCount(2, "exact")
+        assert await counter.total(None, "exact") == TotalCount(3, "exact")
+        assert repository.calls == [("estimated",), ("count", "alpha", 50), ("count", None, 50)]
+    
+    @pytest.mark.asyncio
+    async def test_totals_are_cached_per_normalized_filter(self):
+        """Test repeated filters reuse one count within the ttl, case-differing patterns do not"""
+        repository = CountingRepository()
+        counter = StatusCounter(lambda: repository, ttl=60)
+        
+        await counter.total("Alpha", "exact")
+        await counter.total("Alpha", "exact")
+        await counter.total("Alpha", "estimated")
+        await counter.total("alpha", "exact")
+        
+        assert len(repository.calls) == 3
+        assert counter.snapshot()["cache"]["cache_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_timed_out_count_is_a_lower_bound(self):
+        """Test a count over its time limit becomes at-least, bounded by the page"""
+        repository = CountingRepository()
+        
+        async def slow_count(client_name=None, max_time_ms=None):
+            raise QueryTimeLimitExceeded()
+        
+        repository.count = slow_count
+        counter = StatusCounter(lambda: repository)
+        
+        total = await counter.total("alpha", "exact")
+        
+        assert total == TotalCount(0, "at-least")
+        assert total.at_least(120) == TotalCount(120, "at-least")
+        assert TotalCount(7, "exact").at_least(120) == TotalCount(7, "exact")
+        assert counter.snapshot()["counted"]["at-least"] == 1
+
+class TestCountTimeLimits:
+    """Test engines stop exact counts at max_time_ms"""
+    
+    @pytest.mark.asyncio
+    async def test_mongo_time_limit_does_not_trip_breaker(self, fake_database):
+        """Test maxTimeMS is capped and ExecutionTimeout becomes QueryTimeLimitExceeded"""
+        collection = db_manager.collection("status_checks")
+        fake_database.status_checks.fail_next(*[ExecutionTimeout("operation exceeded time limit", 50)] * 10)
+        
+        for _ in range(10):
+            with pytest.raises(QueryTimeLimitExceeded):
+                await collection.count_documents({}, max_time_ms=25)
+        
+        assert fake_database.status_checks.max_time_ms[-1] == 25
+        assert db_manager.breaker.state == "closed"
+    
+    @pytest.mark.asyncio
+    async def test_sqlite_count_is_interrupted(self, tmp_path):
+        """Test a slow filtered count is interrupted at its time limit"""
+        repository = SQLiteStatusCheckRepository(str(tmp_path / "status.db"))
+        await repository.start()
+        try:
+            await repository.insert_many([status_check(f"client-{n % 100}") for n in range(50000)])
+            
+            assert await repository.count("^client-7$", max_time_ms=10000) == 500
+            with pytest.raises(QueryTimeLimitExceeded):
+                await repository.count("client", max_time_ms=1)
+            assert await repository.estimated_count() == 50000
+        finally:
+            await repository.close()
+
+class TestTotalParameter:
+    """Test total= on GET /api/status"""
+    
+    @pytest.fixture(autouse=True)
+    def fresh_caches(self):
+        from backend.server import status_counter, status_query_coalescer
+        status_query_coalescer.clear()
+        status_counter.clear()
+    
+    def test_exact_and_estimated_totals(self, client: TestClient, fake_database):
+        """Test totals are reported in headers and the body stays a list"""
+        for name in ("alpha", "alpha", "beta"):
+            client.post("/api/status", json={"client_name": name})
+        
+        exact = client.get("/api/status", params={"client_name": "alpha", "limit": 1, "total": "exact"})
+        estimated = client.get("/api/status", params={"total": "estimated"})
+        
+        assert len(exact.json()) == 1
+        assert (exact.headers["X-Total-Count"], exact.headers["X-Total-Count-Type"]) == ("2", "exact")
+        assert (estimated.headers["X-Total-Count"], estimated.headers["X-Total-Count-Type"]) == ("3", "estimated")
+        assert "X-Total-Count" not in client.get("/api/status").headers
+    
+    def test_count_timeout_reports_at_least(self, client: TestClient, fake_database, monkeypatch):
+        """Test a timed-out count still answers with the page's lower bound"""
+        for _ in range(3):
+            client.post("/api/status", json={"client_name": "slow"})
+        
+        async def timed_out(*args, **kwargs):
+            raise QueryTimeLimitExceeded()
+        
+        monkeypatch.setattr(fake_database.status_checks, "count_documents", timed_out)
+        response = client.get("/api/status", params={"skip": 1, "limit": 1, "total": "exact"})
+        
+        assert response.status_code == 200
+        assert (response.headers["X-Total-Count"], response.headers["X-Total-Count-Type"]) == ("2", "at-least")
+    
+    def test_unknown_strategy_is_rejected(self, client: TestClient, fake_database):
+        """Test only the supported strategies are accepted"""
+        assert client.get("/api/status", params={"total": "precise"}).status_code == 422
@@ -2,9 +2,9 @@
 Test database operations
 """
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from backend.database import DatabaseManager
-from backend.exceptions import DatabaseError
+from backend.exceptions import DatabaseError, ServiceUnavailableError
 
 class TestDatabaseManager:
     """Test database manager functionality"""
@@ -23,6 +23,30 @@ class TestDatabaseManager:
             assert db is not None
             mock_instance.admin.command.assert_called_once_with('ping')
     
+    @pytest.mark.asyncio
+    async def test_failed_connect_closes_client(self):
+        """Test a client whose ping fails is closed and not kept"""
+        db_manager = DatabaseManager()
+        
+        with patch('motor.motor_asyncio.AsyncIOMotorClient') as mock_client:
+            clients = []
+            
+            def new_client(*args, **kwargs):
+                client = MagicMock()
+                client.admin.command = AsyncMock(side_effect=ConnectionError("not ready"))
+                clients.append(client)
+                return client
+            
+            mock_client.side_effect = new_client
+            for _ in range(3):
+                with pytest.raises(ConnectionError):
+                    await db_manager.connect()
+        
+        assert len(clients) == 3
+        assert all(client.close.call_count == 1 for client in clients)
+        assert db_manager.client is None
+        assert db_manager.database is None
+    
     @pytest.mark.asyncio
     async def test_database_health_check(self):
         """Test database health check"""
@@ -81,4 +105,29 @@ class TestDatabaseManager:
         await db_manager.disconnect()
         mock_client.close.assert_called_once()
         assert db_manager.client is None
-        assert db_manager.database is None
\ No newline at end of file
+        assert db_manager.database is None
+    
+    @pytest.mark.asyncio
+    async def test_connect_in_background_retries(self):
+        """Test background connection retries until the database is reachable"""
+        db_manager = DatabaseManager()
+        attempts = []
+        
+        async def flaky_connect():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("not ready")
+            db_manager.database = AsyncMock()
+            return db_manager.database
+        
+        with patch.object(db_manager, "connect", side_effect=flaky_connect):
+            await db_manager.connect_in_background(retry_interval=0)
+        
+        assert len(attempts) == 3
+        assert db_manager.database is not None    
+    def test_collection_before_connect_is_unavailable(self):
+        """Test asking for a collection while disconnected raises a 503 error"""
+        db_manager = DatabaseManager()
+        
+        with pytest.raises(ServiceUnavailableError):
+            db_manager.collection("idempotency_keys")
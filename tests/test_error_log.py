@@ -0,0 +1,115 @@
+"""
+Test throttled error logging and cached error bodies
+"""
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import Request
+from backend.error_log import ErrorLogThrottle, exception_fingerprint
+from backend.exceptions import ServiceUnavailableError, api_error_handler, general_exception_handler
+from backend.logging_config import log_error
+from .fakes import FakeClock
+
+def raise_from(line: int) -> Exception:
+    try:
+        if line == 1:
+            raise RuntimeError("first site")
+        raise RuntimeError("second site")
+    except RuntimeError as e:
+        return e
+
+def make_request(request_id: str = "test-123") -> Request:
+    request = MagicMock(spec=Request)
+    request.state = MagicMock()
+    request.state.request_id = request_id
+    request.url.path = "/api/status"
+    request.method = "GET"
+    return request
+
+class TestExceptionFingerprint:
+    """Test fingerprints group exceptions by type and raise site"""
+    
+    def test_same_site_same_fingerprint(self):
+        """Test the message does not change the fingerprint, the raise site does"""
+        assert exception_fingerprint(raise_from(1)) == exception_fingerprint(raise_from(1))
+        assert exception_fingerprint(raise_from(1)) != exception_fingerprint(raise_from(2))
+        assert exception_fingerprint(ValueError()) != exception_fingerprint(KeyError())
+
+class TestErrorLogThrottle:
+    """Test per-fingerprint rate limiting and suppressed-repeat summaries"""
+    
+    def test_one_entry_per_interval(self):
+        """Test repeats are counted inside the interval and summarized when it ends"""
+        clock = FakeClock(1000.0)
+        throttle = ErrorLogThrottle(interval=60, clock=clock)
+        
+        assert throttle.should_log("a", "RuntimeError", "boom")
+        assert not any(throttle.should_log("a") for _ in range(99))
+        assert throttle.should_log("b")
+        
+        clock.now += 60
+        with patch("backend.error_log.logger") as logger:
+            assert throttle.should_log("a")
+        
+        logger.error.assert_called_once()
+        assert logger.error.call_args.kwargs["suppressed"] == 99
+        assert throttle.snapshot()["suppressed_total"] == 99
+        assert throttle.snapshot()["suppressed_pending"] == 0
+    
+    def test_flush_and_eviction_report_counts(self):
+        """Test flush and evicting the oldest fingerprint both log pending counts"""
+        throttle = ErrorLogThrottle(interval=60, max_fingerprints=2, clock=FakeClock(1000.0))
+        for fingerprint in ("a", "a", "b", "b", "b"):
+            throttle.should_log(fingerprint)
+        
+        with patch("backend.error_log.logger") as logger:
+            throttle.should_log("c")
+            throttle.flush()
+        
+        assert [call.kwargs["suppressed"] for call in logger.error.call_args_list] == [1, 2]
+    
+    def test_zero_interval_logs_everything(self):
+        """Test throttling can be disabled"""
+        throttle = ErrorLogThrottle(interval=0)
+        assert all(throttle.should_log("a") for _ in range(5))
+
+class TestThrottledHandlers:
+    """Test the exception handlers log once per fingerprint and keep their bodies"""
+    
+    @pytest.mark.asyncio
+    async def test_unhandled_exception_storm_logs_once(self):
+        """Test repeated unhandled exceptions log one traceback and distinct bodies"""
+        throttle = ErrorLogThrottle(interval=60)
+        with patch("backend.exceptions.error_log_throttle", throttle), patch("backend.exceptions.logger") as logger:
+            responses = [await general_exception_handler(make_request(f"r{i}"), raise_from(1)) for i in range(50)]
+        
+        assert logger.error.call_count == 1
+        assert "first site" in logger.error.call_args.kwargs["traceback"]
+        bodies = [json.loads(response.body) for response in responses]
+        assert [body["request_id"] for body in bodies] == [f"r{i}" for i in range(50)]
+        assert set(bodies[0]) == {"error", "message", "request_id", "timestamp", "details"}
+    
+    @pytest.mark.asyncio
+    async def test_outage_errors_are_throttled(self):
+        """Test 5xx API errors are throttled and keep their headers"""
+        throttle = ErrorLogThrottle(interval=60)
+        with patch("backend.exceptions.error_log_throttle", throttle), patch("backend.exceptions.logger") as logger:
+            for _ in range(20):
+                response = await api_error_handler(make_request(), ServiceUnavailableError("Database not connected"))
+        
+        assert logger.warning.call_count == 1
+        assert response.headers["retry-after"] == "5"
+        assert json.loads(response.body)["message"] == "Database not connected"
+    
+    def test_handler_errors_are_throttled_per_fingerprint(self):
+        """Test log_error logs each failure site once per interval"""
+        throttle = ErrorLogThrottle(interval=60)
+        logger = MagicMock()
+        with patch("backend.logging_config.error_log_throttle", throttle):
+            for _ in range(20):
+                log_error(logger, raise_from(1), {"operation": "get_status_checks"})
+            log_error(logger, raise_from(2), {"operation": "get_status_checks"})
+        
+        assert logger.error.call_count == 2
+        assert logger.error.call_args.kwargs["fingerprint"] == exception_fingerprint(raise_from(2))
+        assert throttle.snapshot()["suppressed_pending"] == 19
@@ -6,7 +6,7 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from unittest.mock import MagicMock, AsyncMock
 from backend.exceptions import (
-    APIError, DatabaseError, NotFoundError, ValidationError,
+    APIError, DatabaseError, NotFoundError, ValidationError, ServiceUnavailableError,
     api_error_handler, general_exception_handler
 )
 
@@ -40,6 +40,13 @@ class TestCustomExceptions:
         assert error.status_code == 500
         assert error.message == "Connection failed"
         assert error.log_level == "error"
+    
+    def test_service_unavailable_error(self):
+        """Test ServiceUnavailableError exception"""
+        error = ServiceUnavailableError("Database not connected", retry_after=3)
+        assert error.status_code == 503
+        assert error.message == "Database not connected"
+        assert error.headers == {"Retry-After": "3"}
 
 class TestExceptionHandlers:
     """Test exception handler functions"""
@@ -68,6 +75,20 @@ class TestExceptionHandlers:
         assert "Test error" in content
         assert "test-123" in content
     
+    @pytest.mark.asyncio
+    async def test_api_error_handler_forwards_headers(self):
+        """Test API error handler keeps error headers such as Retry-After"""
+        request = MagicMock(spec=Request)
+        request.state = MagicMock()
+        request.state.request_id = "test-123"
+        request.url.path = "/api/status"
+        request.method = "GET"
+        
+        response = await api_error_handler(request, ServiceUnavailableError(retry_after=7))
+        
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "7"
+    
     @pytest.mark.asyncio
     async def test_general_exception_handler(self):
         """Test general exception handler"""
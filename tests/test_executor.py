@@ -0,0 +1,72 @@
+"""
+Test the offload executor
+"""
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from backend.exceptions import ServiceUnavailableError
+from backend.executor import OffloadExecutor
+
+class TestOffloadExecutor:
+    """Test size heuristics, bounded queueing and queue wait metrics"""
+    
+    @pytest.mark.asyncio
+    async def test_small_work_runs_inline(self):
+        """Test work below min_items and work before start stay on the loop thread"""
+        executor = OffloadExecutor(max_workers=2, min_items=100)
+        assert await executor.run(threading.get_ident, size=1000) == threading.get_ident()
+        
+        executor.start()
+        try:
+            assert await executor.run(threading.get_ident, size=10) == threading.get_ident()
+            assert await executor.run(threading.get_ident, size=100) != threading.get_ident()
+        finally:
+            executor.shutdown()
+        
+        assert executor.inline_total == 2
+        assert executor.offloaded_total == 1
+        assert executor.queue_wait.count == 1
+    
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        """Test calls beyond workers plus queue are shed and queue wait is measured"""
+        executor = OffloadExecutor(max_workers=1, max_queue=1, min_items=0)
+        executor.start()
+        release = threading.Event()
+        try:
+            running = asyncio.create_task(executor.run(release.wait, 5))
+            waiting = asyncio.create_task(executor.run(sum, [1, 2]))
+            await asyncio.sleep(0.05)
+            assert (executor.in_flight, executor.queued) == (1, 1)
+            
+            with pytest.raises(ServiceUnavailableError):
+                await executor.run(sum, [3])
+            
+            release.set()
+            assert await running is True
+            assert await waiting == 3
+        finally:
+            executor.shutdown()
+        
+        assert executor.rejected_total == 1
+        assert executor.queue_wait.max_ms >= 40
+    
+    def test_large_pages_are_serialized_in_pool(self, client: TestClient, fake_database, monkeypatch):
+        """Test list pages at the threshold are built off the loop and reported in metrics"""
+        from backend.server import offload_executor, status_query_coalescer
+        status_query_coalescer.clear()
+        monkeypatch.setattr(offload_executor, "min_items", 2)
+        fake_database.status_checks.documents = [
+            {"id": f"test-id-{index}", "client_name": "client-1", "timestamp": "2024-01-01T00:00:00"}
+            for index in range(3)
+        ]
+        offloaded = offload_executor.offloaded_total
+        
+        response = client.get("/api/status?limit=10&client_name=client")
+        
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == ["test-id-0", "test-id-1", "test-id-2"]
+        executor = client.get("/api/metrics").json()["executor"]
+        assert executor["running"]
+        assert executor["offloaded_total"] == offloaded + 1
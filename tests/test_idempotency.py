@@ -0,0 +1,137 @@
+"""
+Test Idempotency-Key handling
+"""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.database import db_manager
+from backend.exceptions import ConflictError, ValidationError
+from backend.idempotency import IdempotencyStore
+from .fakes import FakeClock
+
+class CountingWrite:
+    """Stand-in for the write an idempotent request performs"""
+    
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+    
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return 200, f'{{"call":{self.calls}}}'.encode()
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(1_700_000_000.0)
+
+@pytest.fixture
+def store(fake_database, clock) -> IdempotencyStore:
+    return IdempotencyStore(db_manager.collection, ttl=60, clock=clock)
+
+class TestIdempotencyStore:
+    """Test replay, collapsing of duplicates, races between processes and expiry"""
+    
+    @pytest.mark.asyncio
+    async def test_replay_is_served_from_memory(self, store, fake_database):
+        """Test a repeated key returns the stored response without database calls"""
+        write = CountingWrite()
+        first, replayed = await store.execute("key-1", "fp", write)
+        calls = fake_database.idempotency_keys.calls
+        
+        second, replayed_again = await store.execute("key-1", "fp", write)
+        
+        assert (replayed, replayed_again) == (False, True)
+        assert second.body == first.body == b'{"call":1}'
+        assert write.calls == 1
+        assert fake_database.idempotency_keys.calls == calls
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_collapse_to_one_write(self, store):
+        """Test simultaneous requests with one key perform a single write"""
+        write = CountingWrite(delay=0.05)
+        
+        results = await asyncio.gather(*(store.execute("key-1", "fp", write) for _ in range(5)))
+        
+        assert write.calls == 1
+        assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+        assert len({stored.body for stored, _ in results}) == 1
+    
+    @pytest.mark.asyncio
+    async def test_other_process_replays_or_conflicts(self, store, clock):
+        """Test a second process replays a completed key and gets 409 while it is pending"""
+        other_process = IdempotencyStore(db_manager.collection, ttl=60, clock=clock)
+        slow = CountingWrite(delay=0.1)
+        
+        running = asyncio.create_task(store.execute("key-1", "fp", slow))
+        await asyncio.sleep(0.02)
+        with pytest.raises(ConflictError):
+            await other_process.execute("key-1", "fp", CountingWrite())
+        stored, _ = await running
+        
+        write = CountingWrite()
+        replay, replayed = await other_process.execute("key-1", "fp", write)
+        assert replayed and replay.body == stored.body
+        assert write.calls == 0
+    
+    @pytest.mark.asyncio
+    async def test_expired_keys_run_again(self, store, clock):
+        """Test a key is executed again once its TTL has passed"""
+        write = CountingWrite()
+        await store.execute("key-1", "fp", write)
+        
+        clock.now += 61
+        stored, replayed = await store.execute("key-1", "fp", write)
+        
+        assert not replayed
+        assert write.calls == 2
+        assert stored.body == b'{"call":2}'
+    
+    @pytest.mark.asyncio
+    async def test_failed_write_releases_key(self, store, fake_database):
+        """Test a failed request can be retried with the same key"""
+        with pytest.raises(RuntimeError):
+            await store.execute("key-1", "fp", CountingWrite(error=RuntimeError("boom")))
+        
+        assert fake_database.idempotency_keys.documents == []
+        _, replayed = await store.execute("key-1", "fp", CountingWrite())
+        assert not replayed
+    
+    @pytest.mark.asyncio
+    async def test_key_reuse_with_other_payload_is_rejected(self, store):
+        """Test a key cannot be reused for a different request"""
+        await store.execute("key-1", "fp-a", CountingWrite())
+        
+        with pytest.raises(ValidationError):
+            await store.execute("key-1", "fp-b", CountingWrite())
+
+class TestIdempotentEndpoint:
+    """Test POST /api/status with an Idempotency-Key"""
+    
+    def test_retried_post_creates_one_status_check(self, client: TestClient, fake_database):
+        """Test a retry returns the first response and writes nothing"""
+        headers = {"Idempotency-Key": "retry-test-1"}
+        
+        first = client.post("/api/status", json={"client_name": "agent"}, headers=headers)
+        second = client.post("/api/status", json={"client_name": "agent"}, headers=headers)
+        
+        assert first.status_code == second.status_code == 200
+        assert second.json() == first.json()
+        assert (first.headers["idempotent-replayed"], second.headers["idempotent-replayed"]) == ("false", "true")
+        assert len(fake_database.status_checks.documents) == 1
+        
+        other = client.post("/api/status", json={"client_name": "other"}, headers=headers)
+        assert other.status_code == 422
+    
+    def test_disconnected_database_is_retryable(self, client: TestClient, fake_database, monkeypatch):
+        """Test a keyed POST answers 503 with Retry-After while the database is disconnected"""
+        monkeypatch.setattr(db_manager, "database", None)
+        
+        response = client.post("/api/status", json={"client_name": "agent"}, headers={"Idempotency-Key": "offline-1"})
+        
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
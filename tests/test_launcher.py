@@ -0,0 +1,55 @@
+"""
+Test the python -m backend launcher
+"""
+import json
+import pytest
+from unittest.mock import patch
+from backend.__main__ import main, resolve_implementation, server_options
+from backend.config import Settings
+
+def installed(*names):
+    return patch("backend.__main__.module_available", side_effect=lambda name: name in names)
+
+class TestServerOptions:
+    """Test loop/parser selection and the uvicorn options built from Settings"""
+    
+    def test_auto_prefers_fast_implementation(self):
+        """Test auto picks uvloop and httptools only when installed"""
+        with installed("uvloop", "httptools"):
+            assert resolve_implementation("auto", "uvloop", "asyncio", "SERVER_LOOP") == "uvloop"
+        with installed():
+            assert resolve_implementation("auto", "uvloop", "asyncio", "SERVER_LOOP") == "asyncio"
+    
+    def test_explicit_missing_implementation_fails(self):
+        """Test asking for a missing fast implementation exits instead of falling back"""
+        with installed(), pytest.raises(SystemExit, match="SERVER_HTTP=httptools"):
+            resolve_implementation("httptools", "httptools", "h11", "SERVER_HTTP")
+    
+    def test_settings_map_to_uvicorn_options(self):
+        """Test the tuning settings are passed through to uvicorn"""
+        config = Settings(
+            mongo_url="mongodb://localhost:27017",
+            db_name="test_db",
+            server_backlog=4096,
+            server_keep_alive_seconds=75,
+            server_limit_concurrency=0,
+            server_workers=4
+        )
+        with installed():
+            options = server_options(config)
+        
+        assert options["loop"] == "asyncio" and options["http"] == "h11"
+        assert options["backlog"] == 4096
+        assert options["timeout_keep_alive"] == 75
+        assert options["limit_concurrency"] is None
+        assert options["workers"] == 4
+    
+    def test_print_config(self, capsys):
+        """Test --print-config prints the effective options without starting a server"""
+        with patch("uvicorn.run") as run:
+            main(["--print-config"])
+        
+        printed = json.loads(capsys.readouterr().out)
+        assert printed["app"] == "backend.server:app"
+        assert "timeout_keep_alive" in printed
+        run.assert_not_called()
@@ -0,0 +1,38 @@
+"""
+Test structured logging configuration
+"""
+import json
+import logging
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import structlog
+from backend.error_log import ErrorLogThrottle
+from backend.logging_config import log_error
+
+class TestConfigureLogging:
+    """Test application logs go through stdlib logging"""
+    
+    def test_caplog_captures_app_logs(self, caplog):
+        """Test a structlog call reaches stdlib handlers as a JSON line"""
+        logger = structlog.get_logger("backend.tests")
+        with caplog.at_level(logging.INFO), patch("backend.logging_config.error_log_throttle", ErrorLogThrottle()):
+            log_error(logger, ValueError("boom"), {"operation": "test"})
+        
+        record, = [record for record in caplog.records if record.name == "backend.tests"]
+        assert record.levelno == logging.ERROR
+        event = json.loads(record.getMessage())
+        assert event["event"] == "Application error"
+        assert event["error_type"] == "ValueError"
+        assert event["operation"] == "test"
+        assert event["logger"] == "backend.tests"
+    
+    def test_handler_logs_are_captured(self, client: TestClient, fake_database, caplog):
+        """Test a handler's logs reach caplog with the bound request context"""
+        with caplog.at_level(logging.INFO):
+            response = client.post("/api/status", json={"client_name": "logged"})
+        
+        assert response.status_code == 200
+        events = [json.loads(record.getMessage()) for record in caplog.records if record.name != "httpx"]
+        request_id = response.headers["X-Request-ID"]
+        assert any(event["event"] == "Request started" and event["request_id"] == request_id for event in events)
+        assert any(event.get("operation") == "create_status_check" and event["request_id"] == request_id for event in events)
@@ -0,0 +1,77 @@
+"""
+Test event loop lag monitoring
+"""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from backend.loop_monitor import LagHistogram, LoopMonitor, detect_blocking_calls
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+class TestLagHistogram:
+    """Test lag bucketing"""
+    
+    def test_cumulative_buckets(self):
+        """Test samples land in the first bucket that fits and counts accumulate"""
+        histogram = LagHistogram(buckets_ms=(1, 10, 100))
+        for lag_ms in (0.5, 5, 5, 50, 500):
+            histogram.observe(lag_ms)
+        
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets_ms"] == {"1": 1, "10": 3, "100": 4, "+Inf": 5}
+        assert snapshot["count"] == 5
+        assert snapshot["max_ms"] == 500
+
+class TestLoopMonitor:
+    """Test lag sampling and blocked-loop reports"""
+    
+    @pytest.mark.asyncio
+    async def test_reports_stack_of_blocking_call(self):
+        """Test a blocking call is reported with its stack while it runs"""
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            block_the_loop(0.25)
+            await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+        
+        assert monitor.stalls_total == 1
+        stall = monitor.recent_stalls[0]
+        assert any("block_the_loop" in line for line in stall["stack"])
+        assert stall["task"] == asyncio.current_task().get_name()
+        assert stall["blocked_ms"] >= 50
+        assert monitor.histogram.max_ms >= 200
+    
+    @pytest.mark.asyncio
+    async def test_disabled_monitor_does_not_start(self):
+        """Test a disabled monitor starts no task"""
+        monitor = LoopMonitor(enabled=False)
+        monitor.start()
+        
+        assert monitor._task is None
+        await monitor.stop()
+    
+    @pytest.mark.asyncio
+    async def test_debug_mode_records_slow_steps(self):
+        """Test asyncio debug mode integration reports blocking task steps"""
+        async def blocking_step():
+            block_the_loop(0.06)
+        
+        with detect_blocking_calls(threshold=0.03) as slow_callbacks:
+            await asyncio.create_task(blocking_step())
+        
+        assert any("blocking_step" in callback for callback in slow_callbacks)
+        assert not asyncio.get_running_loop().get_debug()
+    
+    def test_metrics_include_event_loop(self, client: TestClient):
+        """Test the metrics endpoint exposes the lag histogram"""
+        response = client.get("/api/metrics")
+        
+        assert response.status_code == 200
+        event_loop = response.json()["event_loop"]
+        assert event_loop["enabled"]
+        assert "+Inf" in event_loop["lag"]["buckets_ms"]
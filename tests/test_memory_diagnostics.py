@@ -0,0 +1,112 @@
+"""
+Test memory diagnostics
+"""
+import tracemalloc
+import pytest
+from fastapi.testclient import TestClient
+from backend import memory_diagnostics as memory_diagnostics_module
+from backend.config import settings
+from backend.memory_diagnostics import MemoryDiagnostics, object_counts
+from backend.server import memory_diagnostics
+
+ADMIN = {"X-Admin-Token": "admin-secret"}
+
+class Ballast:
+    pass
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    """Enable the admin API and stop tracing after the test"""
+    monkeypatch.setattr(settings, "admin_token", "admin-secret")
+    yield ADMIN
+    memory_diagnostics.stop()
+
+class TestMemoryDiagnostics:
+    """Test tracing, snapshots and diffs"""
+    
+    def test_nothing_is_traced_until_started(self):
+        """Test a new instance leaves tracemalloc off and refuses snapshots"""
+        diagnostics = MemoryDiagnostics()
+        
+        assert not tracemalloc.is_tracing()
+        assert diagnostics.snapshot() == {"tracing": False, "snapshots": 0}
+        with pytest.raises(RuntimeError):
+            diagnostics.take_snapshot()
+    
+    def test_diff_finds_growing_site(self):
+        """Test allocations made between snapshots lead the diff"""
+        diagnostics = MemoryDiagnostics(frames=5, max_snapshots=2)
+        diagnostics.start()
+        try:
+            before = diagnostics.take_snapshot()
+            ballast = [bytearray(4096) for _ in range(500)]
+            after = diagnostics.take_snapshot()
+            
+            diff = after.compare_to(before, limit=5)
+            assert diff[0]["site"].startswith(__file__)
+            assert diff[0]["size_diff_bytes"] >= 500 * 4096
+            assert memory_diagnostics_module.__file__ not in [entry["site"] for entry in after.top("filename", limit=1000)]
+            
+            diagnostics.take_snapshot()
+            assert diagnostics.get(before.id) is None
+            assert [entry["id"] for entry in diagnostics.list_snapshots()][1] == after.id
+            del ballast
+        finally:
+            diagnostics.stop()
+        
+        assert not tracemalloc.is_tracing()
+        assert diagnostics.list_snapshots() == []
+    
+    def test_object_counts(self):
+        """Test live objects are counted by type"""
+        ballast = [Ballast() for _ in range(2000)]
+        
+        counts = {entry["type"]: entry["count"] for entry in object_counts(limit=1000)}
+        
+        assert counts["Ballast"] >= 2000
+        del ballast
+
+class TestMemoryEndpoints:
+    """Test the admin memory API"""
+    
+    def test_requires_admin_token(self, client: TestClient, admin_token):
+        """Test the memory endpoints are refused without the admin token"""
+        assert client.get("/api/admin/memory").status_code == 403
+        assert client.post("/api/admin/memory/tracing", json={}).status_code == 403
+        assert not tracemalloc.is_tracing()
+    
+    def test_snapshot_and_diff(self, client: TestClient, admin_token):
+        """Test starting tracing, taking two snapshots and diffing them"""
+        assert client.post("/api/admin/memory/snapshots", headers=admin_token).status_code == 422
+        
+        started = client.post("/api/admin/memory/tracing", json={"frames": 3}, headers=admin_token)
+        assert started.json()["tracing"] is True and started.json()["frames"] == 3
+        
+        first = client.post("/api/admin/memory/snapshots", headers=admin_token).json()
+        ballast = [bytearray(1024) for _ in range(1000)]
+        second = client.post("/api/admin/memory/snapshots", params={"limit": 5}, headers=admin_token).json()
+        assert len(second["top"]) == 5
+        
+        diff = client.get(
+            f"/api/admin/memory/snapshots/{second['id']}",
+            params={"compare_to": first["id"], "group_by": "traceback"},
+            headers=admin_token
+        ).json()
+        assert diff["compared_to"]["id"] == first["id"]
+        assert any(entry["size_diff_bytes"] >= 1000 * 1024 for entry in diff["diff"])
+        del ballast
+        
+        overview = client.get("/api/admin/memory", headers=admin_token).json()
+        assert [entry["id"] for entry in overview["snapshots"]] == [second["id"], first["id"]]
+        assert len(overview["memory_usage"]["gc"]["generations"]) == 3
+        assert client.get("/api/admin/memory/snapshots/missing", headers=admin_token).status_code == 404
+        
+        stopped = client.delete("/api/admin/memory/tracing", headers=admin_token).json()
+        assert stopped == {"tracing": False, "snapshots": 0}
+    
+    def test_object_counts_endpoint(self, client: TestClient, admin_token):
+        """Test object counts come with collector statistics"""
+        response = client.get("/api/admin/memory/objects", params={"limit": 10}, headers=admin_token).json()
+        
+        assert len(response["objects"]) == 10
+        assert len(response["gc"]["generations"]) == 3
@@ -0,0 +1,145 @@
+"""
+Test middleware components
+"""
+import asyncio
+import pytest
+import httpx
+import structlog
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from backend.middleware import (
+    SECURITY_HEADERS, AdaptiveConcurrencyLimiter, ConcurrencyLimitMiddleware, RequestLoggingMiddleware
+)
+from .fakes import FakeClock
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD limit adaptation and priority shedding"""
+    
+    def test_route_priorities(self):
+        """Test health is critical, reads are reads and everything else is a write"""
+        limiter = AdaptiveConcurrencyLimiter()
+        assert limiter.priority_for("GET", "/api/health") == "critical"
+        assert limiter.priority_for("GET", "/api/status") == "read"
+        assert limiter.priority_for("POST", "/api/status") == "write"
+        assert limiter.priority_for("POST", "/api/status/batch-get") == "read"
+    
+    def test_lower_priorities_shed_first(self):
+        """Test writes are shed before reads, and reads before health checks"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, min_limit=1)
+        for _ in range(6):
+            assert limiter.try_acquire("write")
+        assert not limiter.try_acquire("write")
+        
+        for _ in range(3):
+            assert limiter.try_acquire("read")
+        assert not limiter.try_acquire("read")
+        
+        assert limiter.try_acquire("critical")
+        assert not limiter.try_acquire("critical")
+        assert limiter.snapshot()["shed_total"] == {"critical": 1, "read": 1, "write": 1}
+    
+    def test_slow_requests_decrease_limit(self):
+        """Test latency above target shrinks the limit multiplicatively"""
+        clock = FakeClock()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=100, latency_target=0.1, clock=clock)
+        limiter.try_acquire("read")
+        limiter.release(0.5)
+        assert limiter.limit == pytest.approx(90)
+        
+        # A burst of slow completions only counts once per target interval
+        limiter.try_acquire("read")
+        limiter.release(0.5)
+        assert limiter.limit == pytest.approx(90)
+        
+        clock.now = 1.0
+        limiter.try_acquire("read")
+        limiter.release(0.5)
+        assert limiter.limit == pytest.approx(81)
+    
+    def test_fast_requests_increase_limit_when_busy(self):
+        """Test fast completions grow the limit only while it is being used"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_target=0.1)
+        limiter.try_acquire("read")
+        limiter.release(0.01)
+        assert limiter.limit == 10
+        
+        for _ in range(8):
+            limiter.try_acquire("read")
+        limiter.release(0.01)
+        assert limiter.limit == pytest.approx(10.1)
+    
+    def test_limit_stays_within_bounds(self):
+        """Test the limit never drops below min_limit"""
+        clock = FakeClock()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=11, min_limit=10, latency_target=0.1, clock=clock)
+        for step in range(5):
+            clock.now = step
+            limiter.try_acquire("read")
+            limiter.release(1.0)
+        assert limiter.limit == 10
+
+class TestConcurrencyLimitMiddleware:
+    """Test load shedding through the ASGI middleware"""
+    
+    @pytest.mark.asyncio
+    async def test_sheds_with_retry_after(self):
+        """Test requests beyond the limit get 503 with Retry-After"""
+        release = asyncio.Event()
+        
+        async def slow(request):
+            await release.wait()
+            return PlainTextResponse("done")
+        
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1)
+        app = Starlette(routes=[Route("/api/status", slow, methods=["GET", "POST"])])
+        app = ConcurrencyLimitMiddleware(app, limiter=limiter, retry_after=2)
+        
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/status"))
+            while limiter.in_flight == 0:
+                await asyncio.sleep(0)
+            
+            shed = await client.get("/api/status")
+            assert shed.status_code == 503
+            assert shed.headers["retry-after"] == "2"
+            assert all(shed.headers[name] == value for name, value in SECURITY_HEADERS.items())
+            
+            release.set()
+            assert (await first).status_code == 200
+        assert limiter.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_disabled_limiter_passes_through(self):
+        """Test a disabled limiter never sheds"""
+        async def ok(request):
+            return PlainTextResponse("ok")
+        
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, enabled=False)
+        limiter.in_flight = 5
+        app = ConcurrencyLimitMiddleware(Starlette(routes=[Route("/", ok)]), limiter=limiter)
+        
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/")).status_code == 200
+
+class TestRequestLoggingMiddleware:
+    """Test request-scoped log context"""
+    
+    @pytest.mark.asyncio
+    async def test_request_context_is_bound_once(self):
+        """Test handlers see request_id, method and path in the log context"""
+        async def context(request):
+            return JSONResponse(structlog.contextvars.get_contextvars())
+        
+        app = Starlette(routes=[Route("/api/status", context)])
+        app.add_middleware(RequestLoggingMiddleware)
+        
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/status")
+        
+        assert response.json() == {
+            "request_id": response.headers["x-request-id"],
+            "method": "GET",
+            "path": "/api/status"
+        }
+        assert structlog.contextvars.get_contextvars() == {}
@@ -0,0 +1,155 @@
+"""
+Test per-request profiling
+"""
+import asyncio
+import sys
+import pytest
+from fastapi.testclient import TestClient
+from backend.config import settings
+from backend.profiling import RequestProfile, RequestProfiler, StackSampler
+from backend.server import request_profiler
+from .fakes import FakeClock
+
+@pytest.fixture
+def profiling_enabled(monkeypatch):
+    """Enable profiling by secret header and the admin API for one test"""
+    monkeypatch.setattr(request_profiler, "enabled", True)
+    monkeypatch.setattr(request_profiler, "secret", b"profile-secret")
+    monkeypatch.setattr(settings, "admin_token", "admin-secret")
+    yield request_profiler
+
+class TestRequestProfile:
+    """Test phase accounting and export formats"""
+    
+    def test_nested_phases_are_exclusive(self):
+        """Test time in a nested phase is not charged to the enclosing one"""
+        clock = FakeClock()
+        profile = RequestProfile("GET", "/api/status", "sampled", clock=clock)
+        
+        clock.now = 1.0
+        profile.enter("handler")
+        clock.now = 1.5
+        with profile.phase("db"):
+            clock.now = 4.5
+        clock.now = 5.0
+        profile.exit()
+        clock.now = 6.0
+        profile.finish(200)
+        
+        assert profile.phases == {"middleware": 2.0, "handler": 1.0, "db": 3.0}
+        assert profile.duration == 6.0
+    
+    def test_exports(self):
+        """Test collapsed and speedscope output share the same stacks"""
+        profile = RequestProfile("GET", "/api/status", "requested")
+        stack = (("[handler]", "", 0), ("backend.server.get_status_checks", "server.py", 10))
+        profile.samples[stack] = 3
+        profile.finish(200)
+        
+        assert profile.collapsed() == "[handler];backend.server.get_status_checks 3\n"
+        speedscope = profile.speedscope()
+        assert [frame["name"] for frame in speedscope["shared"]["frames"]] == [name for name, _, _ in stack]
+        assert speedscope["profiles"][0]["samples"] == [[0, 1]]
+
+class TestRequestProfiler:
+    """Test request selection and the ring buffer"""
+    
+    def test_select_by_secret_or_sampling(self):
+        """Test the header needs the exact secret and sampling follows the rate"""
+        profiler = RequestProfiler(enabled=True, secret="s3cret", sample_rate=0.5, random_fn=lambda: 0.9)
+        
+        assert profiler.select([(b"x-profile-request", b"s3cret")]) == "requested"
+        assert profiler.select([(b"x-profile-request", b"wrong")]) is None
+        assert profiler.select([]) is None
+        
+        profiler._random = lambda: 0.1
+        assert profiler.select([]) == "sampled"
+    
+    @pytest.mark.asyncio
+    async def test_ring_buffer_keeps_newest(self):
+        """Test only buffer_size profiles are kept"""
+        profiler = RequestProfiler(enabled=True, buffer_size=2)
+        ids = []
+        for _ in range(3):
+            profile = profiler.start("GET", "/", "sampled")
+            profiler.finish(profile, 200)
+            ids.append(profile.id)
+        
+        assert [summary["id"] for summary in profiler.list_profiles()] == [ids[2], ids[1]]
+        assert profiler.get(ids[0]) is None
+        assert profiler.snapshot()["profiled_total"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_sampling_a_waiting_task_records_await_chain(self):
+        """Test a suspended request is sampled through its awaiting coroutines"""
+        async def wait_on_database():
+            await asyncio.sleep(10)
+        
+        profiler = RequestProfiler(enabled=True)
+        profile = profiler.start("GET", "/", "sampled")
+        profiler.sampler.discard(profile)
+        profile.task = asyncio.create_task(wait_on_database())
+        await asyncio.sleep(0)
+        
+        try:
+            stack = StackSampler.sample(profile, sys._current_frames())
+        finally:
+            profile.task.cancel()
+        
+        names = [name for name, _, _ in stack]
+        assert names[0] == "[middleware]"
+        assert names[-1] == "[waiting]"
+        assert any(name.endswith("wait_on_database") for name in names)
+    
+    @pytest.mark.asyncio
+    async def test_sampling_the_running_task_records_thread_stack(self):
+        """Test the task running on the loop is sampled from its thread's frames"""
+        profiler = RequestProfiler(enabled=True)
+        profile = profiler.start("GET", "/", "sampled")
+        profiler.sampler.discard(profile)
+        
+        stack = StackSampler.sample(profile, sys._current_frames())
+        
+        names = [name for name, _, _ in stack]
+        assert names[0] == "[middleware]"
+        assert "[waiting]" not in names
+        assert names[-1].endswith("test_sampling_the_running_task_records_thread_stack")
+
+class TestProfilingEndpoints:
+    """Test profiling through the API"""
+    
+    def test_profiled_request_breaks_down_phases(self, client: TestClient, fake_database, profiling_enabled):
+        """Test a requested profile is stored with per-phase timings"""
+        response = client.get(
+            "/api/status",
+            params={"client_name": "profiled-client"},
+            headers={"X-Profile-Request": "profile-secret"}
+        )
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-ID"]
+        
+        summary = client.get(
+            f"/api/admin/profiles/{profile_id}",
+            params={"format": "summary"},
+            headers={"X-Admin-Token": "admin-secret"}
+        ).json()
+        assert summary["status_code"] == 200
+        assert {"middleware", "validation", "handler", "db", "serialization", "logging"} <= set(summary["phases_ms"])
+        
+        speedscope = client.get(f"/api/admin/profiles/{profile_id}", headers={"X-Admin-Token": "admin-secret"})
+        assert speedscope.status_code == 200
+        assert "speedscope" in speedscope.headers["content-disposition"]
+        assert speedscope.json()["profiles"][0]["type"] == "sampled"
+    
+    def test_unselected_requests_are_not_profiled(self, client: TestClient, fake_database, profiling_enabled):
+        """Test requests without the secret header are not profiled"""
+        response = client.get("/api/status", headers={"X-Profile-Request": "guess"})
+        
+        assert response.status_code == 200
+        assert "X-Profile-ID" not in response.headers
+    
+    def test_admin_endpoints_require_token(self, client: TestClient, profiling_enabled):
+        """Test the profile list is refused without the admin token"""
+        assert client.get("/api/admin/profiles").status_code == 403
+        assert client.get("/api/admin/profiles", headers={"X-Admin-Token": "nope"}).status_code == 403
+        assert client.get("/api/admin/profiles", headers={"X-Admin-Token": "admin-secret"}).status_code == 200
@@ -0,0 +1,104 @@
+"""
+Test sparse fieldsets and MongoDB projections
+"""
+import pytest
+from fastapi.testclient import TestClient
+from backend.clients import ClientRegistry
+from backend.database import db_manager
+from backend.repository import MongoStatusCheckRepository, parse_fields
+from backend.status_ids import StatusIdCodec
+
+def mongo_repository(id_storage: str = "string", registry: bool = False, **kwargs) -> MongoStatusCheckRepository:
+    return MongoStatusCheckRepository(
+        db_manager, StatusIdCodec(id_storage), ClientRegistry(db_manager.collection, enabled=registry), **kwargs
+    )
+
+class TestParseFields:
+    """Test parsing of the fields query parameter"""
+    
+    def test_selection_is_canonical(self):
+        """Test order, whitespace and duplicates do not matter"""
+        assert parse_fields(" timestamp,id,timestamp ") == ("id", "timestamp")
+    
+    def test_all_or_nothing_means_whole_documents(self):
+        """Test an empty or complete selection needs no projection"""
+        assert parse_fields(None) is None
+        assert parse_fields(",") is None
+        assert parse_fields("client_name,timestamp,id") is None
+    
+    def test_unknown_fields_are_rejected(self):
+        """Test unknown names are listed in the error"""
+        with pytest.raises(ValueError, match="_id"):
+            parse_fields("id,_id")
+
+class TestProjection:
+    """Test field selections map to projections over the stored layout"""
+    
+    def test_string_ids_leave_out_underscore_id(self):
+        """Test the default layout excludes _id so indexed selections can be covered"""
+        assert mongo_repository().projection(("id", "timestamp")) == {"id": 1, "timestamp": 1, "_id": 0}
+        assert mongo_repository().projection(None) is None
+    
+    def test_uuid_ids_and_client_registry(self):
+        """Test the binary _id, legacy id and client_id are projected when needed"""
+        repository = mongo_repository("uuid", registry=True)
+        
+        assert repository.projection(("id",)) == {"_id": 1, "id": 1}
+        assert repository.projection(("client_name",)) == {"client_name": 1, "client_id": 1, "_id": 0}
+    
+    @pytest.mark.asyncio
+    async def test_indexes_created_at_start(self, fake_database):
+        """Test the id indexes follow the stored layout and are built once, off the write path"""
+        repository = mongo_repository(registry=True, id_indexes=True)
+        repository.client_registry._indexes_ready = True
+        
+        await repository.insert({"id": "a", "client_name": "c", "timestamp": "2024-01-01T00:00:00"})
+        assert fake_database.status_checks.indexes == []
+        
+        await repository.start()
+        await repository.start()
+        
+        assert [keys for keys, _ in fake_database.status_checks.indexes] == [[("id", 1)]]
+    
+    def test_default_layout_index_covers_id_lookups(self):
+        """Test only string ids without the registry get the covering key order"""
+        assert mongo_repository().index_specs() == [[("id", 1), ("client_name", 1), ("timestamp", 1)]]
+        assert mongo_repository("uuid").index_specs() == [[("id", 1)]]
+
+class TestFieldsParameter:
+    """Test the fields= query parameter on the read endpoints"""
+    
+    def test_list_returns_requested_fields(self, client: TestClient, fake_database):
+        """Test list responses carry only the requested fields and the projection reaches the database"""
+        created = client.post("/api/status", json={"client_name": "sparse"}).json()
+        
+        response = client.get("/api/status", params={"fields": "id,timestamp"})
+        
+        assert response.status_code == 200
+        assert response.json() == [{"id": created["id"], "timestamp": created["timestamp"]}]
+        assert fake_database.status_checks.projections[-1] == {"id": 1, "timestamp": 1, "_id": 0}
+    
+    def test_list_selections_are_cached_separately(self, client: TestClient, fake_database):
+        """Test a sparse page is not served to a full request and vice versa"""
+        from backend.server import status_query_coalescer
+        status_query_coalescer.clear()
+        created = client.post("/api/status", json={"client_name": "sparse"}).json()
+        
+        assert client.get("/api/status", params={"fields": "client_name"}).json() == [{"client_name": "sparse"}]
+        assert client.get("/api/status").json() == [created]
+    
+    def test_get_returns_requested_fields(self, client: TestClient, fake_database):
+        """Test a single status check can be reduced to some fields"""
+        created = client.post("/api/status", json={"client_name": "sparse"}).json()
+        
+        response = client.get(f"/api/status/{created['id']}", params={"fields": "client_name"})
+        
+        assert response.json() == {"client_name": "sparse"}
+        assert client.get(f"/api/status/{created['id']}").json() == created
+    
+    def test_unknown_fields_are_rejected(self, client: TestClient, fake_database):
+        """Test 422 for fields that do not exist"""
+        response = client.get("/api/status", params={"fields": "id,secret"})
+        
+        assert response.status_code == 422
+        assert "secret" in response.json()["message"]
@@ -0,0 +1,61 @@
+"""
+Test compact status check records
+"""
+import sys
+import uuid
+from datetime import datetime, timezone
+import pytest
+from backend.records import StatusRecord
+from backend.server import StatusCheck, encode_status_record, status_event_id
+from backend.streaming import StatusBroadcaster
+
+class TestStatusRecord:
+    """Test packing and conversion back to the API model"""
+    
+    def test_round_trip_matches_api_json(self):
+        """Test a record renders exactly like the model it was built from"""
+        status = StatusCheck(client_name="client-1", timestamp=datetime(2024, 1, 2, 3, 4, 5, 678901))
+        record = StatusRecord.from_document(status.model_dump())
+        
+        assert isinstance(record.key, bytes) and len(record.key) == 16
+        assert record.timestamp_us == 1704164645678901
+        assert record.to_document() == status.model_dump()
+        assert encode_status_record(record) == status.model_dump_json()
+    
+    def test_non_uuid_ids_and_string_timestamps(self):
+        """Test ids that are not canonical UUIDs are kept verbatim"""
+        upper = str(uuid.uuid4()).upper()
+        record = StatusRecord.from_fields("test-id-1", "client", "2024-01-01T00:00:00")
+        
+        assert record.id == "test-id-1"
+        assert StatusRecord.from_fields(upper, "client", "2024-01-01T00:00:00").id == upper
+        assert record.timestamp == datetime(2024, 1, 1)
+    
+    def test_aware_timestamps_are_stored_as_utc(self):
+        """Test timezone-aware input is normalized to naive UTC"""
+        aware = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        assert StatusRecord.from_fields("a", "client", aware).timestamp == datetime(2024, 1, 1, 12)
+    
+    def test_client_names_are_interned(self):
+        """Test records of the same client share one name string"""
+        first = StatusRecord.from_fields("a", "".join(["client", "-42"]), datetime(2024, 1, 1))
+        second = StatusRecord.from_fields("b", "".join(["client", "-42"]), datetime(2024, 1, 1))
+        
+        assert first.client_name is second.client_name
+        assert not hasattr(first, "__dict__")
+        assert sys.getsizeof(first) < sys.getsizeof(StatusCheck(client_name="client-42").__dict__)
+
+class TestReplayBuffer:
+    """Test the stream replay buffer holds records"""
+    
+    @pytest.mark.asyncio
+    async def test_replay_encodes_buffered_records(self):
+        """Test replayed events are rendered from the buffered records"""
+        broadcaster = StatusBroadcaster(encode=encode_status_record, event_id=status_event_id)
+        statuses = [StatusCheck(client_name=f"client-{n}") for n in range(3)]
+        ids = [broadcaster.publish(StatusRecord.from_document(status.model_dump())) for status in statuses]
+        
+        assert all(isinstance(item, StatusRecord) for item in broadcaster._replay.values())
+        subscription = broadcaster.subscribe(last_event_id=ids[0])
+        assert await subscription.next_event(1) == (ids[1], statuses[1].model_dump_json())
+        assert await subscription.next_event(1) == (ids[2], statuses[2].model_dump_json())
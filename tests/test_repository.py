@@ -0,0 +1,170 @@
+"""
+Conformance suite for the status check storage engines
+"""
+import asyncio
+import sqlite3
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from backend.clients import ClientRegistry
+from backend.database import db_manager
+from backend.repository import (
+    MemoryStatusCheckRepository, MongoStatusCheckRepository, SQLiteStatusCheckRepository, StatusCheckRepository
+)
+from backend.status_ids import StatusIdCodec
+
+ENGINES = ("memory", "sqlite", "mongo", "mongo-uuid-registry")
+
+def make_documents(count: int, clients=("alpha", "beta")):
+    start = datetime(2024, 5, 1, 12, 0, 0, 123456)
+    return [
+        {"id": str(uuid.uuid4()), "client_name": clients[index % len(clients)], "timestamp": start + timedelta(seconds=index)}
+        for index in range(count)
+    ]
+
+@pytest.fixture(params=ENGINES)
+def repository(request, tmp_path, fake_database):
+    if request.param == "memory":
+        repository = MemoryStatusCheckRepository()
+    elif request.param == "sqlite":
+        repository = SQLiteStatusCheckRepository(str(tmp_path / "status.db"))
+    elif request.param == "mongo":
+        repository = MongoStatusCheckRepository(db_manager, StatusIdCodec("string"), ClientRegistry(db_manager.collection))
+    else:
+        repository = MongoStatusCheckRepository(
+            db_manager, StatusIdCodec("uuid"), ClientRegistry(db_manager.collection, enabled=True)
+        )
+    asyncio.run(repository.start())
+    yield repository
+    asyncio.run(repository.close())
+
+class TestRepositoryConformance:
+    """Test every engine behaves the same behind the status check endpoints"""
+    
+    @pytest.mark.asyncio
+    async def test_insert_and_get(self, repository):
+        """Test a stored status check reads back unchanged"""
+        document, = make_documents(1)
+        await repository.insert(dict(document))
+        
+        assert await repository.get(document["id"]) == document
+        assert await repository.get(str(uuid.uuid4())) is None
+    
+    @pytest.mark.asyncio
+    async def test_get_many(self, repository):
+        """Test a batch lookup returns the stored checks keyed by id, across chunks"""
+        repository.chunk_size = 3
+        documents = make_documents(8)
+        await repository.insert_many([dict(document) for document in documents])
+        wanted = [documents[6]["id"], str(uuid.uuid4()), documents[0]["id"], documents[3]["id"], documents[4]["id"]]
+        
+        found = await repository.get_many(wanted)
+        
+        assert found == {document["id"]: document for document in (documents[6], documents[0], documents[3], documents[4])}
+        assert await repository.get_many([]) == {}
+    
+    @pytest.mark.asyncio
+    async def test_bulk_insert_lists_in_insertion_order(self, repository):
+        """Test insert_many plus skip/limit paging over insertion order"""
+        documents = make_documents(25)
+        await repository.insert_many([dict(document) for document in documents[:20]])
+        await repository.insert(dict(documents[20]))
+        await repository.insert_many([dict(document) for document in documents[21:]])
+        await repository.insert_many([])
+        
+        assert await repository.list(limit=100) == documents
+        assert await repository.list(skip=5, limit=3) == documents[5:8]
+        assert await repository.list(skip=30, limit=10) == []
+    
+    @pytest.mark.asyncio
+    async def test_filter_and_count_by_client(self, repository):
+        """Test case-insensitive client name regex filtering for list and count"""
+        documents = make_documents(9, clients=("alpha", "beta", "gamma"))
+        await repository.insert_many([dict(document) for document in documents])
+        
+        beta = [document for document in documents if document["client_name"] == "beta"]
+        assert await repository.list("beta", limit=100) == beta
+        assert await repository.list("beta", skip=1, limit=1) == beta[1:2]
+        assert await repository.list("delta") == []
+        assert await repository.list("^(ALPHA|gam)", limit=100) == [
+            document for document in documents if document["client_name"] != "beta"
+        ]
+        assert await repository.count() == 9
+        assert await repository.count("gamma") == 3
+        assert await repository.count("delta") == 0
+        assert await repository.count("MA$") == 3
+    
+    @pytest.mark.asyncio
+    async def test_field_selection(self, repository):
+        """Test reads return only the requested fields"""
+        documents = make_documents(3)
+        await repository.insert_many([dict(document) for document in documents])
+        
+        assert await repository.get(documents[1]["id"], fields=("timestamp",)) == {"timestamp": documents[1]["timestamp"]}
+        assert await repository.list("beta", fields=("id", "client_name")) == [
+            {"id": documents[1]["id"], "client_name": "beta"}
+        ]
+        assert await repository.list(fields=("client_name",)) == [
+            {"client_name": "alpha"}, {"client_name": "beta"}, {"client_name": "alpha"}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_ready_and_stats(self, repository):
+        """Test engines report readiness and name themselves in stats"""
+        assert repository.ready
+        assert await repository.health_check()
+        assert (await repository.stats())["engine"] == repository.engine
+
+class TestRepositoryInterface:
+    """Test the engine base class"""
+    
+    def test_incomplete_engine_fails_at_instantiation(self):
+        """Test an engine missing a storage method cannot be created"""
+        class ReadOnlyRepository(StatusCheckRepository):
+            async def get(self, status_id, fields=None):
+                return None
+        
+        with pytest.raises(TypeError, match="insert"):
+            ReadOnlyRepository()
+
+class TestSQLiteRepository:
+    """Test SQLite specifics"""
+    
+    @pytest.mark.asyncio
+    async def test_wal_mode_and_persistence(self, tmp_path):
+        """Test the database is in WAL mode and data survives reopening"""
+        path = str(tmp_path / "status.db")
+        repository = SQLiteStatusCheckRepository(path)
+        await repository.start()
+        documents = make_documents(3)
+        await repository.insert_many(documents)
+        await repository.close()
+        
+        with sqlite3.connect(path) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        
+        reopened = SQLiteStatusCheckRepository(path)
+        await reopened.start()
+        try:
+            assert await reopened.list() == documents
+        finally:
+            await reopened.close()
+    
+    def test_in_memory_path_is_rejected(self):
+        """Test :memory: is refused since each connection would see its own database"""
+        with pytest.raises(ValueError):
+            SQLiteStatusCheckRepository(":memory:")
+
+class TestStatusEndpointsOnEmbeddedEngine:
+    """Test the endpoints run on a non-Mongo engine"""
+    
+    def test_create_list_and_get(self, client, monkeypatch):
+        """Test the status endpoints work without MongoDB"""
+        from backend import server
+        monkeypatch.setattr(server, "status_repository", MemoryStatusCheckRepository())
+        server.status_query_coalescer.clear()
+        
+        created = client.post("/api/status", json={"client_name": "edge"}).json()
+        
+        assert client.get(f"/api/status/{created['id']}").json() == created
+        assert client.get("/api/status", params={"client_name": "edge"}).json() == [created]
@@ -0,0 +1,146 @@
+"""
+Test database resilience: deadlines, retries and the circuit breaker
+"""
+import pytest
+from pymongo.errors import AutoReconnect, DuplicateKeyError
+from backend.exceptions import CircuitOpenError, ServiceUnavailableError
+from backend.resilience import CircuitBreaker, ResilientCollection
+from .fakes import FakeClock, FaultInjectingCollection
+
+def make_collection(collection, breaker=None, timeout=1.0, read_retries=2):
+    return ResilientCollection(
+        collection,
+        breaker or CircuitBreaker(failure_threshold=3, recovery_timeout=5.0),
+        timeout=timeout,
+        read_retries=read_retries,
+        retry_backoff=0.001
+    )
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions"""
+    
+    def test_opens_after_threshold(self):
+        """Test breaker opens after consecutive failures"""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.snapshot()["rejected_total"] == 1
+    
+    def test_success_resets_failure_count(self):
+        """Test a success resets the consecutive failure count"""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_half_open_allows_single_probe(self):
+        """Test only one probe is let through after the recovery timeout"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10.0, clock=clock)
+        breaker.record_failure()
+        
+        clock.now = 10.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_failed_probe_reopens(self):
+        """Test a failed half-open probe re-opens the breaker"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10.0, clock=clock)
+        breaker.record_failure()
+        clock.now = 10.0
+        breaker.before_call()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.times_opened == 2
+        assert breaker.retry_after() == 10
+
+class TestResilientCollection:
+    """Test the collection wrapper against a fault-injecting fake"""
+    
+    @pytest.mark.asyncio
+    async def test_read_retries_transient_errors(self):
+        """Test reads are retried on transient errors"""
+        fake = FaultInjectingCollection([{"id": "a", "client_name": "x"}])
+        fake.fail_next(AutoReconnect("primary stepped down"), AutoReconnect("again"))
+        
+        doc = await make_collection(fake).find_one({"id": "a"})
+        
+        assert doc["client_name"] == "x"
+        assert fake.calls == 3
+    
+    @pytest.mark.asyncio
+    async def test_read_retries_are_bounded(self):
+        """Test reads give up after the configured number of retries"""
+        fake = FaultInjectingCollection()
+        fake.fail_next(*[AutoReconnect("down")] * 5)
+        
+        with pytest.raises(AutoReconnect):
+            await make_collection(fake, read_retries=1).find_list({}, limit=10)
+        assert fake.calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_read_passes_max_time_ms(self):
+        """Test reads carry a server-side deadline"""
+        fake = FaultInjectingCollection()
+        await make_collection(fake, timeout=0.5).count_documents({})
+        assert 0 < fake.max_time_ms[0] <= 500
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_not_retried(self):
+        """Test writes are attempted once"""
+        fake = FaultInjectingCollection()
+        fake.fail_next(AutoReconnect("down"))
+        
+        with pytest.raises(AutoReconnect):
+            await make_collection(fake).insert_one({"id": "a"})
+        assert fake.calls == 1
+    
+    @pytest.mark.asyncio
+    async def test_slow_operation_times_out(self):
+        """Test operations exceeding the deadline answer 503"""
+        fake = FaultInjectingCollection()
+        fake.delay = 1.0
+        
+        with pytest.raises(ServiceUnavailableError, match="timed out"):
+            await make_collection(fake, timeout=0.05).find_one({"id": "a"})
+    
+    @pytest.mark.asyncio
+    async def test_breaker_fails_fast_when_open(self):
+        """Test an open breaker rejects calls without touching the collection"""
+        fake = FaultInjectingCollection()
+        fake.fail_next(*[AutoReconnect("down")] * 3)
+        collection = make_collection(fake, read_retries=0)
+        
+        for _ in range(3):
+            with pytest.raises(AutoReconnect):
+                await collection.find_one({"id": "a"})
+        
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await collection.find_one({"id": "a"})
+        assert fake.calls == 3
+        assert exc_info.value.status_code == 503
+        assert "Retry-After" in exc_info.value.headers
+    
+    @pytest.mark.asyncio
+    async def test_application_errors_do_not_trip_breaker(self):
+        """Test errors unrelated to database health leave the breaker closed"""
+        fake = FaultInjectingCollection()
+        breaker = CircuitBreaker(failure_threshold=1)
+        fake.fail_next(DuplicateKeyError("duplicate"))
+        
+        with pytest.raises(DuplicateKeyError):
+            await make_collection(fake, breaker=breaker).insert_one({"id": "a"})
+        assert breaker.state == CircuitBreaker.CLOSED
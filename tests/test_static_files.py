@@ -0,0 +1,109 @@
+"""
+Test static frontend serving
+"""
+import gzip
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from backend.middleware import RateLimitMiddleware
+from backend.static_files import IMMUTABLE_CACHE_CONTROL, StaticBundle, StaticFilesMiddleware
+
+APP_JS = "console.log('marketplace');\n" * 200
+
+@pytest.fixture
+def build_dir(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<!doctype html><div id=root></div>")
+    (tmp_path / "assets" / "index-B7x2kQ9a.js").write_text(APP_JS)
+    (tmp_path / "assets" / "logo-4f9a1c2e.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 8)
+    (tmp_path / "robots.txt").write_text("User-agent: *\n")
+    return tmp_path
+
+def make_client(build_dir, memory_max_bytes=262144, mount_path="/", requests_per_minute=1) -> TestClient:
+    async def api(request):
+        return PlainTextResponse("api")
+    
+    app = Starlette(routes=[Route("/api/status", api)])
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=requests_per_minute)
+    bundle = StaticBundle(str(build_dir), memory_max_bytes=memory_max_bytes)
+    bundle.load()
+    app.add_middleware(StaticFilesMiddleware, bundle=bundle, mount_path=mount_path)
+    return TestClient(app)
+
+class TestStaticBundle:
+    """Test precompression, hashing and cache headers"""
+    
+    def test_hashed_assets_are_immutable_and_precompressed(self, build_dir):
+        """Test hashed filenames get immutable caching and a gzip variant"""
+        bundle = StaticBundle(str(build_dir))
+        assert bundle.load() == 4
+        
+        script = bundle.lookup("assets/index-B7x2kQ9a.js")
+        assert script.cache_control == IMMUTABLE_CACHE_CONTROL
+        assert gzip.decompress(script.encodings["gzip"]) == APP_JS.encode()
+        assert bundle.lookup("index.html").cache_control == "no-cache"
+        assert bundle.lookup("robots.txt").encodings == {}
+        assert bundle.lookup("assets/logo-4f9a1c2e.png").encodings == {}
+    
+    def test_missing_directory_fails_load(self, tmp_path):
+        """Test a missing build directory is reported at startup"""
+        with pytest.raises(FileNotFoundError):
+            StaticBundle(str(tmp_path / "build")).load()
+
+class TestStaticFilesMiddleware:
+    """Test negotiation, conditional requests, SPA fallback and middleware bypass"""
+    
+    def test_serves_negotiated_encoding(self, build_dir):
+        """Test gzip is served when accepted and identity otherwise"""
+        client = make_client(build_dir)
+        
+        encoded = client.get("/assets/index-B7x2kQ9a.js", headers={"Accept-Encoding": "gzip"})
+        identity = client.get("/assets/index-B7x2kQ9a.js", headers={"Accept-Encoding": "gzip;q=0"})
+        
+        assert encoded.headers["content-encoding"] == "gzip"
+        assert encoded.headers["vary"] == "Accept-Encoding"
+        assert encoded.text == identity.text == APP_JS
+        assert "content-encoding" not in identity.headers
+        assert encoded.headers["etag"] == identity.headers["etag"]
+    
+    def test_if_none_match_returns_304(self, build_dir):
+        """Test a matching ETag is answered with 304 and no body"""
+        client = make_client(build_dir)
+        etag = client.get("/index.html").headers["etag"]
+        
+        response = client.get("/index.html", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    def test_large_files_are_sent_from_disk(self, build_dir):
+        """Test files over the memory limit go through FileResponse with the same headers"""
+        client = make_client(build_dir, memory_max_bytes=1024)
+        
+        response = client.get("/assets/logo-4f9a1c2e.png")
+        
+        assert response.status_code == 200
+        assert response.content == (build_dir / "assets" / "logo-4f9a1c2e.png").read_bytes()
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["content-type"] == "image/png"
+    
+    def test_spa_routes_fall_back_to_index(self, build_dir):
+        """Test extensionless paths get index.html while API and missing files pass through"""
+        client = make_client(build_dir, mount_path="/marketplace/", requests_per_minute=100)
+        index = (build_dir / "index.html").read_text()
+        
+        assert client.get("/api/status").text == "api"
+        assert client.get("/marketplace/products/42").text == index
+        assert client.get("/marketplace").text == index
+        assert client.get("/marketplace/assets/missing.js").status_code == 404
+    
+    def test_static_requests_skip_rate_limit(self, build_dir):
+        """Test assets are served after the API's rate limit is exhausted"""
+        client = make_client(build_dir)
+        
+        assert client.get("/api/status").status_code == 200
+        assert client.get("/api/status").status_code == 429
+        for _ in range(3):
+            assert client.get("/assets/index-B7x2kQ9a.js").status_code == 200
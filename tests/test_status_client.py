@@ -0,0 +1,150 @@
+"""
+Test the async status check API client
+"""
+import asyncio
+import json
+import time
+import uuid
+import httpx
+import pytest
+from backend import server
+from backend.server import app, status_query_coalescer
+from status_client import RetryPolicy, StatusAPIError, StatusCheck, StatusCheckFields, StatusClient
+from status_client import models
+
+def app_client(**options) -> StatusClient:
+    """Client for the in-process app, with its own rate limit bucket"""
+    transport = httpx.ASGITransport(app=app, client=(f"sdk-{uuid.uuid4()}", 0))
+    return StatusClient("http://test", transport=transport, **options)
+
+def mock_client(handler, **options) -> StatusClient:
+    return StatusClient("http://test", transport=httpx.MockTransport(handler), **options)
+
+def status_body(client_name: str = "agent") -> bytes:
+    return json.dumps({"id": str(uuid.uuid4()), "client_name": client_name, "timestamp": "2024-01-01T00:00:00"}).encode()
+
+class TestModels:
+    """Test the client models stay in step with the API's"""
+    
+    @pytest.mark.parametrize("name", ["StatusCheck", "StatusCheckCreate", "StatusCheckFields", "StatusCheckBatchResult"])
+    def test_fields_match_server(self, name: str):
+        """Test each client model has the same fields as the server model of that name"""
+        assert getattr(models, name).model_fields.keys() == getattr(server, name).model_fields.keys()
+
+class TestAgainstApp:
+    """Test the client end to end against the in-process app"""
+    
+    @pytest.mark.asyncio
+    async def test_create_list_iterate_and_look_up(self, fake_database):
+        """Test concurrent inserts, paged iteration, batch lookups and projections"""
+        status_query_coalescer.clear()
+        names = [f"agent-{n}" for n in range(30)]
+        async with app_client(max_concurrency=8) as client:
+            created = await client.create_status_checks(names)
+            assert [check.client_name for check in created] == names
+            
+            iterated = [check async for check in client.iter_status_checks(page_size=7)]
+            assert [check.id for check in iterated] == [check.id for check in created]
+            
+            found = await client.get_status_checks([created[3].id, "00000000-0000-0000-0000-000000000000"])
+            assert [check.id for check in found.results] == [created[3].id]
+            assert found.missing == ["00000000-0000-0000-0000-000000000000"]
+            
+            projected = await client.get_status_check(created[0].id, fields=["client_name"])
+            assert projected == StatusCheckFields(client_name="agent-0")
+    
+    @pytest.mark.asyncio
+    async def test_api_errors_are_raised(self, fake_database):
+        """Test a rejected request raises with the API's message and no retries"""
+        async with app_client() as client:
+            with pytest.raises(StatusAPIError) as error:
+                await client.get_status_check("not-a-uuid")
+        
+        assert error.value.status_code == 422
+        assert error.value.message == "Invalid status check ID format"
+        assert client.retries_total == 0
+
+class TestRetries:
+    """Test retry and backoff behaviour"""
+    
+    def test_backoff_is_jittered_and_capped(self):
+        """Test waits grow exponentially up to max_backoff, scaled by the jitter draw"""
+        policy = RetryPolicy(attempts=10, base_backoff=0.1, max_backoff=1.0, random_fn=lambda: 0.5)
+        
+        assert [policy.backoff(attempt) for attempt in range(5)] == [0.05, 0.1, 0.2, 0.4, 0.5]
+        assert policy.backoff(0, retry_after=3.0) == 3.05
+        assert policy.backoff(0, retry_after=61.0) is None
+        assert policy.backoff(9) is None
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honored_with_one_idempotency_key(self):
+        """Test throttled inserts are retried after Retry-After with the same key"""
+        keys = []
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            keys.append(request.headers["Idempotency-Key"])
+            if len(keys) < 3:
+                return httpx.Response(429, headers={"Retry-After": "0.05"}, text="Rate limit exceeded")
+            return httpx.Response(200, content=status_body())
+        
+        async with mock_client(handler, retry=RetryPolicy(base_backoff=0.001)) as client:
+            start = time.perf_counter()
+            check = await client.create_status_check("agent")
+        
+        assert isinstance(check, StatusCheck)
+        assert time.perf_counter() - start >= 0.1
+        assert len(set(keys)) == 1 and len(keys) == 3
+        assert client.retries_total == 2
+    
+    @pytest.mark.asyncio
+    async def test_long_retry_after_is_not_waited_for(self):
+        """Test a Retry-After beyond max_retry_after raises right away"""
+        calls = []
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503, headers={"Retry-After": "120"}, json={"message": "Service temporarily unavailable"})
+        
+        async with mock_client(handler) as client:
+            with pytest.raises(StatusAPIError) as error:
+                await client.health()
+        
+        assert (error.value.status_code, error.value.message, len(calls)) == (503, "Service temporarily unavailable", 1)
+    
+    @pytest.mark.asyncio
+    async def test_connection_errors_are_retried_then_raised(self):
+        """Test transport failures are retried up to the attempt limit"""
+        calls = []
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            raise httpx.ConnectError("connection refused", request=request)
+        
+        async with mock_client(handler, retry=RetryPolicy(attempts=3, base_backoff=0.001)) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.health()
+        
+        assert len(calls) == 3
+
+class TestConcurrency:
+    """Test the client-side concurrency limit"""
+    
+    @pytest.mark.asyncio
+    async def test_in_flight_requests_are_limited(self):
+        """Test no more than max_concurrency requests are outstanding at once"""
+        in_flight = peak = 0
+        
+        class SlowTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.005)
+                in_flight -= 1
+                return httpx.Response(200, content=status_body())
+        
+        async with StatusClient("http://test", transport=SlowTransport(), max_concurrency=3) as client:
+            created = await client.create_status_checks([f"agent-{n}" for n in range(20)])
+        
+        assert len(created) == 20
+        assert peak == 3
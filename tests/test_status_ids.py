@@ -0,0 +1,103 @@
+"""
+Test binary UUID status check ids
+"""
+import uuid
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo.errors import BulkWriteError
+from backend.migrate_status_ids import migrate
+from backend.status_ids import StatusIdCodec
+
+class SyncCollection:
+    """Just enough of a pymongo collection for the migration"""
+    
+    def __init__(self, documents):
+        self.documents = documents
+    
+    def find(self, filter, batch_size=None):
+        return [dict(d) for d in self.documents if isinstance(d.get("id"), str)]
+    
+    def insert_many(self, documents, ordered=True):
+        errors = []
+        for index, document in enumerate(documents):
+            if any(d["_id"] == document["_id"] for d in self.documents):
+                errors.append({"index": index, "code": 11000})
+            else:
+                self.documents.append(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+    
+    def delete_many(self, filter):
+        old_ids = filter["_id"]["$in"]
+        self.documents[:] = [d for d in self.documents if d["_id"] not in old_ids]
+
+class TestStatusIdCodec:
+    """Test translation between API ids and stored ids"""
+    
+    def test_uuid_mode_stores_id_as_underscore_id(self):
+        """Test the API id becomes a UUID _id and comes back as a string"""
+        codec = StatusIdCodec("uuid")
+        status_id = str(uuid.uuid4())
+        
+        stored = codec.encode({"id": status_id, "client_name": "client"})
+        
+        assert stored == {"_id": uuid.UUID(status_id), "client_name": "client"}
+        assert codec.decode(stored) == {"id": status_id, "client_name": "client"}
+        assert codec.lookup_filters(status_id)[0] == {"_id": uuid.UUID(status_id)}
+    
+    def test_string_mode_is_unchanged(self):
+        """Test string mode stores documents as before and drops ObjectIds on read"""
+        codec = StatusIdCodec("string")
+        document = {"id": "a", "client_name": "client"}
+        
+        assert codec.encode(document) is document
+        assert codec.decode({"_id": ObjectId(), **document}) == document
+        assert codec.lookup_filters("a") == [{"id": "a"}]
+
+class TestStatusIdEndpoints:
+    """Test the API with binary UUID storage"""
+    
+    def test_create_and_get_by_underscore_id(self, client: TestClient, fake_database, monkeypatch):
+        """Test new checks are stored under _id and read back by it, legacy ones still resolve"""
+        from backend.server import status_id_codec
+        monkeypatch.setattr(status_id_codec, "mode", "uuid")
+        legacy_id = str(uuid.uuid4())
+        fake_database.status_checks.documents = [
+            {"_id": ObjectId(), "id": legacy_id, "client_name": "legacy", "timestamp": "2024-01-01T00:00:00"}
+        ]
+        
+        created = client.post("/api/status", json={"client_name": "uuid-client"}).json()
+        stored = fake_database.status_checks.documents[-1]
+        assert stored["_id"] == uuid.UUID(created["id"]) and "id" not in stored
+        
+        calls = fake_database.status_checks.calls
+        assert client.get(f"/api/status/{created['id']}").json() == created
+        assert fake_database.status_checks.calls == calls + 1
+        assert client.get(f"/api/status/{legacy_id}").json()["client_name"] == "legacy"
+
+class TestMigration:
+    """Test the string id to UUID _id migration"""
+    
+    def test_migrates_and_can_be_rerun(self):
+        """Test UUID ids move to _id, other ids are kept and a re-run is harmless"""
+        ids = [str(uuid.uuid4()) for _ in range(3)]
+        documents = [{"_id": ObjectId(), "id": status_id, "client_name": "c"} for status_id in ids]
+        documents.append({"_id": ObjectId(), "id": "test-id-1", "client_name": "c"})
+        # A previous run copied the first document but stopped before deleting it
+        documents.append({"_id": uuid.UUID(ids[0]), "client_name": "c"})
+        collection = SyncCollection(documents)
+        
+        counts = migrate(collection, batch_size=2)
+        
+        assert counts == {"migrated": 2, "already_migrated": 1, "skipped_non_uuid": 1}
+        assert sorted(str(d["_id"]) for d in collection.documents if isinstance(d["_id"], uuid.UUID)) == sorted(ids)
+        assert [d["id"] for d in collection.documents if "id" in d] == ["test-id-1"]
+        assert migrate(collection)["migrated"] == 0
+    
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run only counts"""
+        documents = [{"_id": ObjectId(), "id": str(uuid.uuid4()), "client_name": "c"}]
+        collection = SyncCollection(list(documents))
+        
+        assert migrate(collection, dry_run=True)["migrated"] == 1
+        assert collection.documents == documents
@@ -0,0 +1,215 @@
+"""
+Test the live status check feed
+"""
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from pymongo.errors import OperationFailure
+from backend.streaming import StatusBroadcaster, sse_events, watch_status_changes
+
+class FakeChangeStream:
+    """Async context manager yielding canned change events"""
+    
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.resume_token = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        if not self.changes:
+            # Park like an idle change stream
+            await asyncio.sleep(3600)
+        change = self.changes.pop(0)
+        if isinstance(change, Exception):
+            raise change
+        self.resume_token = change["_id"]
+        return change
+
+class WatchableCollection:
+    """Collection stand-in exposing watch()"""
+    
+    def __init__(self, changes=None, error=None):
+        self.changes = changes or []
+        self.error = error
+        self.resume_after = []
+    
+    def watch(self, pipeline, resume_after=None):
+        self.resume_after.append(resume_after)
+        if self.error:
+            raise self.error
+        return FakeChangeStream(self.changes)
+
+class TestStatusBroadcaster:
+    """Test fan-out, slow consumer dropping and replay"""
+    
+    @pytest.mark.asyncio
+    async def test_fan_out_to_all_subscribers(self):
+        """Test every subscriber receives the same encoded event"""
+        broadcaster = StatusBroadcaster()
+        subscriptions = [broadcaster.subscribe() for _ in range(1000)]
+        
+        event_id = broadcaster.publish('{"id":"a"}')
+        
+        for subscription in subscriptions:
+            assert await subscription.next_event(1) == (event_id, '{"id":"a"}')
+        assert broadcaster.snapshot()["subscribers"] == 1000
+    
+    @pytest.mark.asyncio
+    async def test_slow_consumer_is_dropped(self):
+        """Test a subscriber with a full queue is disconnected"""
+        broadcaster = StatusBroadcaster(queue_size=2)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe()
+        
+        for n in range(2):
+            broadcaster.publish(str(n))
+            await fast.next_event(1)
+        broadcaster.publish("2")
+        
+        assert slow.dropped
+        assert await slow.next_event(1) is None
+        assert broadcaster.subscriber_count == 1
+        assert broadcaster.snapshot()["dropped_total"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_resume_replays_missed_events(self):
+        """Test reconnecting with a last event id replays buffered events"""
+        broadcaster = StatusBroadcaster(replay_size=10)
+        ids = [broadcaster.publish(str(n)) for n in range(5)]
+        
+        subscription = broadcaster.subscribe(last_event_id=ids[2])
+        
+        assert await subscription.next_event(1) == (ids[3], "3")
+        assert await subscription.next_event(1) == (ids[4], "4")
+    
+    @pytest.mark.asyncio
+    async def test_resume_follows_buffer_order_for_known_ids(self):
+        """Test events after a buffered id are replayed even when their ids sort lower"""
+        broadcaster = StatusBroadcaster(replay_size=10)
+        for item in ("b", "c", "a"):
+            broadcaster.publish(item)
+        
+        assert await broadcaster.subscribe(last_event_id="c").next_event(1) == ("a", "a")
+        assert await broadcaster.subscribe(last_event_id="0").next_event(1) == ("b", "b")
+    
+    @pytest.mark.asyncio
+    async def test_republished_item_is_not_sent_twice(self):
+        """Test an item already in the replay buffer is dropped as a duplicate"""
+        broadcaster = StatusBroadcaster()
+        subscription = broadcaster.subscribe()
+        
+        assert broadcaster.publish("a") == "a"
+        assert broadcaster.publish("a") is None
+        broadcaster.publish("b")
+        
+        assert await subscription.next_event(1) == ("a", "a")
+        assert await subscription.next_event(1) == ("b", "b")
+        assert broadcaster.snapshot()["duplicates_total"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_sse_events_render_frames_and_heartbeats(self):
+        """Test the SSE body contains retry, heartbeat and event frames"""
+        broadcaster = StatusBroadcaster()
+        subscription = broadcaster.subscribe()
+        stream = sse_events(broadcaster, subscription, heartbeat_interval=0.01)
+        
+        assert (await stream.__anext__()).startswith("retry:")
+        assert await stream.__anext__() == ": heartbeat\n\n"
+        
+        broadcaster.publish('{"id":"a"}')
+        assert await stream.__anext__() == 'id: {"id":"a"}\nevent: status_check\ndata: {"id":"a"}\n\n'
+        
+        broadcaster.close()
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert broadcaster.subscriber_count == 0
+
+class TestWatchStatusChanges:
+    """Test the change stream feeder"""
+    
+    @pytest.mark.asyncio
+    async def test_publishes_inserts_from_change_stream(self):
+        """Test inserted documents are encoded and published"""
+        broadcaster = StatusBroadcaster()
+        subscription = broadcaster.subscribe()
+        collection = WatchableCollection([
+            {"_id": {"_data": "token-1"}, "fullDocument": {"id": "a", "client_name": "x"}}
+        ])
+        
+        task = asyncio.create_task(watch_status_changes(
+            broadcaster, lambda: collection, lambda doc: json.dumps({"id": doc["id"]})
+        ))
+        try:
+            assert await subscription.next_event(1) == ('{"id": "a"}', '{"id": "a"}')
+            assert broadcaster.source == "change_stream"
+            assert not broadcaster.publishes_locally
+        finally:
+            task.cancel()
+    
+    @pytest.mark.asyncio
+    async def test_resumes_without_local_fallback(self):
+        """Test a failed stream resumes from its token while publishing stays off the handler"""
+        broadcaster = StatusBroadcaster()
+        subscription = broadcaster.subscribe()
+        collection = WatchableCollection([
+            {"_id": {"_data": "token-1"}, "fullDocument": {"id": "a"}},
+            RuntimeError("connection reset")
+        ])
+        
+        task = asyncio.create_task(watch_status_changes(
+            broadcaster, lambda: collection, lambda doc: doc["id"], retry_interval=0.01
+        ))
+        try:
+            assert await subscription.next_event(1) == ("a", "a")
+            while len(collection.resume_after) < 2:
+                assert not broadcaster.publishes_locally
+                await asyncio.sleep(0.001)
+            assert collection.resume_after == [None, {"_data": "token-1"}]
+        finally:
+            task.cancel()
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_when_unsupported(self):
+        """Test a standalone server leaves publishing to the handler"""
+        broadcaster = StatusBroadcaster()
+        collection = WatchableCollection(
+            error=OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+        )
+        
+        await asyncio.wait_for(watch_status_changes(broadcaster, lambda: collection, str), 1)
+        
+        assert broadcaster.source == "local"
+        assert broadcaster.publishes_locally
+
+class TestStatusStreamEndpoints:
+    """Test the live feed endpoints"""
+    
+    def test_websocket_receives_new_status_checks(self, client: TestClient, fake_database):
+        """Test a created status check is pushed to WebSocket subscribers"""
+        with client.websocket_connect("/api/status/ws") as websocket:
+            response = client.post("/api/status", json={"client_name": "live-client"})
+            assert response.status_code == 200
+            
+            message = websocket.receive_json()
+            assert message["type"] == "status_check"
+            assert message["data"]["id"] == response.json()["id"]
+            assert message["data"]["client_name"] == "live-client"
+            assert message["id"].endswith(f"-{response.json()['id']}")
+    
+    def test_last_event_id_must_be_ours(self):
+        """Test Last-Event-ID values in another format are ignored"""
+        from backend.server import parse_last_event_id
+        
+        event_id = "1704067200000-0b7e3a52-5d0c-4c36-9f0c-2e4a3c9d8f11"
+        assert parse_last_event_id(event_id) == event_id
+        assert parse_last_event_id("42") is None
+        assert parse_last_event_id(None) is None
@@ -0,0 +1,158 @@
+"""
+Test distributed tracing
+"""
+import json
+from types import SimpleNamespace
+import pytest
+import structlog
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from backend.tracing import (
+    BatchSpanProcessor, FileSpanExporter, InMemorySpanExporter, ParentBasedRatioSampler,
+    Tracer, TracingMiddleware, mongo_command_listener, parse_traceparent, tracer
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+@pytest.fixture
+def exported_spans(monkeypatch):
+    """Enable the application tracer with an in-memory exporter"""
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "processor", BatchSpanProcessor(exporter, tracer.resource))
+    
+    def flush():
+        tracer.processor.force_flush()
+        return exporter.spans
+    
+    yield flush
+
+class TestTraceContext:
+    """Test traceparent parsing and sampling"""
+    
+    def test_parse_traceparent(self):
+        """Test valid headers are parsed and malformed ones rejected"""
+        context = parse_traceparent(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01")
+        assert (context.trace_id, context.span_id, context.sampled) == (TRACE_ID, PARENT_SPAN_ID, True)
+        assert context.to_traceparent() == f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"
+        
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-00").sampled is False
+        assert parse_traceparent(f"00-{'0' * 32}-{PARENT_SPAN_ID}-01") is None
+        assert parse_traceparent(f"ff-{TRACE_ID}-{PARENT_SPAN_ID}-01") is None
+        assert parse_traceparent("garbage") is None
+    
+    def test_sampler_follows_parent(self):
+        """Test the parent's decision wins over the ratio"""
+        never = ParentBasedRatioSampler(0.0)
+        always = ParentBasedRatioSampler(1.0)
+        sampled_parent = parse_traceparent(f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01")
+        
+        assert never.should_sample(sampled_parent, TRACE_ID)
+        assert not never.should_sample(None, TRACE_ID)
+        assert always.should_sample(None, TRACE_ID)
+    
+    def test_unsampled_spans_are_not_exported(self):
+        """Test spans of unsampled traces never reach the exporter"""
+        exporter = InMemorySpanExporter()
+        unsampled = Tracer("test", enabled=True, sampler=ParentBasedRatioSampler(0.0), exporter=exporter)
+        
+        with unsampled.span("work") as span:
+            assert not span.recording
+        unsampled.processor.force_flush()
+        
+        assert exporter.spans == []
+    
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        """Test finished spans are appended as one JSON object per line"""
+        path = tmp_path / "traces.jsonl"
+        file_tracer = Tracer("test", enabled=True, exporter=FileSpanExporter(str(path)))
+        
+        with file_tracer.span("outer"):
+            with file_tracer.span("inner"):
+                pass
+        file_tracer.shutdown()
+        
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [span["name"] for span in spans] == ["inner", "outer"]
+        assert spans[0]["parent_span_id"] == spans[1]["span_id"]
+        assert spans[0]["resource"] == {"service.name": "test"}
+
+class TestTracingMiddleware:
+    """Test request spans and log correlation"""
+    
+    def test_request_continues_incoming_trace(self, client: TestClient, fake_database, exported_spans):
+        """Test server and handler spans join the caller's trace"""
+        response = client.get(
+            "/api/status/00000000-0000-0000-0000-000000000000",
+            headers={"traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"}
+        )
+        assert response.status_code == 404
+        
+        spans = {span["name"]: span for span in exported_spans()}
+        server = spans["GET /api/status/{status_id}"]
+        handler = spans["handler /api/status/{status_id}"]
+        assert server["trace_id"] == handler["trace_id"] == TRACE_ID
+        assert server["parent_span_id"] == PARENT_SPAN_ID
+        assert server["kind"] == "server"
+        assert server["attributes"]["http.status_code"] == 404
+        assert handler["parent_span_id"] != PARENT_SPAN_ID
+    
+    def test_trace_ids_are_bound_for_logging(self):
+        """Test log context carries the trace and span ids during the request"""
+        local_tracer = Tracer("test", enabled=True, exporter=InMemorySpanExporter())
+        
+        async def endpoint(request):
+            return JSONResponse(structlog.contextvars.get_contextvars())
+        
+        app = Starlette(routes=[Route("/", endpoint)])
+        app.add_middleware(TracingMiddleware, tracer=local_tracer)
+        
+        with TestClient(app) as test_client:
+            context = test_client.get("/", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"}).json()
+        
+        assert context["trace_id"] == TRACE_ID
+        assert len(context["span_id"]) == 16
+        assert structlog.contextvars.get_contextvars() == {}
+
+class TestMongoCommandListener:
+    """Test MongoDB command spans"""
+    
+    def test_command_span_is_child_of_current_span(self):
+        """Test a command inside a sampled span produces a client span"""
+        exporter = InMemorySpanExporter()
+        local_tracer = Tracer("test", enabled=True, exporter=exporter)
+        listener = mongo_command_listener(local_tracer)
+        event = SimpleNamespace(
+            command_name="find",
+            command={"find": "status_checks", "filter": {}},
+            database_name="test_database",
+            request_id=7,
+            connection_id=("localhost", 27017),
+            duration_micros=1500
+        )
+        
+        with local_tracer.span("handler") as parent:
+            listener.started(event)
+            listener.succeeded(event)
+        local_tracer.processor.force_flush()
+        
+        command = exporter.spans[0]
+        assert command["name"] == "mongodb.find"
+        assert command["kind"] == "client"
+        assert command["parent_span_id"] == parent.context.span_id
+        assert command["attributes"]["db.mongodb.collection"] == "status_checks"
+        assert command["duration_ms"] == 1.5
+    
+    def test_commands_outside_a_trace_are_ignored(self):
+        """Test no span is recorded without a current sampled span"""
+        exporter = InMemorySpanExporter()
+        listener = mongo_command_listener(Tracer("test", enabled=True, exporter=exporter))
+        event = SimpleNamespace(command_name="ping", request_id=1, connection_id=("localhost", 27017), duration_micros=10)
+        
+        listener.started(event)
+        listener.succeeded(event)
+        
+        assert exporter.spans == []
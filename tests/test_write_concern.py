@@ -0,0 +1,94 @@
+"""
+Test write concern tiers for status check ingest
+"""
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import WriteConcern
+from pymongo.errors import AutoReconnect
+from backend.config import Settings, settings
+from backend.database import db_manager
+
+@pytest.fixture
+def fresh_write_stats(monkeypatch):
+    """Zeroed per-tier write counters for one test"""
+    from backend.database import WriteStats
+    monkeypatch.setattr(db_manager, "write_stats", {tier: WriteStats() for tier in db_manager.write_stats})
+    yield db_manager.write_stats
+
+class TestTieredCollections:
+    """Test the db manager applies and accounts for each tier"""
+    
+    @pytest.mark.asyncio
+    async def test_tiers_apply_their_write_concern(self, fake_database, fresh_write_stats):
+        """Test each tier writes with its own write concern to the same collection"""
+        for tier in ("default", "telemetry", "standard", "durable"):
+            await db_manager.collection("status_checks", tier).insert_one({"id": tier})
+        
+        assert fake_database.status_checks.written_with == [
+            None, WriteConcern(w=0), WriteConcern(w=1, j=False), WriteConcern(w="majority", j=True)
+        ]
+        assert len(fake_database.status_checks.documents) == 4
+        assert db_manager.collection("status_checks", "durable").collection is \
+            db_manager.collection("status_checks", "durable").collection
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_counted_per_tier(self, fake_database, fresh_write_stats):
+        """Test successful and failed writes land in their tier's counters"""
+        collection = db_manager.collection("status_checks", "standard")
+        await collection.insert_one({"id": "a"})
+        fake_database.status_checks.fail_next(AutoReconnect("primary stepped down"))
+        with pytest.raises(AutoReconnect):
+            await collection.insert_one({"id": "b"})
+        
+        snapshot = db_manager.write_concern_snapshot()
+        assert (snapshot["standard"]["writes_total"], snapshot["standard"]["errors_total"]) == (2, 1)
+        assert snapshot["durable"]["writes_total"] == 0
+        assert snapshot["durable"]["write_concern"] == {"w": "majority", "j": True}
+
+class TestWriteConcernHeader:
+    """Test X-Write-Concern on POST /api/status"""
+    
+    def test_default_tier_from_settings(self, client: TestClient, fake_database, fresh_write_stats):
+        """Test inserts without the header use STATUS_WRITE_CONCERN"""
+        response = client.post("/api/status", json={"client_name": "alpha"})
+        
+        assert response.status_code == 200
+        assert fake_database.status_checks.written_with == [None]
+        assert client.get("/api/metrics").json()["write_concerns"]["default"]["writes_total"] >= 1
+    
+    def test_allowed_header_selects_tier(self, client: TestClient, fake_database, fresh_write_stats, monkeypatch):
+        """Test a listed tier is used for this insert, including idempotent ones"""
+        monkeypatch.setattr(settings, "write_concern_header_tiers", ["telemetry", "durable"])
+        
+        client.post("/api/status", json={"client_name": "alpha"}, headers={"X-Write-Concern": "telemetry"})
+        client.post(
+            "/api/status",
+            json={"client_name": "beta"},
+            headers={"X-Write-Concern": "durable", "Idempotency-Key": "write-concern-durable"}
+        )
+        
+        assert fake_database.status_checks.written_with == [WriteConcern(w=0), WriteConcern(w="majority", j=True)]
+        metrics = client.get("/api/metrics").json()["write_concerns"]
+        assert (metrics["telemetry"]["writes_total"], metrics["durable"]["writes_total"]) == (1, 1)
+    
+    def test_unlisted_header_is_rejected(self, client: TestClient, fake_database, monkeypatch):
+        """Test tiers outside the allow-list are refused before writing"""
+        monkeypatch.setattr(settings, "write_concern_header_tiers", ["telemetry"])
+        
+        response = client.post("/api/status", json={"client_name": "alpha"}, headers={"X-Write-Concern": "durable"})
+        
+        assert response.status_code == 422
+        assert fake_database.status_checks.documents == []
+
+class TestWriteConcernSettings:
+    """Test write concern settings validation"""
+    
+    def test_unknown_tiers_are_rejected(self):
+        """Test only known tiers are accepted as default or in the allow-list"""
+        settings = Settings(mongo_url='mongodb://localhost:27017', db_name='test_db', status_write_concern='durable')
+        assert settings.status_write_concern == 'durable'
+        
+        with pytest.raises(ValueError, match="STATUS_WRITE_CONCERN"):
+            Settings(mongo_url='mongodb://localhost:27017', db_name='test_db', status_write_concern='fast')
+        with pytest.raises(ValueError, match="WRITE_CONCERN_HEADER_TIERS"):
+            Settings(mongo_url='mongodb://localhost:27017', db_name='test_db', write_concern_header_tiers=['w2'])